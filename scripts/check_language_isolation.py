@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Language Isolation Check
+========================
+
+Regression check for the language of statistics output under concurrency.
+
+A German cache warm-up (WARMUP_ENABLED) runs on synthetic observations while
+several threads request English statistics texts, chart descriptions and
+charts. Checks:
+1. Every English response equals the one computed before the warm-up
+2. Every German chart the warm-up stored in the chart cache equals a
+   rendering with the German texts
+
+Usage: python scripts/check_language_isolation.py
+Exit status 1 if a response or a cached chart has the wrong language.
+"""
+
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from halo.api.routes import warm_up_statistics  # noqa: E402
+from halo.models.types import Observation  # noqa: E402
+from halo.resources.i18n import get_language_i18n  # noqa: E402
+from halo.services import charts  # noqa: E402
+from halo.services.dataset import observations_changed  # noqa: E402
+from halo.web.app import create_app  # noqa: E402
+
+
+ENGLISH_THREADS = 2
+
+# Pause between English requests, leaving CPU time to the low-priority warm-up
+PAUSE = 0.005
+
+# English requests repeated while the warm-up runs
+ENGLISH_URLS = [
+    '/api/monthly-stats?mm={mm}&jj={jj}&format=text',
+    '/api/monthly-stats?mm={mm}&jj={jj}&format=chartspec',
+    '/api/monthly-stats?mm={mm}&jj={jj}&format=linegraph&image=svg',
+    '/api/annual-stats?jj={jj}&format=markdown',
+    '/api/annual-stats?jj={jj}&format=chartspec',
+]
+
+
+def synthetic_observations(observers, count=3000, seed=1):
+    """Random observations of the given observers in the years 2004 and 2005."""
+    rng = random.Random(seed)
+    observations = []
+    for _ in range(count):
+        obs = Observation()
+        obs.KK = rng.choice(observers)
+        obs.O = rng.choice([1, 1, 1, 2])
+        obs.JJ = rng.choice([4, 5])
+        obs.MM = rng.randint(1, 12)
+        obs.TT = rng.randint(1, 28)
+        obs.g = rng.choice([0, 0, 1, 2])
+        obs.ZS, obs.ZM = rng.randint(0, 23), rng.randint(0, 59)
+        obs.d, obs.DD, obs.N, obs.C, obs.c = rng.randint(0, 3), 5, 0, rng.randint(0, 7), 0
+        obs.EE = rng.choice([1, 2, 3, 5, 7, 8, 11, 21, 27])
+        obs.H, obs.F, obs.V, obs.f, obs.zz = rng.randint(0, 3), 0, rng.choice([1, 2]), 0, 0
+        obs.GG = rng.choice([1, 2, 5, 20, 31])
+        obs.HO = obs.HU = -1
+        observations.append(obs)
+    return observations
+
+
+def session_client(app, language):
+    """Test client with the given session language."""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['language'] = language
+    return client
+
+
+def main():
+    cache_dir = tempfile.mkdtemp(prefix='halo-charts-')
+    app = create_app()
+    app.config.update({
+        'TESTING': True,
+        'CHART_CACHE_DIR': cache_dir,
+        'CHART_CACHE': None,
+        'RESULT_CACHE': None,
+        'WARMUP_ENABLED': True,
+        'WARMUP_MONTHS': 6,
+    })
+    observers = sorted({int(row[0]) for row in app.config['OBSERVERS'] if row and row[0].isdigit()})[:20]
+    if not observers:
+        print('No observer records in resources/halobeo.csv')
+        return 1
+    app.config['OBSERVATIONS'] = synthetic_observations(observers)
+    app.config['LOADED_FILE'] = 'synthetic.csv'
+    observations_changed(app.config)
+
+    # English responses computed alone
+    urls = [url.format(mm=mm, jj=jj) for jj in (4, 5) for mm in (1, 7, 12) for url in ENGLISH_URLS]
+    english = session_client(app, 'en')
+    expected = {url: english.get(url).get_data() for url in urls}
+
+    # English requests while a German warm-up runs
+    warm_up_statistics(app, 'de')
+    warmup = next(t for t in threading.enumerate() if t.name == 'halo-warmup')
+    failures = []
+    counts = []
+
+    def request_english():
+        client = session_client(app, 'en')
+        count = 0
+        while warmup.is_alive():
+            for url in urls:
+                count += 1
+                if client.get(url).get_data() != expected[url]:
+                    failures.append(url)
+                time.sleep(PAUSE)
+        counts.append(count)
+
+    threads = [threading.Thread(target=request_english) for _ in range(ENGLISH_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads + [warmup]:
+        thread.join()
+    print(f'English responses during the warm-up: {sum(counts)}, wrong: {len(failures)}')
+    for url in sorted(set(failures)):
+        print(f'  {url}')
+
+    # German charts of the warm-up, served from the chart cache
+    german = session_client(app, 'de')
+    de = get_language_i18n('de')
+    wrong_charts = []
+    checked = 0
+    for jj in (4, 5):
+        annual = german.get(f'/api/annual-stats?jj={jj}').get_json()
+        for graph in ('linegraph', 'bargraph'):
+            cached = german.get(f'/api/annual-stats?jj={jj}&format={graph}').get_data()
+            checked += 1
+            if cached != charts.render(app.config, f'annual_{graph}', annual, jj, de, {}):
+                wrong_charts.append(f'annual {graph} {jj:02d}')
+        for mm in range(1, 13):
+            monthly = german.get(f'/api/monthly-stats?mm={mm}&jj={jj}').get_json()
+            for graph in ('linegraph', 'bargraph'):
+                cached = german.get(f'/api/monthly-stats?mm={mm}&jj={jj}&format={graph}').get_data()
+                checked += 1
+                if cached != charts.render(app.config, f'monthly_{graph}', monthly, mm, jj, de, {}):
+                    wrong_charts.append(f'monthly {graph} {mm:02d}/{jj:02d}')
+    print(f'German charts checked: {checked}, wrong: {len(wrong_charts)}')
+    for chart in wrong_charts:
+        print(f'  {chart}')
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    return 1 if failures or wrong_charts else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
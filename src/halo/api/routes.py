@@ -6,14 +6,26 @@ Licensed under MIT License - see LICENSE file for details.
 
 from flask import Blueprint, jsonify, request, current_app, Response
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import math
-import io
+import json
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # Non-interactive backend
-import matplotlib.pyplot as plt
+from halo import __version__
 from halo.io.csv_handler import ObservationCSV
+from halo.io.key_format import KeyLineReader, format_key_line, iter_key_text
+from halo.resources.i18n import get_language_i18n
+from halo.services import charts
+from halo.services.chart_cache import digest as chart_digest, get_chart_cache
+from halo.services.dataset import (
+    ObservationTable, get_observation_table, observations_changed, observations_key, observers_key
+)
+from halo.services.derived_columns import get_column
+from halo.services.grouping import MISSING, count_cells, count_keys, cross_count_keys, parameter_keys, sparse_cross_tab
+from halo.services.jobs import DONE, JobStoreFull, get_job_manager, report_progress
+from halo.services.query import QueryPlan, compile_match, compile_range, compile_selection
+from halo.services.result_cache import get_result_cache
+from halo.services.warmup import start_warmup, warmup_requests
+from halo.services.observer_registry import get_observer_registry, month_value, observer_updated, seit_value
 
 api_blueprint = Blueprint('api', __name__, url_prefix='/api')
 
@@ -73,33 +85,179 @@ def calculate_solar_altitude(
     return round(altitude_deg)
 
 
-def get_observer_coordinates(observer_record: dict, gg: int) -> tuple[float, float]:
-    """Extract observer's latitude and longitude from observer record."""
-    if gg == 0:
-        lon_deg = int(observer_record.get('HLG', 0) or 0)
-        lon_min = int(observer_record.get('HLM', 0) or 0)
-        lon_ew = observer_record.get('HOW', 'O')
-        lat_deg = int(observer_record.get('HBG', 0) or 0)
-        lat_min = int(observer_record.get('HBM', 0) or 0)
-        lat_ns = observer_record.get('HNS', 'N')
-    elif gg == 2:
-        lon_deg = int(observer_record.get('NLG', 0) or 0)
-        lon_min = int(observer_record.get('NLM', 0) or 0)
-        lon_ew = observer_record.get('NOW', 'O')
-        lat_deg = int(observer_record.get('NBG', 0) or 0)
-        lat_min = int(observer_record.get('NBM', 0) or 0)
-        lat_ns = observer_record.get('NNS', 'N')
+def calculate_solar_altitude_array(
+    year, month, day, hour, minute, duration, longitude, latitude, altitude_type: str = 'mean'
+) -> np.ndarray:
+    """Vectorized calculate_solar_altitude() for arrays of observations.
+
+    Evaluates the same formulas in the same order, so the rounded results are
+    identical. Values within rounding distance of .5 (where the last bit of
+    NumPy's and libm's trigonometric functions could decide) are recomputed
+    with the scalar version.
+    """
+    year = np.asarray(year, dtype=np.int64)
+    month = np.asarray(month, dtype=np.int64)
+    day = np.asarray(day, dtype=np.int64)
+    hour = np.asarray(hour, dtype=np.int64)
+    minute = np.asarray(minute, dtype=np.int64)
+    duration = np.asarray(duration, dtype=np.int64)
+    longitude = np.asarray(longitude, dtype=float)
+    latitude = np.asarray(latitude, dtype=float)
+
+    jahr = 1900 + year
+    jahr = np.where(jahr < 1950, jahr + 100, jahr)
+
+    n = (np.trunc(275 / 9 * month) -
+         np.trunc((month + 9) / 12) *
+         (1 + np.trunc((jahr - 4 * np.trunc(jahr / 4) + 2) / 3)) +
+         day - 30)
+    jd0 = np.where(
+        month > 2,
+        np.trunc(30.6001 * (month + 1)) + np.trunc(365.25 * jahr),
+        np.trunc(30.6001 * (month + 13)) + np.trunc(365.25 * (jahr - 1))
+    )
+    jd0 = jd0 + 1720994.5 + 2 - np.trunc(jahr / 100) + np.trunc(jahr / 400) + day
+
+    def calc_altitude_at_time(zeit):
+        zeit = np.mod(zeit, 24)
+        t = n + (zeit - longitude / 15.0) / 24.0
+        m = 0.985600 * t - 3.289
+        l = m + 1.916 * np.sin(m * math.pi / 180.0) + 0.020 * np.sin(2 * m * math.pi / 180.0) + 282.634
+        l = np.mod(l, 360)
+        al = 180 * np.arctan(0.91746 * np.sin(l * math.pi / 180.0) / np.cos(l * math.pi / 180.0)) / math.pi
+        al = np.where((l > 90) & (l < 270), al + 180, al)
+        de = 180 * np.arcsin(0.39782 * np.sin(l * math.pi / 180.0)) / math.pi
+        jd = jd0 + zeit / 24.0
+        t2 = (jd - 2451545) / 36525.0
+        st0 = 6.697375 + 2400.051337 * t2 + 0.0000359 * t2 * t2
+        st = st0 + longitude / 15.0 + 1.002737909 * (zeit - 1)
+        sw = np.mod(15 * st - al, 360)
+        altitude_rad = np.arcsin(
+            np.sin(latitude * math.pi / 180.0) * np.sin(de * math.pi / 180.0) +
+            np.cos(sw * math.pi / 180.0) * np.cos(de * math.pi / 180.0) * np.cos(latitude * math.pi / 180.0)
+        )
+        return altitude_rad / math.pi * 180.0
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        time_start = hour + minute / 60.0
+        if altitude_type == 'mean':
+            altitude_deg = calc_altitude_at_time(time_start + duration / 120.0)
+        else:
+            altitude_start = calc_altitude_at_time(time_start)
+            altitude_end = calc_altitude_at_time(time_start + duration / 60.0)
+            if altitude_type == 'min':
+                altitude_deg = np.minimum(altitude_start, altitude_end)
+            else:
+                altitude_deg = np.maximum(altitude_start, altitude_end)
+
+        result = np.rint(altitude_deg)
+        ambiguous = ~(np.abs(np.abs(altitude_deg - np.floor(altitude_deg)) - 0.5) > 1e-6)
+
+    result = np.where(ambiguous, 0, result).astype(np.int64)
+    for i in np.flatnonzero(ambiguous):
+        result[i] = calculate_solar_altitude(
+            int(year[i]), int(month[i]), int(day[i]), int(hour[i]), int(minute[i]), int(duration[i]),
+            float(longitude[i]), float(latitude[i]), altitude_type
+        )
+    return result
+
+
+def _julian_day_array(year, month, day):
+    """Julian day at 0h UT for arrays of 4-digit years, months and days."""
+    y = np.where(month <= 2, year - 1, year)
+    m = np.where(month <= 2, month + 12, month)
+    a = np.floor(y / 100)
+    b = 2 - a + np.floor(a / 4)
+    return np.floor(365.25 * (y + 4716)) + np.floor(30.6001 * (m + 1)) + day + b - 1524.5
+
+
+def _moon_position(jd, longitude, latitude):
+    """Topocentric moon altitude (degrees) and illuminated fraction at Julian day jd.
+
+    Low-precision lunar theory of the Astronomical Almanac (about 0.3° in
+    ecliptic longitude, 0.2° in latitude), low-precision solar longitude for
+    the phase.
+    """
+    rad = np.radians
+    d = jd - 2451545.0
+    t = d / 36525.0
+
+    lam = (218.32 + 481267.881 * t
+           + 6.29 * np.sin(rad(135.0 + 477198.87 * t))
+           - 1.27 * np.sin(rad(259.3 - 413335.36 * t))
+           + 0.66 * np.sin(rad(235.7 + 890534.22 * t))
+           + 0.21 * np.sin(rad(269.9 + 954397.74 * t))
+           - 0.19 * np.sin(rad(357.5 + 35999.05 * t))
+           - 0.11 * np.sin(rad(186.5 + 966404.03 * t)))
+    beta = (5.13 * np.sin(rad(93.3 + 483202.02 * t))
+            + 0.28 * np.sin(rad(228.2 + 960400.89 * t))
+            - 0.28 * np.sin(rad(318.3 + 6003.15 * t))
+            - 0.17 * np.sin(rad(217.6 - 407332.21 * t)))
+    parallax = (0.9508
+                + 0.0518 * np.cos(rad(135.0 + 477198.87 * t))
+                + 0.0095 * np.cos(rad(259.3 - 413335.36 * t))
+                + 0.0078 * np.cos(rad(235.7 + 890534.22 * t))
+                + 0.0028 * np.cos(rad(269.9 + 954397.74 * t)))
+
+    # Ecliptic -> equatorial coordinates
+    lam_r, beta_r = rad(lam), rad(beta)
+    eps = rad(23.439 - 0.0000004 * d)
+    ra = np.arctan2(np.sin(lam_r) * np.cos(eps) - np.tan(beta_r) * np.sin(eps), np.cos(lam_r))
+    dec = np.arcsin(np.sin(beta_r) * np.cos(eps) + np.cos(beta_r) * np.sin(eps) * np.sin(lam_r))
+
+    # Geocentric altitude from the local hour angle, then parallax correction
+    gmst = 280.46061837 + 360.98564736629 * d
+    hour_angle = rad(gmst + longitude) - ra
+    lat_r = rad(latitude)
+    sin_alt = np.sin(lat_r) * np.sin(dec) + np.cos(lat_r) * np.cos(dec) * np.cos(hour_angle)
+    altitude = np.arcsin(np.clip(sin_alt, -1.0, 1.0))
+    altitude = altitude - np.arcsin(np.sin(rad(parallax)) * np.cos(altitude))
+
+    # Illuminated fraction from the elongation of moon and sun
+    mean_longitude = 280.460 + 0.9856474 * d
+    anomaly = rad(357.528 + 0.9856003 * d)
+    sun_lam = rad(mean_longitude + 1.915 * np.sin(anomaly) + 0.020 * np.sin(2 * anomaly))
+    cos_elongation = np.cos(beta_r) * np.cos(lam_r - sun_lam)
+    fraction = (1 - cos_elongation) / 2
+
+    return np.degrees(altitude), fraction
+
+
+def calculate_lunar_position_array(
+    year, month, day, hour, minute, duration, longitude, latitude, altitude_type: str = 'mean'
+):
+    """Moon altitude and illuminated fraction for arrays of observations.
+
+    Takes the same arguments as calculate_solar_altitude_array() (2-digit
+    years, CET times, duration in minutes, east longitude). The illuminated
+    fraction is taken at the middle of the observation.
+
+    Returns:
+        Tuple (altitude in degrees as integers, illuminated fraction 0-1)
+    """
+    year = np.asarray(year, dtype=np.int64)
+    month = np.asarray(month, dtype=np.int64)
+    day = np.asarray(day, dtype=np.int64)
+    longitude = np.asarray(longitude, dtype=float)
+    latitude = np.asarray(latitude, dtype=float)
+
+    jd0 = _julian_day_array(np.where(year < 50, year + 2000, year + 1900), month, day)
+    # Observation times are CET (UT + 1)
+    time_start = np.asarray(hour, dtype=float) + np.asarray(minute, dtype=float) / 60.0 - 1
+    duration = np.asarray(duration, dtype=float)
+
+    altitude_mid, fraction = _moon_position(jd0 + (time_start + duration / 120.0) / 24.0, longitude, latitude)
+    if altitude_type == 'mean':
+        altitude_deg = altitude_mid
     else:
-        return (0.0, 0.0)
-    
-    longitude = lon_deg + lon_min / 60.0
-    if lon_ew == 'W':
-        longitude = -longitude
-    latitude = lat_deg + lat_min / 60.0
-    if lat_ns == 'S':
-        latitude = -latitude
-    
-    return longitude, latitude
+        altitude_start, _ = _moon_position(jd0 + time_start / 24.0, longitude, latitude)
+        altitude_end, _ = _moon_position(jd0 + (time_start + duration / 60.0) / 24.0, longitude, latitude)
+        if altitude_type == 'min':
+            altitude_deg = np.minimum(altitude_start, altitude_end)
+        else:
+            altitude_deg = np.maximum(altitude_start, altitude_end)
+
+    return np.rint(altitude_deg).astype(np.int64), fraction
 
 
 def get_days_in_month(month: int, year: int) -> int:
@@ -398,6 +556,7 @@ def add_observation() -> Dict[str, Any]:
         
         observations.insert(insert_pos, obs)
         current_app.config['OBSERVATIONS'] = observations
+        observations_changed(current_app.config)
         current_app.config['DIRTY'] = True
 
         return jsonify({'success': True, 'count': len(observations)})
@@ -431,6 +590,7 @@ def delete_observation() -> Dict[str, Any]:
         if original_obs is not None:
             observations.pop(original_obs)
             current_app.config['OBSERVATIONS'] = observations
+            observations_changed(current_app.config)
             current_app.config['DIRTY'] = True
             return jsonify({'success': True, 'deleted': True, 'count': len(observations)})
         else:
@@ -524,7 +684,6 @@ def filter_observations() -> Dict[str, Any]:
     
     try:
         params = request.get_json()
-        filter_type = params.get('filter_type')
         action = params.get('action', 'keep')
         
         # Load current observations from session
@@ -532,79 +691,18 @@ def filter_observations() -> Dict[str, Any]:
         if not observations:
             return jsonify({'error': 'No observations loaded'}), 400
         
-        # Load observers for SH filtering (already loaded in app config)
-        observers_list = current_app.config.get('OBSERVERS', [])
-        
-        # Filter observations based on type
-        matching_obs = []
-        
-        if filter_type == 'KK':
-            value = int(params.get('value'))
-            matching_obs = [obs for obs in observations if obs.KK == value]
-            
-        elif filter_type == 'MM':
-            month = int(params.get('month'))
-            year = int(params.get('year'))
-            year_2digit = year % 100  # Convert to 2-digit
-            matching_obs = [obs for obs in observations if obs.MM == month and obs.JJ == year_2digit]
-            
-        elif filter_type == 'TT':
-            day = int(params.get('day'))
-            month = int(params.get('month'))
-            year = int(params.get('year'))
-            year_2digit = year % 100  # Convert to 2-digit
-            matching_obs = [obs for obs in observations if obs.TT == day and obs.MM == month and obs.JJ == year_2digit]
-            
-        elif filter_type == 'ZZ':
-            from_hour = int(params.get('from_hour'))
-            from_minute = int(params.get('from_minute'))
-            to_hour = int(params.get('to_hour'))
-            to_minute = int(params.get('to_minute'))
-            from_time = from_hour * 60 + from_minute
-            to_time = to_hour * 60 + to_minute
-            for obs in observations:
-                if obs.ZS is not None and obs.ZS != -1 and obs.ZM is not None and obs.ZM != -1:
-                    obs_time = obs.ZS * 60 + obs.ZM
-                    if from_time <= obs_time <= to_time:
-                        matching_obs.append(obs)
-                        
-        elif filter_type == 'SH':
-            sh_from = int(params.get('from', -90))
-            sh_to = int(params.get('to', 90))
-            sh_time = params.get('sh_time', 'mean')
-            for obs in observations:
-                altitude = _calculate_observation_solar_altitude(obs, observers_list, sh_time)
-                if altitude is not None and sh_from <= altitude <= sh_to:
-                    matching_obs.append(obs)
-        
-        elif filter_type == 'JJ':
-            # Year - convert 4-digit to 2-digit
-            value = int(params.get('value'))
-            year_2digit = value % 100
-            matching_obs = [obs for obs in observations if obs.JJ == year_2digit]
-                    
-        else:
-            # Simple value match for other parameters (GG, O, EE, DD, N, C, H, F, V)
-            value = int(params.get('value'))
-            attr = filter_type
-            # DEBUG: Log filter matching
-            print(f"🔍 DEBUG: Filtering by {attr}={value}")
-            print(f"🔍 DEBUG: Total observations: {len(observations)}")
-            for obs in observations:
-                obs_value = getattr(obs, attr, None)
-                # DEBUG: Show first few observations
-                if len(matching_obs) < 5:
-                    print(f"🔍 DEBUG: obs.KK={obs.KK} obs.{attr}={obs_value} match={obs_value == value}")
-                if obs_value == value:
-                    matching_obs.append(obs)
-            # DEBUG: Summary
-            print(f"🔍 DEBUG: Found {len(matching_obs)} matching observations")
+        # Compile the selection and run it over all observations
+        plan = QueryPlan([compile_selection(params)])
+        table, rows = _table_rows(observations)
+        selected = plan.select(observations, table, rows, _computed_values)
         
         # Apply action (keep or delete)
         if action == 'keep':
-            filtered_obs = matching_obs
+            filtered_obs = [observations[i] for i in selected]
         else:  # action == 'delete'
-            filtered_obs = [obs for obs in observations if obs not in matching_obs]
+            keep = np.ones(len(observations), dtype=bool)
+            keep[selected] = False
+            filtered_obs = [obs for obs, kept in zip(observations, keep) if kept]
         
         kept_count = len(filtered_obs)
         deleted_count = len(observations) - kept_count
@@ -633,6 +731,54 @@ def filter_observations() -> Dict[str, Any]:
         return jsonify({'error': str(e)}), 500
 
 
+@api_blueprint.route('/export', methods=['GET'])
+def export_observations():
+    """Download the loaded observations in the HALO key format.
+    
+    Query parameters:
+        format: 'key' (HALO key lines KKOJJ MMTTg ZZZZd DDNCc EEHFV fzzGG 8HHHH,
+                followed by sectors and remarks)
+        filter_type, value, ...: Optional selection as for /observations/filter
+                                 (only the matching observations are exported)
+        action: 'keep' (default) or 'delete' the selected observations
+    
+    The lines are formatted and streamed in chunks, so the memory use does
+    not grow with the size of the file.
+    """
+    from flask import current_app, stream_with_context
+    
+    output_format = request.args.get('format', 'key').lower()
+    if output_format != 'key':
+        return jsonify({'error': f'Invalid format: {output_format}. Use key.'}), 400
+    action = request.args.get('action', 'keep').lower()
+    if action not in ('keep', 'delete'):
+        return jsonify({'error': f'Invalid action: {action}. Use keep or delete.'}), 400
+    
+    observations = current_app.config.get('OBSERVATIONS') or []
+    if not observations:
+        return jsonify({'error': 'No observations loaded'}), 400
+    
+    exported = observations
+    if request.args.get('filter_type'):
+        try:
+            plan = QueryPlan([compile_selection(request.args.to_dict())])
+        except (ValueError, TypeError) as e:
+            return jsonify({'error': f'Invalid parameters: {e}'}), 400
+        table, rows = _table_rows(observations)
+        selected = plan.select(observations, table, rows, _computed_values)
+        if action == 'keep':
+            exported = (observations[i] for i in selected.tolist())
+        else:
+            keep = np.ones(len(observations), dtype=bool)
+            keep[selected] = False
+            exported = (obs for obs, kept in zip(observations, keep.tolist()) if kept)
+    
+    loaded_file = current_app.config.get('LOADED_FILE') or 'halo'
+    response = Response(stream_with_context(iter_key_text(exported)), content_type='text/plain; charset=utf-8')
+    response.headers['Content-Disposition'] = f'attachment; filename={Path(loaded_file).stem}.txt'
+    return response
+
+
 @api_blueprint.route('/statistics', methods=['GET'])
 def get_statistics() -> Dict[str, Any]:
     """
@@ -737,6 +883,7 @@ def new_file() -> Dict[str, Any]:
         
         current_app.config['LOADED_FILE'] = filename
         current_app.config['OBSERVATIONS'] = []
+        observations_changed(current_app.config)
         current_app.config['DIRTY'] = False
         
         return jsonify({
@@ -786,7 +933,9 @@ def load_file_from_browser() -> Dict[str, Any]:
             # Store in app config
             current_app.config['LOADED_FILE'] = file.filename
             current_app.config['OBSERVATIONS'] = observations
+            observations_changed(current_app.config)
             current_app.config['DIRTY'] = False
+            warm_up_statistics(current_app._get_current_object())
             
             return jsonify({
                 'success': True,
@@ -832,45 +981,116 @@ def merge_file() -> Dict[str, Any]:
         # Parse CSV directly from memory
         new_observations = ObservationCSV.read_observations_from_stream(file_object)
         
-        # Get currently loaded observations
-        current_observations = current_app.config.get('OBSERVATIONS', [])
-        
-        # Create a set of existing observation keys for duplicate detection
-        # Key format: KK-O-JJ-MM-TT-EE-GG (matches observation unique identifier)
-        existing_keys = set()
-        for obs in current_observations:
-            key = f"{obs.KK}-{obs.O}-{obs.JJ:02d}-{obs.MM:02d}-{obs.TT:02d}-{obs.EE:02d}-{obs.GG:02d}"
-            existing_keys.add(key)
-        
-        # Add observations from new file that don't already exist
-        added_count = 0
-        for obs in new_observations:
-            key = f"{obs.KK}-{obs.O}-{obs.JJ:02d}-{obs.MM:02d}-{obs.TT:02d}-{obs.EE:02d}-{obs.GG:02d}"
-            if key not in existing_keys:
-                current_observations.append(obs)
-                existing_keys.add(key)
-                added_count += 1
-        
-        # Sort observations using spaeter() equivalent
-        from functools import cmp_to_key
-        current_observations = sorted(current_observations, key=cmp_to_key(_spaeter))
-        
-        # Update app config
-        current_app.config['OBSERVATIONS'] = current_observations
-        # Mark as dirty only if at least one observation was added
-        if added_count > 0:
-            current_app.config['DIRTY'] = True
+        added_count = _merge_observations(new_observations)
         
         return jsonify({
             'success': True,
             'added_count': added_count,
-            'total_count': len(current_observations),
+            'total_count': len(current_app.config['OBSERVATIONS']),
             'message': f'{added_count} neue Beobachtungen hinzugefügt!'
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def _merge_observations(new_observations) -> int:
+    """Add observations to the loaded ones, skipping duplicates (Datei -> Verbinden).
+    
+    An observation is a duplicate if one with the same KK, O, JJ, MM, TT, EE
+    and GG is loaded or was added before. The observations are consumed one
+    by one, so new_observations may be a generator. They are added to a copy
+    of the loaded observations, which replaces them (sorted in spaeter()
+    order) only after new_observations is exhausted.
+    
+    Returns:
+        Number of observations added
+    """
+    from flask import current_app
+    
+    # Get currently loaded observations
+    current_observations = current_app.config.get('OBSERVATIONS', [])
+    
+    # Create a set of existing observation keys for duplicate detection
+    # Key format: KK-O-JJ-MM-TT-EE-GG (matches observation unique identifier)
+    existing_keys = set()
+    for obs in current_observations:
+        key = f"{obs.KK}-{obs.O}-{obs.JJ:02d}-{obs.MM:02d}-{obs.TT:02d}-{obs.EE:02d}-{obs.GG:02d}"
+        existing_keys.add(key)
+    
+    # Add observations from new file that don't already exist
+    merged = list(current_observations)
+    added_count = 0
+    for obs in new_observations:
+        key = f"{obs.KK}-{obs.O}-{obs.JJ:02d}-{obs.MM:02d}-{obs.TT:02d}-{obs.EE:02d}-{obs.GG:02d}"
+        if key not in existing_keys:
+            merged.append(obs)
+            existing_keys.add(key)
+            added_count += 1
+    
+    # Sort observations in spaeter() order (stable, equal keys keep their order)
+    sort_key = get_column(ObservationTable(merged), 'sort_key')
+    merged = [merged[i] for i in np.argsort(sort_key, kind='stable')]
+    
+    # Replace the loaded observations at once
+    current_app.config['OBSERVATIONS'] = merged
+    observations_changed(current_app.config)
+    # Mark as dirty only if at least one observation was added
+    if added_count > 0:
+        current_app.config['DIRTY'] = True
+    warm_up_statistics(current_app._get_current_object())
+    return added_count
+
+
+@api_blueprint.route('/file/import_key', methods=['POST'])
+def import_key_file() -> Dict[str, Any]:
+    """Import observations from HALO key-format text files into the loaded file.
+    
+    Accepts one or more uploaded files ('file') and/or pasted key lines
+    ('text', form field or JSON). Each line is one observation in the key
+    format of /export?format=key (KKOJJ MMTTg ZZZZd DDNCc EEHFV fzzGG 8HHHH,
+    then sectors and remarks; the groups may also be typed without spaces).
+    Empty lines are skipped; other lines that are no key lines are reported
+    in invalid_lines. Duplicates are skipped as in /file/merge.
+    """
+    from flask import current_app
+    
+    if not current_app.config.get('LOADED_FILE'):
+        return jsonify({'error': 'No file loaded. Please load a file first.'}), 400
+    
+    files = [f for f in request.files.getlist('file') if f.filename]
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+    text = request.form.get('text') or data.get('text') or ''
+    if not isinstance(text, str):
+        return jsonify({'error': 'text must be a string'}), 400
+    if not files and not text.strip():
+        return jsonify({'error': 'No file or text provided'}), 400
+    
+    reader = KeyLineReader()
+    
+    def observations():
+        # Line numbers count on across all files and the text
+        for file in files:
+            yield from reader.read(file.stream)
+        yield from reader.read(text.splitlines())
+    
+    try:
+        added_count = _merge_observations(observations())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({
+        'success': True,
+        'added_count': added_count,
+        'line_count': reader.line_count,
+        'invalid_count': len(reader.invalid_lines),
+        'invalid_lines': reader.invalid_lines[:100],
+        'total_count': len(current_app.config['OBSERVATIONS']),
+        'message': f'{added_count} neue Beobachtungen hinzugefügt!'
+    })
+
+
 @api_blueprint.route('/file/load/<filename>', methods=['GET', 'POST'])
 def load_file(filename: str) -> Dict[str, Any]:
     """Load observation file from data folder - implements 'Datei -> Laden' from HALO.PAS laden()
@@ -898,7 +1118,9 @@ def load_file(filename: str) -> Dict[str, Any]:
         # Store in app config
         current_app.config['LOADED_FILE'] = filename
         current_app.config['OBSERVATIONS'] = observations
+        observations_changed(current_app.config)
         current_app.config['DIRTY'] = False
+        warm_up_statistics(current_app._get_current_object())
         
         return jsonify({
             'success': True,
@@ -1089,6 +1311,7 @@ def download_file() -> Dict[str, Any]:
         observations = []
         
         current_app.config['OBSERVATIONS'] = observations
+        observations_changed(current_app.config)
         current_app.config['LOADED_FILE'] = filename
         current_app.config['DIRTY'] = True
         
@@ -1210,6 +1433,7 @@ def restore_autosave() -> Dict[str, Any]:
         
         # Store in app config
         current_app.config['OBSERVATIONS'] = observations
+        observations_changed(current_app.config)
         
         # Set original filename (without .$$$)
         original_name = os.path.splitext(temp_filename)[0] + '.CSV'
@@ -1461,6 +1685,43 @@ def active_observers_setting() -> Dict[str, Any]:
         return jsonify({'enabled': enabled})
 
 
+@api_blueprint.route('/config/warmup', methods=['GET', 'POST'])
+def warmup_setting() -> Dict[str, Any]:
+    """Get or set the cache warm-up setting.
+    
+    With warm-up enabled, the annual statistics of all years and the monthly
+    statistics of the most recent months (with their charts) are computed in
+    the background after every file load.
+    """
+    from flask import current_app, request
+    
+    if request.method == 'POST':
+        data = request.get_json() or {}
+        enabled = bool(data.get('enabled', False))
+        try:
+            months = max(0, int(data.get('months', current_app.config.get('WARMUP_MONTHS', 12))))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'months must be a number'}), 400
+        
+        # Persist settings
+        from pathlib import Path
+        root_path = Path(__file__).parent.parent.parent.parent
+        from halo.services.settings import Settings
+        current_app.config['WARMUP_ENABLED'] = enabled
+        Settings.save_key(current_app.config, root_path, 'WARMUP_MONTHS', months)
+        
+        return jsonify({
+            'success': True,
+            'enabled': enabled,
+            'months': months
+        })
+    else:
+        return jsonify({
+            'enabled': bool(current_app.config.get('WARMUP_ENABLED', False)),
+            'months': current_app.config.get('WARMUP_MONTHS', 12)
+        })
+
+
 @api_blueprint.route('/config/startup_file', methods=['GET', 'POST'])
 def startup_file_setting() -> Dict[str, Any]:
     """Get or set the startup file setting.
@@ -1503,106 +1764,9 @@ def startup_file_setting() -> Dict[str, Any]:
 def _kurzausgabe(obs) -> str:
     """Format observation as HALO key string (short format).
     
-    Ported from monthly_report.js kurzausgabe() function.
-    Special values: -1 = ' ' (not observed), -2 = '/' (not present)
+    Ported from monthly_report.js kurzausgabe() function; see halo.io.key_format.
     """
-    first = ''
-    
-    # KK - observer code
-    if obs.KK < 100:
-        first += str(obs.KK // 10) + str(obs.KK % 10)
-    else:
-        first += chr((obs.KK // 10) + 55) + str(obs.KK % 10)
-    
-    # O, JJ, MM, TT, g
-    first += str(obs.O)
-    first += str(obs.JJ // 10) + str(obs.JJ % 10)
-    first += str(obs.MM // 10) + str(obs.MM % 10)
-    first += str(obs.TT // 10) + str(obs.TT % 10)
-    first += str(obs.g)
-    
-    # ZS, ZM - handle -1 (space) and 0 (/) for HO/HU
-    def fmt2(val):
-        """Format 2-digit field: -1→'  ', 0→'//' (for HO/HU), else number"""
-        if val == -1:
-            return '  '  # Not observed
-        elif val == 0:
-            return '//'  # Not relevant/present (for HO/HU)
-        else:
-            return str(val // 10) + str(val % 10)
-    
-    first += fmt2(obs.ZS)
-    first += fmt2(obs.ZM)
-    
-    # d - single digit field
-    def fmt1(val):
-        """Format 1-digit field: -1→' ', else number"""
-        if val == -1:
-            return ' '  # Not observed
-        else:
-            return str(val)
-    
-    first += fmt1(obs.d)
-    first += fmt2(obs.DD)
-    
-    # N, C, c
-    first += fmt1(obs.N)
-    first += fmt1(obs.C)
-    first += fmt1(obs.c)
-    
-    # EE
-    first += str(obs.EE // 10) + str(obs.EE % 10)
-    
-    # H, F, V
-    first += fmt1(obs.H)
-    first += fmt1(obs.F)
-    first += fmt1(obs.V)
-    
-    # f, zz, GG
-    first += fmt1(obs.f)
-    
-    # zz special: 99 means '//', -1 means '  ', -2 means '//'
-    if obs.zz == 99:
-        first += '//'
-    else:
-        first += fmt2(obs.zz)
-    
-    gg = obs.GG if obs.GG != -1 else 0
-    first += str(gg // 10) + str(gg % 10)
-    
-    # Add spaces after every 5 characters
-    erg = ''
-    for i in range(0, len(first), 5):
-        chunk = first[i:i+5]
-        if chunk:
-            erg += chunk
-            if len(chunk) == 5:
-                erg += ' '
-    
-    # 8HHHH - light pillar (HO=0 or HU=0 formatted as '//')
-    if obs.EE == 8:
-        ho_str = fmt2(obs.HO)
-        erg += '8' + ho_str + '//'
-    elif obs.EE == 9:
-        hu_str = fmt2(obs.HU)
-        erg += '8//' + hu_str
-    elif obs.EE == 10:
-        ho_str = fmt2(obs.HO)
-        hu_str = fmt2(obs.HU)
-        erg += '8' + ho_str + hu_str
-    else:
-        erg += '/////'
-    
-    # Add sectors and remarks - total line must be exactly 69 chars + sectors + remarks
-    erg += ' '
-    sectors = getattr(obs, 'sectors', '')
-    sectors = sectors.replace('\r', ' ').replace('\n', ' ')[:15].ljust(15)
-    erg += sectors + ' '
-    remarks = getattr(obs, 'remarks', '')
-    remarks = remarks.replace('\r', ' ').replace('\n', ' ').ljust(60)
-    erg += remarks
-    
-    return erg
+    return format_key_line(obs)
 
 
 def _format_monthly_report_text(data: Dict[str, Any], i18n) -> str:
@@ -1803,6 +1967,11 @@ def get_monthly_report() -> Dict[str, Any]:
         mm: Month 1-12 (required)
         jj: Year 0-99 (required)
     """
+    return _monthly_report_response(request.args, _request_i18n())
+
+
+def _monthly_report_response(args, i18n):
+    """Response of /monthly-report for the query parameters args, with the texts of i18n."""
     from flask import current_app
     
     # Check if observations are loaded
@@ -1810,9 +1979,9 @@ def get_monthly_report() -> Dict[str, Any]:
     if not observations:
         return jsonify({'error': 'No observations loaded. Please load a file first.'}), 400
     
-    kk = request.args.get('kk', '').strip()
-    mm = request.args.get('mm', '').strip()
-    jj = request.args.get('jj', '').strip()
+    kk = args.get('kk', '').strip()
+    mm = args.get('mm', '').strip()
+    jj = args.get('jj', '').strip()
     
     if not all([kk, mm, jj]):
         return jsonify({'error': 'Missing required parameters: kk, mm, jj'}), 400
@@ -1829,57 +1998,167 @@ def get_monthly_report() -> Dict[str, Any]:
     except ValueError:
         return jsonify({'error': 'Invalid numeric parameters'}), 400
     
-    # Filter observations for this observer and month
-    filtered_obs = [obs for obs in observations 
-                    if obs.KK == kk_int and obs.MM == mm_int and obs.JJ == jj_int]
+    data = _cached_result(
+        'monthly-report', {'kk': kk_int, 'mm': mm_int, 'jj': jj_int},
+        lambda: _monthly_report_data(kk_int, mm_int, jj_int), i18n.language
+    )
+    
+    # Check requested format
+    output_format = args.get('format', 'json').lower()
+    
+    if output_format in ['json', 'html']:
+        # JSON format and HTML format both return data; HTML is formatted client-side
+        return jsonify(data)
+    elif output_format in ['text', 'markdown']:
+        if output_format == 'text':
+            content = _format_monthly_report_text(data, i18n)
+            return Response(content, mimetype='text/plain; charset=utf-8')
+        elif output_format == 'markdown':
+            content = _format_monthly_report_markdown(data, i18n)
+            return Response(content, mimetype='text/markdown; charset=utf-8')
+    else:
+        return jsonify({'error': f'Invalid format: {output_format}. Use json, text, or markdown.'}), 400
+
+
+@api_blueprint.route('/monthly-report/all', methods=['GET'])
+def get_all_monthly_reports():
+    """Generate the monthly reports (Monatsmeldung) of all observers of a month.
+    
+    Query parameters:
+        mm: Month 1-12 (required)
+        jj: Year 0-99 (required)
+        format: Output format - 'json' (default), 'text', or 'markdown'
+        observers: 'observed' (default: observers with observations in the month)
+                   or 'active' (all observers with a record valid in the month,
+                   including empty reports; see ACTIVE_OBSERVERS_ONLY)
+        archive: 'zip' for one file per observer; otherwise text and markdown
+                 reports are streamed as one document (text reports separated
+                 by form feeds)
+    
+    The observers are taken from one pass over the observations of the month;
+    each report is built like /monthly-report (and shares its result cache).
+    """
+    return _all_monthly_reports_response(request.args, _request_i18n())
+
+
+def _all_monthly_reports_response(args, i18n):
+    """Response of /monthly-report/all for the query parameters args, with the texts of i18n."""
+    from flask import current_app, has_request_context, stream_with_context
+    
+    observations = current_app.config.get('OBSERVATIONS', [])
+    if not observations:
+        return jsonify({'error': 'No observations loaded. Please load a file first.'}), 400
+    
+    mm = args.get('mm', '').strip()
+    jj = args.get('jj', '').strip()
+    if not all([mm, jj]):
+        return jsonify({'error': 'Missing required parameters: mm, jj'}), 400
+    try:
+        mm_int = int(mm)
+        jj_int = int(jj)
+        if mm_int < 1 or mm_int > 12:
+            return jsonify({'error': 'Invalid month (1-12)'}), 400
+        if jj_int < 0 or jj_int > 99:
+            return jsonify({'error': 'Invalid year (0-99)'}), 400
+    except ValueError:
+        return jsonify({'error': 'Invalid numeric parameters'}), 400
+    
+    output_format = args.get('format', 'json').lower()
+    if output_format not in ('json', 'text', 'markdown'):
+        return jsonify({'error': f'Invalid format: {output_format}. Use json, text, or markdown.'}), 400
+    selection = args.get('observers', 'observed').lower()
+    if selection not in ('observed', 'active'):
+        return jsonify({'error': f'Invalid observers: {selection}. Use observed or active.'}), 400
+    archive = args.get('archive', '').lower()
+    if archive not in ('', 'zip'):
+        return jsonify({'error': f'Invalid archive: {archive}. Use zip.'}), 400
+    
+    # Observers of the month, from one pass over its observations
+    table = get_observation_table(current_app.config)
+    observers = {int(kk) for kk in np.unique(table['KK'][table.month_rows(jj_int, mm_int)])}
+    if selection == 'active':
+        active_observers = get_observer_registry(current_app.config).active_observers(
+            month_value(jj_int, mm_int), bool(current_app.config.get('ACTIVE_OBSERVERS_ONLY', False))
+        )
+        observers.update(int(kk) for kk in active_observers if kk.isdigit())
+    observers = sorted(observers)
+    
+    def report(kk_int):
+        return _cached_result(
+            'monthly-report', {'kk': kk_int, 'mm': mm_int, 'jj': jj_int},
+            lambda: _monthly_report_data(kk_int, mm_int, jj_int), i18n.language
+        )
+    
+    def formatted(data):
+        if output_format == 'text':
+            return _format_monthly_report_text(data, i18n)
+        if output_format == 'markdown':
+            return _format_monthly_report_markdown(data, i18n)
+        return json.dumps(data, ensure_ascii=False)
+    
+    if archive == 'zip':
+        import io
+        import zipfile
+        
+        month_short = i18n.get(f'months_short.{mm_int}').lower()
+        extension = {'json': '.json', 'text': '.txt', 'markdown': '.md'}[output_format]
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for i, kk_int in enumerate(observers):
+                zf.writestr(f'{kk_int:02d}-{month_short}{jj_int:02d}{extension}', formatted(report(kk_int)))
+                report_progress(i + 1, len(observers))
+        response = Response(buf.getvalue(), mimetype='application/zip')
+        response.headers['Content-Disposition'] = f'attachment; filename=monatsmeldungen_{mm_int:02d}{jj_int:02d}.zip'
+        return response
+    
+    if output_format == 'json':
+        reports = []
+        for i, kk_int in enumerate(observers):
+            reports.append(report(kk_int))
+            report_progress(i + 1, len(observers))
+        return jsonify({'mm': mm_int, 'jj': jj_int, 'count': len(reports), 'reports': reports})
+    
+    separator = '\f\n' if output_format == 'text' else '\n---\n\n'
+    
+    def generate():
+        for i, kk_int in enumerate(observers):
+            if i:
+                yield separator
+            yield formatted(report(kk_int))
+            report_progress(i + 1, len(observers))
+    
+    body = generate()
+    if has_request_context():
+        # Streamed to the client (a job collects the whole response)
+        body = stream_with_context(body)
+    mimetype = 'text/plain' if output_format == 'text' else 'text/markdown'
+    return Response(body, mimetype=f'{mimetype}; charset=utf-8')
+
+
+def _monthly_report_data(kk_int, mm_int, jj_int):
+    """Data of the monthly report (Monatsmeldung) of an observer, for all output formats."""
+    from halo.services.dataset import get_observation_table
+    
+    # Observations of this observer and month from the per-observer partition
+    table = get_observation_table(current_app.config)
+    first_day, last_day = table.month_days(jj_int + 2000 if jj_int < 50 else jj_int + 1900, mm_int)
+    filtered_obs = table.observer_observations(kk_int, first_day, last_day)
     
     # Sort by day and time
     filtered_obs.sort(key=lambda o: (o.TT, o.ZS if o.ZS != -1 else 0, o.ZM if o.ZM != -1 else 0))
     
     # Get observer info - find the record valid for this month/year
-    observers = current_app.config.get('OBSERVERS', [])
-    observer_name = ''
-    observer_hbort = ''
-    observer_nbort = ''
-    observer_gh = ''
-    observer_gn = ''
-    
-    # Create sortable seit value for this month/year: YYYYMM
-    obs_year = 1900 + jj_int if jj_int >= 50 else 2000 + jj_int
-    month_year_comparable = obs_year * 100 + mm_int
-    
-    # Find the observer record valid for this month/year
-    candidates = []
-    for obs_rec in observers:
-        if len(obs_rec) >= 21 and obs_rec[0] == kk:
-            try:
-                seit_parts = obs_rec[3].split('/')
-                seit_month = int(seit_parts[0])
-                seit_year_2digit = int(seit_parts[1])
-                seit_year = 1900 + seit_year_2digit if seit_year_2digit >= 50 else 2000 + seit_year_2digit
-                rec_seit_comparable = seit_year * 100 + seit_month
-                
-                if rec_seit_comparable <= month_year_comparable:
-                    candidates.append((rec_seit_comparable, obs_rec))
-            except (ValueError, IndexError):
-                pass
-    
-    if candidates:
-        # Use the record with the most recent seit date
-        candidates.sort(key=lambda x: x[0], reverse=True)
-        obs_rec = candidates[0][1]
-        
-        observer_name = f"{obs_rec[1]} {obs_rec[2]}"
-        observer_hbort = obs_rec[5]
-        observer_nbort = obs_rec[13]
-        # Get region indices - obs_rec[6] is GH, obs_rec[14] is GN
-        try:
-            gh_idx = int(obs_rec[6]) if obs_rec[6] else 0
-            gn_idx = int(obs_rec[14]) if obs_rec[14] else 0
-        except (ValueError, IndexError):
-            gh_idx = 0
-            gn_idx = 0
+    site = get_observer_registry(current_app.config).as_of(str(kk_int).zfill(2), month_value(jj_int, mm_int))
+    if site is not None:
+        observer_name = f"{site.vname} {site.nname}"
+        observer_hbort = site.home_site
+        observer_nbort = site.alt_site
+        gh_idx = site.home_region
+        gn_idx = site.alt_region
     else:
+        observer_name = ''
+        observer_hbort = ''
+        observer_nbort = ''
         gh_idx = 0
         gn_idx = 0
     
@@ -1935,25 +2214,7 @@ def get_monthly_report() -> Dict[str, Any]:
         'count': len(filtered_obs)
     }
     
-    # Check requested format
-    output_format = request.args.get('format', 'json').lower()
-    
-    if output_format in ['json', 'html']:
-        # JSON format and HTML format both return data; HTML is formatted client-side
-        return jsonify(data)
-    elif output_format in ['text', 'markdown']:
-        # Get i18n for formatting
-        from halo.resources.i18n import get_i18n
-        i18n = get_i18n()
-        
-        if output_format == 'text':
-            content = _format_monthly_report_text(data, i18n)
-            return Response(content, mimetype='text/plain; charset=utf-8')
-        elif output_format == 'markdown':
-            content = _format_monthly_report_markdown(data, i18n)
-            return Response(content, mimetype='text/markdown; charset=utf-8')
-    else:
-        return jsonify({'error': f'Invalid format: {output_format}. Use json, text, or markdown.'}), 400
+    return data
 
 
 
@@ -2369,7 +2630,12 @@ def get_monthly_stats() -> Dict[str, Any]:
     Query parameters:
         mm: Month 1-12 (required)
         jj: Year 0-99 (required)
-        format: Output format - 'json' (default), 'html', 'text', or 'markdown'
+        format: Output format - 'json' (default), 'html', 'text', 'markdown',
+                'linegraph', 'bargraph', 'chartspec' (chart description as JSON)
+                or 'bundle' (several formats in one response, see _bundle_response)
+        formats, archive: Formats and container of format=bundle
+        width, height, dpi: Image size in pixels and resolution (linegraph, bargraph)
+        image: Image format of linegraph/bargraph - 'png' (default) or 'svg'
     
     Returns observer overview table with:
     - Days 1-31 as columns
@@ -2380,19 +2646,21 @@ def get_monthly_stats() -> Dict[str, Any]:
     Note: Combined halo types (e.g., EE 04 = both 22° parhelia) are resolved to
     their individual components (EE 02 + EE 03) for statistical counting.
     """
+    return _monthly_stats_response(request.args, _request_i18n())
+
+
+def _monthly_stats_response(args, i18n):
+    """Response of /monthly-stats for the query parameters args, with the texts of i18n."""
     from flask import current_app, Response
-    from halo.models.constants import resolve_halo_type
     
     # Check if observations are loaded
     observations = current_app.config.get('OBSERVATIONS', [])
-    observers = current_app.config.get('OBSERVERS', [])
-    active_observers_only = bool(current_app.config.get('ACTIVE_OBSERVERS_ONLY', False))
     
     if not observations:
         return jsonify({'error': 'No observations loaded. Please load a file first.'}), 400
     
-    mm = request.args.get('mm', '').strip()
-    jj = request.args.get('jj', '').strip()
+    mm = args.get('mm', '').strip()
+    jj = args.get('jj', '').strip()
     
     if not all([mm, jj]):
         return jsonify({'error': 'Missing required parameters: mm, jj'}), 400
@@ -2408,39 +2676,72 @@ def get_monthly_stats() -> Dict[str, Any]:
     except ValueError:
         return jsonify({'error': 'Invalid numeric parameters'}), 400
     
+    data = _cached_result(
+        'monthly-stats', {'mm': mm_int, 'jj': jj_int}, lambda: _monthly_stats_data(mm_int, jj_int),
+        i18n.language
+    )
+    
+    def respond(output_format):
+        """Response of one output format."""
+        if output_format in ['json', 'html']:
+            # JSON format and HTML format both return data; HTML is formatted client-side
+            return jsonify(data)
+        elif output_format in ['text', 'markdown']:
+            # Get month name and formatted year for display
+            month_name = i18n.get(f'months.{mm_int}')
+            year = f"19{str(jj_int).zfill(2)}" if jj_int >= 50 else f"20{str(jj_int).zfill(2)}"
+            
+            if output_format == 'text':
+                content = _format_monthly_stats_text(data, month_name, year, i18n)
+                return Response(content, mimetype='text/plain; charset=utf-8')
+            elif output_format == 'markdown':
+                content = _format_monthly_stats_markdown(data, month_name, year, i18n)
+                return Response(content, mimetype='text/markdown; charset=utf-8')
+        elif output_format in ['linegraph', 'bargraph']:
+            # Generate line or bar chart (PNG, or SVG with image=svg)
+            try:
+                options = charts.image_options(args)
+            except ValueError as e:
+                return jsonify({'error': f'Invalid parameters: {e}'}), 400
+            return _chart_response(
+                f'monthly-{output_format}', {'mm': mm_int, 'jj': jj_int, **options}, data, i18n,
+                lambda i18n: charts.render(
+                    current_app.config, f'monthly_{output_format}', data, mm_int, jj_int, i18n, options
+                ),
+                options.get('image', 'png')
+            )
+        elif output_format == 'chartspec':
+            # Chart description for client-side rendering
+            return jsonify(charts.monthly_stats_spec(data, mm_int, jj_int, i18n))
+        else:
+            return jsonify({'error': f'Invalid format: {output_format}. Use json, text, markdown, linegraph, bargraph, chartspec, or bundle.'}), 400
+        
+    # Check requested format (a formats list without format selects the bundle)
+    output_format = args.get('format', 'bundle' if 'formats' in args else 'json').lower()
+    if output_format == 'bundle':
+        return _bundle_response(respond, args, f'monthly_stats_{2000 + jj_int if jj_int < 50 else 1900 + jj_int}_{mm_int:02d}')
+    return respond(output_format)
+
+
+def _monthly_stats_data(mm_int, jj_int, rows=None):
+    """Data of the monthly statistics (Monatsstatistik) of a month, for all output formats.
+    
+    rows are the rows of the month in the observation table, if already
+    known (see ObservationTable.year_month_rows).
+    """
+    from halo.models.constants import resolve_halo_type
+    from halo.services.dataset import get_observation_table
+    
+    active_observers_only = bool(current_app.config.get('ACTIVE_OBSERVERS_ONLY', False))
+    
     # Filter observations for this month
-    filtered_obs = [obs for obs in observations 
-                    if obs.MM == mm_int and obs.JJ == jj_int]
+    table = get_observation_table(current_app.config)
+    filtered_obs = table.subset(table.month_rows(jj_int, mm_int) if rows is None else rows)
     
     # Get all active observers at the end of this month/year (SEIT <= MMJJ)
-    # Build SEIT value for comparison using same formula as _parse_seit: mm + 13 * jj
-    month_year_value = mm_int + 13 * jj_int
-    
-    # Get unique active observers up to this month/year
-    active_observers = {}
-    for obs_record in observers:
-        kk = obs_record[0]  # Column 0: KK
-        seit_str = obs_record[3]  # Column 3: seit (MM/JJ format)
-        aktiv_str = obs_record[4]  # Column 4: aktiv (0 or 1)
-        
-        # Parse seit from "MM/JJ" to integer MMJJ
-        seit = _parse_seit(seit_str) if seit_str else 0
-        
-        # Parse aktiv to integer
-        try:
-            aktiv = int(aktiv_str) if aktiv_str else 0
-        except (ValueError, TypeError):
-            aktiv = 0
-        
-        # Observer is active if:
-        # 1. They started before or during this month (seit <= month_year_value)
-        # 2. If active_observers_only is True, they must be marked as active (aktiv == 1)
-        #    If active_observers_only is False, include all observers (matches Pascal: aktbeob<>'J')
-        if seit <= month_year_value:
-            if not active_observers_only or aktiv == 1:
-                # Keep the most recent record for each KK
-                if kk not in active_observers or seit > _parse_seit(active_observers[kk][3]):
-                    active_observers[kk] = obs_record
+    active_observers = get_observer_registry(current_app.config).active_observers(
+        month_value(jj_int, mm_int), active_observers_only
+    )
     
     # Build observer overview table
     # Structure: observer_data[KK] = {
@@ -2464,31 +2765,35 @@ def get_monthly_stats() -> Dict[str, Any]:
             'region': int(obs_record[6]) if obs_record[6] else 0  # Column 6: GH (home region)
         }
     
+    # Observations of this month per active observer (only active observers' data is used)
+    # taken from the per-observer partition of the observation table
+    first_day, last_day = table.month_days(jj_int + 2000 if jj_int < 50 else jj_int + 1900, mm_int)
+    observations_by_kk = {
+        kk: table.observer_observations(int(kk), first_day, last_day) if kk.isdigit() else []
+        for kk in observer_data
+    }
+    
     # Process each observation to fill in observation data
-    for obs in filtered_obs:
-        kk = str(obs.KK).zfill(2)  # Ensure KK is string with leading zero (e.g., "06")
-        tt = obs.TT
-        o = obs.O  # 1=solar, 2=lunar
-        ee = obs.EE  # Halo type
-        
-        # Only process observations from active observers (skip inactive observers' data)
-        if kk not in observer_data:
-            continue
-        
-        # Initialize day data if needed
-        if tt not in observer_data[kk]['days']:
-            observer_data[kk]['days'][tt] = {'solar_ee': set(), 'lunar': False}
-        
-        # Track unique solar halo types (O=1)
-        # Combined halo types are resolved to individual components
-        # Example: EE 04 (both 22° parhelia) → EE 02 + EE 03
-        if o == 1:
-            for individual_ee in resolve_halo_type(ee):
-                observer_data[kk]['days'][tt]['solar_ee'].add(individual_ee)
-        
-        # Mark if lunar halos observed (O=2)
-        if o == 2:
-            observer_data[kk]['days'][tt]['lunar'] = True
+    for kk, obs_for_kk in observations_by_kk.items():
+        for obs in obs_for_kk:
+            tt = obs.TT
+            o = obs.O  # 1=solar, 2=lunar
+            ee = obs.EE  # Halo type
+            
+            # Initialize day data if needed
+            if tt not in observer_data[kk]['days']:
+                observer_data[kk]['days'][tt] = {'solar_ee': set(), 'lunar': False}
+            
+            # Track unique solar halo types (O=1)
+            # Combined halo types are resolved to individual components
+            # Example: EE 04 (both 22° parhelia) → EE 02 + EE 03
+            if o == 1:
+                for individual_ee in resolve_halo_type(ee):
+                    observer_data[kk]['days'][tt]['solar_ee'].add(individual_ee)
+            
+            # Mark if lunar halos observed (O=2)
+            if o == 2:
+                observer_data[kk]['days'][tt]['lunar'] = True
     
     # Calculate summary statistics and determine predominant region per observer
     for kk in observer_data:
@@ -2516,11 +2821,9 @@ def get_monthly_stats() -> Dict[str, Any]:
         #   g=0: primary site (HbOrt) -> use GH from observer record
         #   g=1: other location -> display as // (region 39)
         #   g=2: secondary site (NbOrt) -> use GN from observer record
-        obs_for_kk = [obs for obs in filtered_obs if str(obs.KK).zfill(2) == kk]
-        
         # Track which days have observations at which site (g value)
         site_days = {0: set(), 1: set(), 2: set()}  # g -> set of days
-        for obs in obs_for_kk:
+        for obs in observations_by_kk[kk]:
             g = obs.g if hasattr(obs, 'g') and obs.g in [0, 1, 2] else 0
             site_days[g].add(obs.TT)
         
@@ -2604,7 +2907,8 @@ def get_monthly_stats() -> Dict[str, Any]:
     
     # Convert sets to counts and calculate totals
     # Filter to only show specific EE types: 1, 2, 3, 5, 6, 7, 8, 9, 10, 11, 12
-    allowed_ee_types = {1, 2, 3, 5, 6, 7, 8, 9, 10, 11, 12}
+    from halo.models.constants import OVERVIEW_HALO_TYPES
+    allowed_ee_types = OVERVIEW_HALO_TYPES
     
     ee_list = []
     for ee in sorted(ee_overview.keys()):
@@ -2715,373 +3019,427 @@ def get_monthly_stats() -> Dict[str, Any]:
         'count': len(filtered_obs)
     }
     
-    # Check requested format
-    output_format = request.args.get('format', 'json').lower()
-    
-    if output_format in ['json', 'html']:
-        # JSON format and HTML format both return data; HTML is formatted client-side
-        return jsonify(data)
-    elif output_format in ['text', 'markdown']:
-        # Get month name and formatted year for display
-        from halo.resources.i18n import get_i18n
-        i18n = get_i18n()
-        month_name = i18n.get(f'months.{mm_int}')
-        year = f"19{str(jj_int).zfill(2)}" if jj_int >= 50 else f"20{str(jj_int).zfill(2)}"
-        
-        if output_format == 'text':
-            content = _format_monthly_stats_text(data, month_name, year, i18n)
-            return Response(content, mimetype='text/plain; charset=utf-8')
-        elif output_format == 'markdown':
-            content = _format_monthly_stats_markdown(data, month_name, year, i18n)
-            return Response(content, mimetype='text/markdown; charset=utf-8')
-    elif output_format == 'linegraph':
-        # Generate PNG line chart
-        from halo.resources.i18n import get_i18n
-        i18n = get_i18n()
-        img_data = _generate_monthly_stats_chart(data, mm_int, jj_int, i18n)
-        return Response(img_data, mimetype='image/png')
-    elif output_format == 'bargraph':
-        # Generate PNG bar chart
-        from halo.resources.i18n import get_i18n
-        i18n = get_i18n()
-        img_data = _generate_monthly_stats_bar_chart(data, mm_int, jj_int, i18n)
-        return Response(img_data, mimetype='image/png')
-    else:
-        return jsonify({'error': f'Invalid format: {output_format}. Use json, text, markdown, linegraph, or bargraph.'}), 400
+    return data
 
 
-def _generate_monthly_stats_chart(data: Dict[str, Any], mm: int, jj: int, i18n) -> bytes:
-    """Generate activity chart as PNG image using matplotlib.
-    
-    Creates a line chart with:
-    - Red line: Real activity (normalized)
-    - Green line: Relative activity (normalized)
-    - Days 1-31 on x-axis
-    - Title and subtitle with month/year and observation count
-    
-    Returns:
-        bytes: PNG image data
+@api_blueprint.route('/range-stats', methods=['GET'])
+def get_range_stats() -> Dict[str, Any]:
+    """Generate statistics for an arbitrary date range.
+
+    Query parameters:
+        from: First day of the range, YYYY-MM-DD (required)
+        to: Last day of the range, YYYY-MM-DD (required, inclusive)
+        format: Output format - 'json' (default)
+
+    Uses the counting rules of the monthly statistics (Monatsstatistik):
+    - Observer overview with solar halo types, days with solar/lunar halos
+    - Number of observers per halo type and day
+    - Rare halos (EE > 12)
+    - Real and relative halo activity per day, normalized to 30 days
+
+    Observers are taken as of the last month of the range. The statistics are
+    computed from per-day aggregates that are built once per loaded dataset.
     """
-    # Prepare data - days 1-31
-    days = list(range(1, 32))
-    real_data = [data.get('activity_real', {}).get(str(d), 0) for d in days]
-    relative_data = [data.get('activity_relative', {}).get(str(d), 0) for d in days]
-    
-    # Get month name and year for title
-    month_name = i18n.get(f'months.{mm}')
-    year = f"19{str(jj).zfill(2)}" if jj >= 50 else f"20{str(jj).zfill(2)}"
-    observation_count = data.get('activity_observation_count', 0)
-    
-    # Get labels from i18n
-    label_real = i18n.get('monthly_stats.activity_real')
-    label_relative = i18n.get('monthly_stats.activity_relative')
-    x_axis_label = i18n.get('monthly_stats.x_axis')
-    y_axis_label = i18n.get('monthly_stats.y_axis')
-    
-    # Create figure and axis
-    fig, ax = plt.subplots(figsize=(12, 6))
-    
-    # Create smooth spline interpolation (like Chart.js tension: 0.4)
-    days_smooth = np.linspace(1, 31, 300)  # 300 points for smooth curve
-    
-    # Smooth interpolation for real data
-    if max(real_data) > 0:  # Only if there's data
-        # Use numpy cubic interpolation
-        real_smooth = np.interp(days_smooth, days, real_data)
-        # Apply smoothing via convolution for visual effect
-        kernel_size = 9
-        kernel = np.ones(kernel_size) / kernel_size
-        real_smooth = np.convolve(real_smooth, kernel, mode='same')
-        real_smooth = np.maximum(real_smooth, 0)  # Clip to [0, inf)
-        ax.plot(days_smooth, real_smooth, color='#dc3545', linewidth=2, label=label_real)
-    else:
-        ax.plot(days, real_data, color='#dc3545', linewidth=2, label=label_real)
-    
-    # Smooth interpolation for relative data
-    if max(relative_data) > 0:  # Only if there's data
-        # Use numpy cubic interpolation
-        relative_smooth = np.interp(days_smooth, days, relative_data)
-        # Apply smoothing via convolution for visual effect
-        kernel_size = 9
-        kernel = np.ones(kernel_size) / kernel_size
-        relative_smooth = np.convolve(relative_smooth, kernel, mode='same')
-        relative_smooth = np.maximum(relative_smooth, 0)  # Clip to [0, inf)
-        ax.plot(days_smooth, relative_smooth, color='#28a745', linewidth=2, label=label_relative)
-    else:
-        ax.plot(days, relative_data, color='#28a745', linewidth=2, label=label_relative)
-    
-    # Add data points as markers
-    ax.plot(days, real_data, 'o', color='#dc3545', markersize=4, markerfacecolor='#dc3545')
-    ax.plot(days, relative_data, 'o', color='#28a745', markersize=4, markerfacecolor='#28a745')
-    
-    # Configure axes
-    ax.set_xlabel(x_axis_label, fontsize=12, fontweight='bold')
-    ax.set_ylabel(y_axis_label, fontsize=12, fontweight='bold')
-    ax.set_xlim(0.5, 31.5)
-    ax.set_ylim(bottom=0)
-    ax.set_xticks(range(1, 32))
-    ax.grid(True, alpha=0.3, linestyle='--')
-    
-    # Add legend
-    ax.legend(loc='upper left', fontsize=10, framealpha=0.9)
-    
-    # Add title and subtitle
-    title = f'Haloaktivität im {month_name} {year}'
-    subtitle = f'berechnet aus {observation_count} Einzelbeobachtungen'
-    fig.suptitle(title, fontsize=14, fontweight='bold', y=0.98)
-    ax.text(0.5, 1.02, subtitle, transform=ax.transAxes, 
-            ha='center', va='bottom', fontsize=10, style='italic')
-    
-    # Adjust layout to prevent label cutoff
-    plt.tight_layout(rect=[0, 0, 1, 0.96])
-    
-    # Save to bytes buffer
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-    plt.close(fig)
-    buf.seek(0)
-    
-    return buf.read()
+    return _range_stats_response(request.args, _request_i18n())
 
 
-def _generate_monthly_stats_bar_chart(data: Dict[str, Any], mm: int, jj: int, i18n) -> bytes:
-    """Generate activity bar chart as PNG image using matplotlib.
-    
-    Creates a bar chart with:
-    - Two side-by-side bars for each day: red (real) and green (relative)
-    - Days 1-31 on x-axis
-    - Title and subtitle with month/year and observation count
-    
-    Returns:
-        bytes: PNG image data
+def _range_stats_response(args, i18n):
+    """Response of /range-stats for the query parameters args, with the texts of i18n."""
+    from flask import current_app
+    from datetime import date, timedelta
+    from halo.services.dataset import cached, day_key, get_observation_table, observations_key
+    from halo.services.daily_stats import DailyAggregates
+
+    # Check if observations are loaded
+    observations = current_app.config.get('OBSERVATIONS', [])
+    active_observers_only = bool(current_app.config.get('ACTIVE_OBSERVERS_ONLY', False))
+
+    if not observations:
+        return jsonify({'error': 'No observations loaded. Please load a file first.'}), 400
+
+    date_from = args.get('from', '').strip()
+    date_to = args.get('to', '').strip()
+
+    if not all([date_from, date_to]):
+        return jsonify({'error': 'Missing required parameters: from, to'}), 400
+
+    try:
+        first_day = date.fromisoformat(date_from)
+        last_day = date.fromisoformat(date_to)
+    except ValueError:
+        return jsonify({'error': 'Invalid date (use YYYY-MM-DD)'}), 400
+
+    if first_day > last_day:
+        return jsonify({'error': 'Invalid range: from is after to'}), 400
+    if first_day.year < 1950 or last_day.year > 2049:
+        return jsonify({'error': 'Invalid range: years must be within 1950-2049'}), 400
+
+    output_format = args.get('format', 'json').lower()
+    if output_format != 'json':
+        return jsonify({'error': f'Invalid format: {output_format}. Use json.'}), 400
+
+    days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+    day_keys = np.array([day_key(d.year, d.month, d.day) for d in days], dtype=np.int64)
+
+    # Observers as of the last month of the range
+    active_observers = get_observer_registry(current_app.config).active_observers(
+        last_day.year * 100 + last_day.month, active_observers_only
+    )
+
+    config = current_app.config
+    aggregates = cached(
+        config, 'daily_aggregates', observations_key(config),
+        lambda: DailyAggregates(get_observation_table(config))
+    )
+    stats = aggregates.summarize(day_keys, active_observers)
+
+    labels = [d.isoformat() for d in days]
+
+    data = {
+        'from': first_day.isoformat(),
+        'to': last_day.isoformat(),
+        'days': len(days),
+        'observer_overview': stats['observer_overview'],
+        'ee_totals': stats['ee_totals'],
+        'ee_counts': stats['ee_counts'],
+        'daily_totals': dict(zip(labels, stats['daily_totals'])),
+        'daily_observers': dict(zip(labels, stats['daily_observers'])),
+        'grand_total': sum(stats['daily_totals']),
+        'rare_halos': stats['rare_halos'],
+        'activity_real': dict(zip(labels, stats['activity_real'])),
+        'activity_relative': dict(zip(labels, stats['activity_relative'])),
+        'activity_totals': stats['activity_totals'],
+        'activity_count': stats['activity_count'],
+        'activity_observation_count': stats['activity_observation_count'],
+        'count': stats['count']
+    }
+
+    return jsonify(data)
+
+
+def _parse_int_list(value: str) -> list[int] | None:
+    """Parse a comma-separated list of integers ('' = None)."""
+    value = value.strip()
+    if not value:
+        return None
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+# Number of climatology results (filter combinations) kept per dataset generation
+CLIMATOLOGY_CACHE_SIZE = 32
+
+
+@api_blueprint.route('/climatology', methods=['GET'])
+def get_climatology() -> Dict[str, Any]:
+    """Generate the halo climatology: halo frequency per day of year across all years.
+
+    Query parameters:
+        gg: Comma-separated regions (GG) to include (optional, default all)
+        kk: Comma-separated observers (KK) to include (optional, default all)
+        ee: Comma-separated individual halo types to report (optional, default all observed)
+        percentiles: Comma-separated percentiles of the bands (optional, default 10,50,90)
+        format: Output format - 'json' (default)
+
+    For each of the 366 days of year (29 February has its own slot) the
+    number of observers reporting each halo type, the number of observers
+    with any solar halo and the real halo activity are determined per year.
+    The response contains mean and percentiles of these values across years.
+    Results are cached until the observations change.
     """
-    # Prepare data - days 1-31
-    days = list(range(1, 32))
-    real_data = [data.get('activity_real', {}).get(str(d), 0) for d in days]
-    relative_data = [data.get('activity_relative', {}).get(str(d), 0) for d in days]
-    
-    # Get month name and year for title
-    month_name = i18n.get(f'months.{mm}')
-    year = f"19{str(jj).zfill(2)}" if jj >= 50 else f"20{str(jj).zfill(2)}"
-    observation_count = data.get('activity_observation_count', 0)
-    
-    # Get labels from i18n
-    label_real = i18n.get('monthly_stats.activity_real')
-    label_relative = i18n.get('monthly_stats.activity_relative')
-    x_axis_label = i18n.get('monthly_stats.x_axis')
-    y_axis_label = i18n.get('monthly_stats.y_axis')
-    
-    # Create figure and axis
-    fig, ax = plt.subplots(figsize=(14, 6))
-    
-    # Set up bar positions
-    bar_width = 0.35
-    x_pos = np.arange(len(days))
-    
-    # Create bars
-    bars1 = ax.bar(x_pos - bar_width/2, real_data, bar_width, 
-                   label=label_real, color='#dc3545', alpha=0.8)
-    bars2 = ax.bar(x_pos + bar_width/2, relative_data, bar_width,
-                   label=label_relative, color='#28a745', alpha=0.8)
-    
-    # Configure axes
-    ax.set_xlabel(x_axis_label, fontsize=12, fontweight='bold')
-    ax.set_ylabel(y_axis_label, fontsize=12, fontweight='bold')
-    ax.set_xticks(x_pos)
-    ax.set_xticklabels(days)
-    ax.set_ylim(bottom=0)
-    ax.grid(True, alpha=0.3, linestyle='--', axis='y')
-    
-    # Add legend
-    ax.legend(loc='upper left', fontsize=10, framealpha=0.9)
-    
-    # Add title and subtitle
-    title = f'Haloaktivität im {month_name} {year}'
-    subtitle = f'berechnet aus {observation_count} Einzelbeobachtungen'
-    fig.suptitle(title, fontsize=14, fontweight='bold', y=0.98)
-    ax.text(0.5, 1.02, subtitle, transform=ax.transAxes, 
-            ha='center', va='bottom', fontsize=10, style='italic')
-    
-    # Adjust layout to prevent label cutoff
-    plt.tight_layout(rect=[0, 0, 1, 0.96])
-    
-    # Save to bytes buffer
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-    plt.close(fig)
-    buf.seek(0)
-    
-    return buf.read()
-
-
-def _generate_annual_stats_chart(data: Dict[str, Any], jj: int, i18n) -> bytes:
-    """Generate annual activity chart as PNG image using matplotlib.
-    
-    Creates a line chart with:
-    - Red line: Real activity (normalized)
-    - Green line: Relative activity (normalized)
-    - Months 1-12 on x-axis
-    - Title with year
-    
-    Returns:
-        bytes: PNG image data
+    return _climatology_response(request.args, _request_i18n())
+
+
+def _climatology_response(args, i18n):
+    """Response of /climatology for the query parameters args, with the texts of i18n."""
+    from flask import current_app
+    from halo.services.dataset import cached, get_observation_table, observations_key
+    from halo.services.climatology import DEFAULT_PERCENTILES, calculate_climatology
+
+    observations = current_app.config.get('OBSERVATIONS', [])
+    if not observations:
+        return jsonify({'error': 'No observations loaded. Please load a file first.'}), 400
+
+    try:
+        regions = _parse_int_list(args.get('gg', ''))
+        observers = _parse_int_list(args.get('kk', ''))
+        halo_types = _parse_int_list(args.get('ee', ''))
+        percentiles = _parse_int_list(args.get('percentiles', '')) or list(DEFAULT_PERCENTILES)
+    except ValueError:
+        return jsonify({'error': 'Invalid numeric parameters'}), 400
+
+    if any(p < 0 or p > 100 for p in percentiles):
+        return jsonify({'error': 'Invalid percentile (0-100)'}), 400
+
+    output_format = args.get('format', 'json').lower()
+    if output_format != 'json':
+        return jsonify({'error': f'Invalid format: {output_format}. Use json.'}), 400
+
+    config = current_app.config
+    results = cached(config, 'climatology', observations_key(config), dict)
+    key = tuple(tuple(sorted(v)) if v is not None else None
+                for v in (regions, observers, halo_types)) + (tuple(percentiles),)
+    if key not in results:
+        if len(results) >= CLIMATOLOGY_CACHE_SIZE:
+            results.pop(next(iter(results)))
+        results[key] = calculate_climatology(
+            get_observation_table(config),
+            regions=regions,
+            observers=observers,
+            halo_types=halo_types,
+            percentiles=percentiles
+        )
+
+    return jsonify(results[key])
+
+
+def _chart_cache():
+    """Chart cache of the app (in cache/charts unless CHART_CACHE_DIR is set)."""
+    return get_chart_cache(current_app.config, Path(__file__).parent.parent.parent.parent / 'cache' / 'charts')
+
+
+def _chart_key(chart, params, data, i18n):
+    """Chart cache key of a statistics chart: chart, parameters, language, version and input data.
+
+    The language is that of i18n, which the chart must be rendered with.
     """
-    # Prepare data - months 1-12
-    months = list(range(1, 13))
-    real_data = [data.get('monthly_stats', {}).get(str(m), {}).get('real', 0) for m in months]
-    relative_data = [data.get('monthly_stats', {}).get(str(m), {}).get('relative', 0) for m in months]
-    
-    # Get month names and year for labels
-    month_labels = [i18n.get(f'months.{m}')[:3] for m in months]  # Use first 3 chars (Jan, Feb, etc.)
-    year = f"19{str(jj).zfill(2)}" if jj >= 50 else f"20{str(jj).zfill(2)}"
-    
-    # Get labels from i18n
-    label_real = i18n.get('annual_stats.chart_real')
-    label_relative = i18n.get('annual_stats.chart_relative')
-    x_axis_label = i18n.get('annual_stats.chart_x_axis')
-    y_axis_label = i18n.get('annual_stats.chart_y_axis')
-    
-    # Create figure and axis
-    fig, ax = plt.subplots(figsize=(12, 6))
-    
-    # Create smooth spline interpolation (like Chart.js tension: 0.4)
-    months_smooth = np.linspace(1, 12, 120)  # 120 points for smooth curve
-    
-    # Smooth interpolation for real data
-    if max(real_data) > 0:  # Only if there's data
-        # Use numpy cubic interpolation
-        real_smooth = np.interp(months_smooth, months, real_data)
-        # Apply smoothing via convolution for visual effect
-        kernel_size = 9
-        kernel = np.ones(kernel_size) / kernel_size
-        real_smooth = np.convolve(real_smooth, kernel, mode='same')
-        real_smooth = np.maximum(real_smooth, 0)  # Clip to [0, inf)
-        ax.plot(months_smooth, real_smooth, color='#dc3545', linewidth=2, label=label_real)
-    else:
-        ax.plot(months, real_data, color='#dc3545', linewidth=2, label=label_real)
-    
-    # Smooth interpolation for relative data
-    if max(relative_data) > 0:  # Only if there's data
-        # Use numpy cubic interpolation
-        relative_smooth = np.interp(months_smooth, months, relative_data)
-        # Apply smoothing via convolution for visual effect
-        kernel_size = 9
-        kernel = np.ones(kernel_size) / kernel_size
-        relative_smooth = np.convolve(relative_smooth, kernel, mode='same')
-        relative_smooth = np.maximum(relative_smooth, 0)  # Clip to [0, inf)
-        ax.plot(months_smooth, relative_smooth, color='#28a745', linewidth=2, label=label_relative)
-    else:
-        ax.plot(months, relative_data, color='#28a745', linewidth=2, label=label_relative)
-    
-    # Add data points as markers
-    ax.plot(months, real_data, 'o', color='#dc3545', markersize=4, markerfacecolor='#dc3545')
-    ax.plot(months, relative_data, 'o', color='#28a745', markersize=4, markerfacecolor='#28a745')
+    return {
+        'chart': chart,
+        'params': params,
+        'language': i18n.language,
+        'version': __version__,
+        'data': chart_digest(data)
+    }
+
+
+def _chart_response(chart, params, data, i18n, render, image='png'):
+    """Image response of a statistics chart from the chart cache (see services.chart_cache).
+
+    The image (png or svg) is rendered with render(i18n) only if no image of
+    the chart with the same parameters, language and input data is cached.
+    """
+    from flask import has_request_context
     
-    # Configure axes
-    ax.set_xlabel(x_axis_label, fontsize=12, fontweight='bold')
-    ax.set_ylabel(y_axis_label, fontsize=12, fontweight='bold')
-    ax.set_xlim(0.5, 12.5)
-    ax.set_ylim(bottom=0)
-    ax.set_xticks(months)
-    ax.set_xticklabels(month_labels)
-    ax.grid(True, alpha=0.3, linestyle='--')
+    key = _chart_key(chart, params, data, i18n)
+    response = Response(
+        _chart_cache().get_or_render(key, lambda: render(i18n), '.' + image), mimetype=charts.IMAGE_TYPES[image]
+    )
+    response.add_etag()
+    if has_request_context():
+        response = response.make_conditional(request)
+    return response
+
+
+# Output formats of format=bundle (default selection) and file extensions by mimetype
+BUNDLE_FORMATS = ('json', 'text', 'markdown', 'linegraph', 'bargraph')
+BUNDLE_EXTENSIONS = {
+    'application/json': '.json',
+    'text/plain': '.txt',
+    'text/markdown': '.md',
+    'image/png': '.png',
+    'image/svg+xml': '.svg',
+}
+
+
+def _bundle_response(respond, args, basename):
+    """Response with several output formats of a statistic, from one computation (format=bundle).
     
-    # Add legend
-    ax.legend(loc='upper left', fontsize=10, framealpha=0.9)
+    Query parameters:
+        formats: Comma-separated output formats (default: json, text, markdown,
+                 linegraph, bargraph; also chartspec)
+        archive: 'multipart' (default) - multipart/form-data with one part per
+                 format (name = format), as read by Response.formData() in the
+                 browser - or 'zip'
     
-    # Add title
-    title_template = i18n.get('annual_stats.chart_title')
-    title = title_template.replace('{year}', year)
-    fig.suptitle(title, fontsize=14, fontweight='bold', y=0.98)
+    Args:
+        respond: Returns the response of one output format
+        args: Query parameters of the request
+        basename: File name of the statistic (without extension)
+    """
+    import io
+    import uuid
+    import zipfile
+    
+    formats = []
+    for output_format in args.get('formats', '').split(','):
+        output_format = output_format.strip().lower()
+        if output_format and output_format not in formats:
+            formats.append(output_format)
+    formats = formats or list(BUNDLE_FORMATS)
+    invalid = [f for f in formats if f not in BUNDLE_FORMATS + ('chartspec',)]
+    if invalid:
+        return jsonify({'error': f'Invalid format in bundle: {invalid[0]}. Use {", ".join(BUNDLE_FORMATS)} or chartspec.'}), 400
+    archive = args.get('archive', 'multipart').lower()
+    if archive not in ('multipart', 'zip'):
+        return jsonify({'error': f'Invalid archive: {archive}. Use multipart or zip.'}), 400
+    
+    # (format, file name, content type, body) of each rendering
+    parts = []
+    for output_format in formats:
+        response = respond(output_format)
+        if isinstance(response, tuple):
+            return response
+        name = basename if output_format in ('json', 'text', 'markdown') else f'{basename}_{output_format}'
+        content_type = response.mimetype + ''.join(f'; {k}={v}' for k, v in response.mimetype_params.items())
+        parts.append((output_format, name + BUNDLE_EXTENSIONS[response.mimetype], content_type, response.get_data()))
+    
+    if archive == 'zip':
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for _, filename, _, body in parts:
+                zf.writestr(filename, body)
+        response = Response(buf.getvalue(), mimetype='application/zip')
+        response.headers['Content-Disposition'] = f'attachment; filename={basename}.zip'
+        return response
+    
+    boundary = uuid.uuid4().hex
+    chunks = []
+    for output_format, filename, content_type, body in parts:
+        chunks.append((
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="{output_format}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        ).encode('utf-8'))
+        chunks.append(body)
+        chunks.append(b'\r\n')
+    chunks.append(f'--{boundary}--\r\n'.encode('utf-8'))
+    return Response(b''.join(chunks), content_type=f'multipart/form-data; boundary={boundary}')
+
+
+# Charts of /api/charts/bundle
+BUNDLE_CHARTS = ('monthly_linegraph', 'monthly_bargraph', 'annual_linegraph', 'annual_bargraph')
+
+
+@api_blueprint.route('/charts/bundle', methods=['GET'])
+def get_chart_bundle():
+    """Get all statistics charts of a year in one response (e.g. for the yearly bulletin).
     
-    # Add subtitle with observation count
-    total_ee = data.get('totals', {}).get('total_ee', 0)
-    subtitle = f'berechnet aus {total_ee} Einzelbeobachtungen'
-    fig.text(0.5, 0.91, subtitle, ha='center', fontsize=10, color='#666')
+    Query parameters:
+        jj: Year (2-digit, or 1950-2049)
+        types: Comma-separated charts (default: all) - monthly_linegraph,
+               monthly_bargraph (one per month), annual_linegraph, annual_bargraph
+        format: 'zip' (default, one image file per chart) or 'pdf' (one page per chart)
+        width, height, dpi, image: Image options of the charts (see /monthly-stats);
+               image=svg is only available for zip
+    
+    The statistics of the year and its months are computed once (or taken
+    from the result cache); the rows of all months come from one scan of the
+    year. Charts found in the chart cache are reused, the others are rendered
+    concurrently by worker processes (see charts.get_bundle_pool).
+    """
+    return _chart_bundle_response(request.args, _request_i18n())
+
+
+def _chart_bundle_response(args, i18n):
+    """Response of /charts/bundle for the query parameters args, with the texts of i18n."""
+    from flask import current_app
+    import io
+    import zipfile
     
-    # Adjust layout to prevent label cutoff
-    plt.tight_layout(rect=[0, 0, 1, 0.89])
+    observations = current_app.config.get('OBSERVATIONS', [])
+    if not observations:
+        return jsonify({'error': 'No observations loaded. Please load a file first.'}), 400
     
-    # Save to bytes buffer
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-    plt.close(fig)
-    buf.seek(0)
+    jj = args.get('jj', '').strip()
+    if not jj:
+        return jsonify({'error': 'Missing required parameter: jj'}), 400
+    try:
+        jj_int = int(jj)
+        # Accept both 2-digit and 4-digit years (1950-2049) and normalize to 2-digit
+        if 1950 <= jj_int <= 1999:
+            jj_int -= 1900
+        elif 2000 <= jj_int <= 2049:
+            jj_int -= 2000
+        elif jj_int < 0 or jj_int > 99:
+            return jsonify({'error': 'Invalid year (0-99 or 1950-2049)'}), 400
+    except ValueError:
+        return jsonify({'error': 'Invalid numeric parameter'}), 400
     
-    return buf.read()
-
-
-def _generate_annual_stats_bar_chart(data: Dict[str, Any], jj: int, i18n) -> bytes:
-    """Generate annual activity bar chart as PNG image using matplotlib.
+    types = [t.strip().lower() for t in args.get('types', '').split(',') if t.strip()]
+    types = types or list(BUNDLE_CHARTS)
+    invalid = [t for t in types if t not in BUNDLE_CHARTS]
+    if invalid:
+        return jsonify({'error': f'Invalid chart type: {invalid[0]}. Use {", ".join(BUNDLE_CHARTS)}.'}), 400
     
-    Creates a bar chart with:
-    - Two side-by-side bars for each month: red (real) and green (relative)
-    - Months 1-12 on x-axis
-    - Title with year
+    output_format = args.get('format', 'zip').lower()
+    if output_format not in ('zip', 'pdf'):
+        return jsonify({'error': f'Invalid format: {output_format}. Use zip or pdf.'}), 400
+    try:
+        options = charts.image_options(args)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameters: {e}'}), 400
+    image = options.get('image', 'png')
+    if output_format == 'pdf' and image != 'png':
+        return jsonify({'error': 'The pdf format requires png images'}), 400
+    
+    year = f"19{str(jj_int).zfill(2)}" if jj_int >= 50 else f"20{str(jj_int).zfill(2)}"
+    
+    # Statistics of every month and the year, each reported as one step
+    monthly = any(t.startswith('monthly_') for t in types)
+    annual = any(t.startswith('annual_') for t in types)
+    steps = (12 if monthly else 0) + (1 if annual else 0)
+    month_data = {}
+    if monthly:
+        year_rows = {}
+        
+        def month_stats(mm_int):
+            # Rows of all months from one scan of the year, on the first month not cached
+            if not year_rows:
+                year_rows.update(get_observation_table(current_app.config).year_month_rows(jj_int))
+            return _monthly_stats_data(mm_int, jj_int, year_rows[mm_int])
+        
+        for mm_int in range(1, 13):
+            month_data[mm_int] = _cached_result(
+                'monthly-stats', {'mm': mm_int, 'jj': jj_int},
+                lambda mm_int=mm_int: month_stats(mm_int), i18n.language
+            )
+            report_progress(len(month_data), steps)
+    if annual:
+        annual_data = _cached_result('annual-stats', {'jj': jj_int}, lambda: _annual_stats_data(jj_int), i18n.language)
+        report_progress(steps, steps)
+    
+    # Charts in bundle order: (file name, cache key, renderer, arguments)
+    items = []
+    for chart in types:
+        kind, graph = chart.split('_')
+        if kind == 'monthly':
+            for mm_int, data in month_data.items():
+                items.append((
+                    f'{year}-{mm_int:02d}_{graph}',
+                    _chart_key(f'monthly-{graph}', {'mm': mm_int, 'jj': jj_int, **options}, data, i18n),
+                    chart, (data, mm_int, jj_int, i18n, options)
+                ))
+        else:
+            items.append((
+                f'{year}_{graph}',
+                _chart_key(f'annual-{graph}', {'jj': jj_int, **options}, annual_data, i18n),
+                chart, (annual_data, jj_int, i18n, options)
+            ))
+    
+    cache = _chart_cache()
+    suffix = '.' + image
+    images = [cache.get(key, suffix) for _, key, _, _ in items]
+    missing = [i for i, img in enumerate(images) if img is None]
+    rendered = charts.render_all(current_app.config, [(items[i][2], items[i][3]) for i in missing], bundle=True)
+    for i, img in zip(missing, rendered):
+        cache.put(items[i][1], img, suffix)
+        images[i] = img
+    
+    if output_format == 'pdf':
+        body = charts.pdf_document(images, options.get('dpi', charts.DEFAULT_DPI))
+        mimetype = 'application/pdf'
+    else:
+        buf = io.BytesIO()
+        # PNGs are compressed already
+        compression = zipfile.ZIP_STORED if image == 'png' else zipfile.ZIP_DEFLATED
+        with zipfile.ZipFile(buf, 'w', compression) as archive:
+            for (name, _, _, _), img in zip(items, images):
+                archive.writestr(name + suffix, img)
+        body = buf.getvalue()
+        mimetype = 'application/zip'
     
-    Returns:
-        bytes: PNG image data
-    """
-    # Prepare data - months 1-12
-    months = list(range(1, 13))
-    real_data = [data.get('monthly_stats', {}).get(str(m), {}).get('real', 0) for m in months]
-    relative_data = [data.get('monthly_stats', {}).get(str(m), {}).get('relative', 0) for m in months]
-    
-    # Get month names and year for labels
-    month_labels = [i18n.get(f'months.{m}')[:3] for m in months]  # Use first 3 chars (Jan, Feb, etc.)
-    year = f"19{str(jj).zfill(2)}" if jj >= 50 else f"20{str(jj).zfill(2)}"
-    
-    # Get labels from i18n
-    label_real = i18n.get('annual_stats.chart_real')
-    label_relative = i18n.get('annual_stats.chart_relative')
-    x_axis_label = i18n.get('annual_stats.chart_x_axis')
-    y_axis_label = i18n.get('annual_stats.chart_y_axis')
-    
-    # Create figure and axis
-    fig, ax = plt.subplots(figsize=(12, 6))
-    
-    # Set up bar positions
-    bar_width = 0.35
-    x_pos = np.arange(len(months))
-    
-    # Create bars
-    bars1 = ax.bar(x_pos - bar_width/2, real_data, bar_width,
-                   label=label_real, color='#dc3545', alpha=0.8)
-    bars2 = ax.bar(x_pos + bar_width/2, relative_data, bar_width,
-                   label=label_relative, color='#28a745', alpha=0.8)
-    
-    # Configure axes
-    ax.set_xlabel(x_axis_label, fontsize=12, fontweight='bold')
-    ax.set_ylabel(y_axis_label, fontsize=12, fontweight='bold')
-    ax.set_xticks(x_pos)
-    ax.set_xticklabels(month_labels)
-    ax.set_ylim(bottom=0)
-    ax.grid(True, alpha=0.3, linestyle='--', axis='y')
-    
-    # Add legend
-    ax.legend(loc='upper left', fontsize=10, framealpha=0.9)
-    
-    # Add title and subtitle
-    title_template = i18n.get('annual_stats.chart_title')
-    title = title_template.replace('{year}', year)
-    fig.suptitle(title, fontsize=14, fontweight='bold', y=0.98)
-    
-    # Add subtitle with observation count
-    total_ee = data.get('totals', {}).get('total_ee', 0)
-    subtitle = f'berechnet aus {total_ee} Einzelbeobachtungen'
-    ax.text(0.5, 1.02, subtitle, transform=ax.transAxes, 
-            ha='center', va='bottom', fontsize=10, style='italic')
-    
-    # Adjust layout to prevent label cutoff
-    plt.tight_layout(rect=[0, 0, 1, 0.96])
-    
-    # Save to bytes buffer
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-    plt.close(fig)
-    buf.seek(0)
-    
-    return buf.read()
+    response = Response(body, mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=halo_charts_{year}.{output_format}'
+    return response
 
 
 def _format_annual_stats_text(data: Dict[str, Any], year: str, i18n) -> str:
@@ -3606,25 +3964,34 @@ def get_annual_stats() -> Dict[str, Any]:
     
     Query parameters:
         jj: Year (2-digit, 50-99 for 1950-2099)
-        format: Output format - 'json' (default), 'html', 'text', or 'markdown'
+        format: Output format - 'json' (default), 'html', 'text', 'markdown',
+                'linegraph', 'bargraph', 'chartspec' or 'bundle'
+        formats, archive: Formats and container of format=bundle
+        width, height, dpi: Image size in pixels and resolution (linegraph, bargraph)
+        image: Image format of linegraph/bargraph - 'png' (default) or 'svg'
     
     Returns:
         - format=json/html: Dictionary with monthly_stats, totals, observer_distribution, phenomena
         - format=text: Pseudographic output with box-drawing characters
         - format=markdown: Markdown tables for all statistics
+        - format=linegraph/bargraph: Chart image
+        - format=chartspec: Titles, axes and traces (values and smoothed curve) of the charts
+        - format=bundle: Multipart or ZIP response with the requested formats
     """
+    return _annual_stats_response(request.args, _request_i18n())
+
+
+def _annual_stats_response(args, i18n):
+    """Response of /annual-stats for the query parameters args, with the texts of i18n."""
     from flask import current_app
-    from halo.models.constants import calculate_halo_activity
     
     # Check if observations are loaded
     observations = current_app.config.get('OBSERVATIONS', [])
-    observers = current_app.config.get('OBSERVERS', [])
-    active_observers_only = bool(current_app.config.get('ACTIVE_OBSERVERS_ONLY', False))
     
     if not observations:
         return jsonify({'error': 'No observations loaded. Please load a file first.'}), 400
     
-    jj = request.args.get('jj', '').strip()
+    jj = args.get('jj', '').strip()
     
     if not jj:
         return jsonify({'error': 'Missing required parameter: jj'}), 400
@@ -3643,37 +4010,65 @@ def get_annual_stats() -> Dict[str, Any]:
     except ValueError:
         return jsonify({'error': 'Invalid numeric parameter'}), 400
     
+    data = _cached_result('annual-stats', {'jj': jj_int}, lambda: _annual_stats_data(jj_int), i18n.language)
+    
+    def respond(output_format):
+        """Response of one output format."""
+        if output_format in ['json', 'html']:
+            # JSON format and HTML format both return data; HTML is formatted client-side
+            return jsonify(data)
+        elif output_format in ['text', 'markdown']:
+            # Get formatted year for display
+            year = f"19{str(jj_int).zfill(2)}" if jj_int >= 50 else f"20{str(jj_int).zfill(2)}"
+            
+            
+            if output_format == 'text':
+                content = _format_annual_stats_text(data, year, i18n)
+                return Response(content, mimetype='text/plain; charset=utf-8')
+            elif output_format == 'markdown':
+                content = _format_annual_stats_markdown(data, year, i18n)
+                return Response(content, mimetype='text/markdown; charset=utf-8')
+        elif output_format in ['linegraph', 'bargraph']:
+            # Generate line or bar chart (PNG, or SVG with image=svg)
+            try:
+                options = charts.image_options(args)
+            except ValueError as e:
+                return jsonify({'error': f'Invalid parameters: {e}'}), 400
+            return _chart_response(
+                f'annual-{output_format}', {'jj': jj_int, **options}, data, i18n,
+                lambda i18n: charts.render(current_app.config, f'annual_{output_format}', data, jj_int, i18n, options),
+                options.get('image', 'png')
+            )
+        elif output_format == 'chartspec':
+            # Chart description for client-side rendering
+            return jsonify(charts.annual_stats_spec(data, jj_int, i18n))
+        else:
+            return jsonify({'error': f'Invalid format: {output_format}. Use json, text, markdown, linegraph, bargraph, chartspec, or bundle.'}), 400
+        
+    # Check requested format (a formats list without format selects the bundle)
+    output_format = args.get('format', 'bundle' if 'formats' in args else 'json').lower()
+    if output_format == 'bundle':
+        return _bundle_response(respond, args, f'annual_stats_{2000 + jj_int if jj_int < 50 else 1900 + jj_int}')
+    return respond(output_format)
+
+
+def _annual_stats_data(jj_int):
+    """Data of the annual statistics (Jahresstatistik) of a year, for all output formats."""
+    from halo.models.constants import calculate_halo_activity
+    from halo.services import dataset
+    from halo.services.dataset import get_observation_table
+    
+    observations = current_app.config.get('OBSERVATIONS', [])
+    active_observers_only = bool(current_app.config.get('ACTIVE_OBSERVERS_ONLY', False))
+    
     # Filter observations for this year (all months)
     filtered_obs = [obs for obs in observations if obs.JJ == jj_int]
     
     # Get all active observers up to end of year
     # Use December of the year as reference (month 12)
-    month_year_value = 12 + 13 * jj_int
-    
-    # Get unique active observers up to this year
-    active_observers = {}
-    for obs_record in observers:
-        kk = obs_record[0]  # Column 0: KK
-        seit_str = obs_record[3]  # Column 3: seit (MM/JJ format)
-        aktiv_str = obs_record[4]  # Column 4: aktiv (0 or 1)
-        
-        # Parse seit from "MM/JJ" to integer MMJJ
-        seit = _parse_seit(seit_str) if seit_str else 0
-        
-        # Parse aktiv to integer
-        try:
-            aktiv = int(aktiv_str) if aktiv_str else 0
-        except (ValueError, TypeError):
-            aktiv = 0
-        
-        # Observer is active if:
-        # 1. They started before or during this year (seit <= month_year_value)
-        # 2. If active_observers_only is True, they must be marked as active (aktiv == 1)
-        if seit <= month_year_value:
-            if not active_observers_only or aktiv == 1:
-                # Keep the most recent record for each KK
-                if kk not in active_observers or seit > _parse_seit(active_observers[kk][3]):
-                    active_observers[kk] = obs_record
+    active_observers = get_observer_registry(current_app.config).active_observers(
+        month_value(jj_int, 12), active_observers_only
+    )
     
     # Calculate statistics per month using deduplication algorithm
     # Prevents double counting: each observer (KK) can only count each halo type (EE) once per day
@@ -3796,64 +4191,57 @@ def get_annual_stats() -> Dict[str, Any]:
     
     # Calculate per-observer EE distribution (EE 01, 02, 03, 05-07)
     # Track for each observer: counts of EE 01, 02, 03, 05, 06, 07 and total sun EE
+    # Each observer's observations of the year come from the per-observer partition (ordered by date)
+    table = get_observation_table(current_app.config)
+    year4 = jj_int + 2000 if jj_int < 50 else jj_int + 1900
+    first_day, last_day = dataset.day_key(year4, 1, 1), dataset.day_key(year4, 12, 31)
     observer_stats = {}
     
-    # First pass: initialize observer stats and count total days (sun + moon)
-    for obs in filtered_obs:
-        kk = obs.KK
-        if kk not in observer_stats:
-            observer_stats[kk] = {
-                'ee01': 0, 'ee02': 0, 'ee03': 0, 'ee567': 0,
-                'total_sun_ee': 0, 'sun_days': set(), 'total_days': set()
-            }
-        # Track all halo days (sun and moon) for total_days
-        observer_stats[kk]['total_days'].add((obs.MM, obs.TT))
-    
-    # Now count sun halos with deduplication
-    filtered_obs.sort(key=lambda o: (o.MM, o.TT, o.KK, o.O, o.EE))
-    counted_per_observer = {}  # {kk: {(day, ee): counted}}
-    
-    for obs in filtered_obs:
-        if obs.O != 1:  # Only sun halos for EE distribution
+    for kk in table.observers.tolist():
+        obs_for_kk = table.observer_observations(kk, first_day, last_day)
+        if not obs_for_kk:
             continue
         
-        kk = obs.KK
-        if kk not in counted_per_observer:
-            counted_per_observer[kk] = {}
-        
-        # Track per day for this observer (use month+day to make unique across year)
-        day_key = (obs.MM, obs.TT)
-        
-        # Handle EE=4 splitting
-        halos_to_count = []
-        if obs.EE == 4:
-            if (day_key, 2) not in counted_per_observer[kk]:
-                halos_to_count.append(2)
-                counted_per_observer[kk][(day_key, 2)] = True
-            if (day_key, 3) not in counted_per_observer[kk]:
-                halos_to_count.append(3)
-                counted_per_observer[kk][(day_key, 3)] = True
-        else:
-            if (day_key, obs.EE) not in counted_per_observer[kk]:
-                halos_to_count.append(obs.EE)
-                counted_per_observer[kk][(day_key, obs.EE)] = True
+        stats = {
+            'ee01': 0, 'ee02': 0, 'ee03': 0, 'ee567': 0,
+            'total_sun_ee': 0, 'sun_days': set(), 'total_days': set()
+        }
+        observer_stats[kk] = stats
+        counted = set()  # {(day, ee)} - each halo type once per day
         
-        # Count for this observer
-        for ee in halos_to_count:
-            observer_stats[kk]['total_sun_ee'] += 1
+        for obs in obs_for_kk:
+            # Track per day for this observer (use month+day to make unique across year)
+            day_key = (obs.MM, obs.TT)
+            
+            # Track all halo days (sun and moon) for total_days
+            stats['total_days'].add(day_key)
+            
+            if obs.O != 1:  # Only sun halos for EE distribution
+                continue
+            
+            # Handle EE=4 splitting
+            halos_to_count = []
+            for ee in ((2, 3) if obs.EE == 4 else (obs.EE,)):
+                if (day_key, ee) not in counted:
+                    halos_to_count.append(ee)
+                    counted.add((day_key, ee))
+            
+            # Count for this observer
+            for ee in halos_to_count:
+                stats['total_sun_ee'] += 1
+                
+                if ee == 1:
+                    stats['ee01'] += 1
+                elif ee == 2:
+                    stats['ee02'] += 1
+                elif ee == 3:
+                    stats['ee03'] += 1
+                elif ee in [5, 6, 7]:
+                    stats['ee567'] += 1
             
-            if ee == 1:
-                observer_stats[kk]['ee01'] += 1
-            elif ee == 2:
-                observer_stats[kk]['ee02'] += 1
-            elif ee == 3:
-                observer_stats[kk]['ee03'] += 1
-            elif ee in [5, 6, 7]:
-                observer_stats[kk]['ee567'] += 1
-        
-        # Track sun halo days only
-        if halos_to_count:
-            observer_stats[kk]['sun_days'].add((obs.MM, obs.TT))
+            # Track sun halo days only
+            if halos_to_count:
+                stats['sun_days'].add(day_key)
     
     # Convert sets to counts and calculate EE1-7
     observer_distribution = []
@@ -3887,51 +4275,12 @@ def get_annual_stats() -> Dict[str, Any]:
         })
     
     # Calculate phenomena (observations with 5+ EE types visible simultaneously)
-    # Group by unique (MM, TT, KK, O) combination
-    phenomena_dict = {}  # Key: (MM, TT, KK, O), Value: phenomenon data
-    
-    for obs in filtered_obs:
-        # Group by (MM, TT, KK, O)
-        key = (obs.MM, obs.TT, obs.KK, obs.O)
-        if key not in phenomena_dict:
-            phenomena_dict[key] = {
-                'mm': obs.MM,
-                'tt': obs.TT,
-                'kk': obs.KK,
-                'gg': obs.GG,
-                'zs': obs.ZS,
-                'zm': obs.ZM,
-                'o': obs.O,
-                'ee_types': set(),
-                'ee_count': 0  # Track count of EE types
-            }
-        
-        # Add EE type (split if EE=4) and update count
-        ee_before = len(phenomena_dict[key]['ee_types'])
-        if obs.EE == 4:
-            phenomena_dict[key]['ee_types'].add(2)
-            phenomena_dict[key]['ee_types'].add(3)
-        else:
-            phenomena_dict[key]['ee_types'].add(obs.EE)
-        
-        ee_after = len(phenomena_dict[key]['ee_types'])
-        phenomena_dict[key]['ee_count'] = ee_after
-        
-        # Update time only if count < 6 (freeze time after 5th EE type confirmed)
-        if ee_after < 6:
-            phenomena_dict[key]['zs'] = obs.ZS
-            phenomena_dict[key]['zm'] = obs.ZM
-    
-    # Filter for only phenomena with 5+ EE types and convert to sorted list
-    phenomena_list = []
-    for key in sorted(phenomena_dict.keys()):
-        phenom = phenomena_dict[key]
-        if phenom['ee_count'] >= 5:  # Only include if 5 or more EE types
-            phenom['ee_types'] = sorted(list(phenom['ee_types']))
-            phenomena_list.append(phenom)
-    
-    # Sort by (MM, TT, KK, time)
-    phenomena_list.sort(key=lambda p: (p['mm'], p['tt'], p['kk'], p['zs'], p['zm']))
+    # Grouped by unique (MM, TT, KK, O) combination via the archive-wide phenomena index
+    phenomena_list = _get_phenomena_index(current_app.config).query(
+        dataset.day_key(year4, 1, 1), dataset.day_key(year4, 12, 31)
+    )
+    for phenom in phenomena_list:
+        del phenom['jj']  # The year of the statistics
     
     # Build data structure for formatting
     data = {
@@ -3945,41 +4294,89 @@ def get_annual_stats() -> Dict[str, Any]:
         'phenomena': phenomena_list
     }
     
-    # Check requested format
-    output_format = request.args.get('format', 'json').lower()
+    return data
+
+
+
+def _get_phenomena_index(config):
+    """Phenomena index of the loaded observations (cached until they change)."""
+    from halo.services.dataset import cached, get_observation_table, observations_key
+    from halo.services.phenomena import PhenomenaIndex
     
-    if output_format in ['json', 'html']:
-        # JSON format and HTML format both return data; HTML is formatted client-side
-        return jsonify(data)
-    elif output_format in ['text', 'markdown']:
-        # Get formatted year for display
-        year = f"19{str(jj_int).zfill(2)}" if jj_int >= 50 else f"20{str(jj_int).zfill(2)}"
-        
-        from halo.resources.i18n import get_i18n
-        i18n = get_i18n()
-        
-        if output_format == 'text':
-            content = _format_annual_stats_text(data, year, i18n)
-            return Response(content, mimetype='text/plain; charset=utf-8')
-        elif output_format == 'markdown':
-            content = _format_annual_stats_markdown(data, year, i18n)
-            return Response(content, mimetype='text/markdown; charset=utf-8')
-    elif output_format == 'linegraph':
-        # Generate PNG line chart
-        from halo.resources.i18n import get_i18n
-        i18n = get_i18n()
-        img_data = _generate_annual_stats_chart(data, jj_int, i18n)
-        return Response(img_data, mimetype='image/png')
-    elif output_format == 'bargraph':
-        # Generate PNG bar chart
-        from halo.resources.i18n import get_i18n
-        i18n = get_i18n()
-        img_data = _generate_annual_stats_bar_chart(data, jj_int, i18n)
-        return Response(img_data, mimetype='image/png')
-    else:
-        return jsonify({'error': f'Invalid format: {output_format}. Use json, text, markdown, linegraph, or bargraph.'}), 400
+    return cached(
+        config, 'phenomena_index', observations_key(config),
+        lambda: PhenomenaIndex(get_observation_table(config))
+    )
 
 
+@api_blueprint.route('/phenomena', methods=['GET'])
+def get_phenomena() -> Dict[str, Any]:
+    """Search halo phenomena in the whole archive.
+    
+    A phenomenon is the set of halo types one observer reported for one
+    object (O) on one day; EE 04 counts as EE 02 + EE 03 as in the annual
+    statistics.
+    
+    Query parameters:
+        min_types: Minimum number of different halo types (default 5)
+        from: First day, YYYY-MM-DD (optional)
+        to: Last day, YYYY-MM-DD (optional, inclusive)
+        ee_any: Comma-separated halo types, at least one must be reported (optional)
+        ee_all: Comma-separated halo types, all must be reported (optional)
+        kk: Comma-separated observers (optional)
+        o: Comma-separated objects (optional)
+        format: Output format - 'json' (default)
+    
+    Returns phenomena sorted by date, observer and time.
+    """
+    from flask import current_app
+    from datetime import date
+    from halo.services.dataset import day_key
+    from halo.services.phenomena import DEFAULT_MIN_TYPES
+    
+    observations = current_app.config.get('OBSERVATIONS', [])
+    if not observations:
+        return jsonify({'error': 'No observations loaded. Please load a file first.'}), 400
+    
+    try:
+        min_types = int(request.args.get('min_types', '').strip() or DEFAULT_MIN_TYPES)
+        ee_any = _parse_int_list(request.args.get('ee_any', ''))
+        ee_all = _parse_int_list(request.args.get('ee_all', ''))
+        observers = _parse_int_list(request.args.get('kk', ''))
+        objects = _parse_int_list(request.args.get('o', ''))
+    except ValueError:
+        return jsonify({'error': 'Invalid numeric parameters'}), 400
+    
+    try:
+        date_from = request.args.get('from', '').strip()
+        date_to = request.args.get('to', '').strip()
+        first_day = date.fromisoformat(date_from) if date_from else None
+        last_day = date.fromisoformat(date_to) if date_to else None
+    except ValueError:
+        return jsonify({'error': 'Invalid date (use YYYY-MM-DD)'}), 400
+    
+    if first_day and last_day and first_day > last_day:
+        return jsonify({'error': 'Invalid range: from is after to'}), 400
+    
+    output_format = request.args.get('format', 'json').lower()
+    if output_format != 'json':
+        return jsonify({'error': f'Invalid format: {output_format}. Use json.'}), 400
+    
+    phenomena = _get_phenomena_index(current_app.config).query(
+        first_day=day_key(first_day.year, first_day.month, first_day.day) if first_day else None,
+        last_day=day_key(last_day.year, last_day.month, last_day.day) if last_day else None,
+        min_types=min_types,
+        ee_any=ee_any,
+        ee_all=ee_all,
+        observers=observers,
+        objects=objects
+    )
+    
+    return jsonify({
+        'phenomena': phenomena,
+        'count': len(phenomena)
+    })
+
 
 @api_blueprint.route('/observers', methods=['GET'])
 def get_observers() -> Dict[str, Any]:
@@ -4010,56 +4407,26 @@ def get_observers() -> Dict[str, Any]:
         try:
             jj = int(jj_param)
             mm = int(mm_param)
-            
-            # Handle century boundary for observation year (same as _parse_seit)
-            # Years 00-49 are treated as 2000-2049, so add 100 to year
-            if jj < 50:
-                jj += 100
-            
-            # Calculate seit value for observation date: month + 13 × year
-            obs_seit = mm + 13 * jj
-            
-            print(f"🔍 DEBUG API: Looking for observer KK={kk_param}, JJ={jj}, MM={mm}, obs_seit={obs_seit}")
-            print(f"🔍 DEBUG API: Total observers loaded: {len(observers)}")
-            
-            # Find all records for this observer
-            kk_records = [obs for obs in observers if obs[0] == kk_param]
-            print(f"🔍 DEBUG API: Found {len(kk_records)} records for KK={kk_param}")
-            
-            if kk_records:
-                # Find the latest record where seit <= observation date
-                valid_records = [obs for obs in kk_records if obs[3] and _parse_seit(obs[3]) <= obs_seit]
-                print(f"🔍 DEBUG API: Found {len(valid_records)} valid records (seit <= {obs_seit})")
-                
-                for i, obs in enumerate(kk_records):
-                    parsed_seit = _parse_seit(obs[3]) if obs[3] else None
-                    print(f"🔍 DEBUG API: Record {i+1}: seit={obs[3]}, parsed={parsed_seit}, GH={obs[6]}, GN={obs[14] if len(obs) > 14 else 'N/A'}")
-                
-                if valid_records:
-                    # Get the record with the latest seit value
-                    latest_record = max(valid_records, key=lambda obs: _parse_seit(obs[3]))
-                    
-                    print(f"🔍 DEBUG API: Latest valid record: seit={latest_record[3]}, GH={latest_record[6]}, GN={latest_record[14] if len(latest_record) > 14 else 'N/A'}")
-                    
-                    # Return single observer with GH and GN
-                    result = {
-                        'KK': latest_record[0],
-                        'VName': latest_record[1],
-                        'NName': latest_record[2],
-                        'seit': latest_record[3],
-                        'aktiv': latest_record[4],
-                        'HbOrt': latest_record[5],
-                        'GH': latest_record[6],
-                        'GN': latest_record[14]
-                    }
-                    print(f"🔍 DEBUG API: Returning observer: {result}")
-                    return jsonify({'observer': result})
-            
-            # If no matching record found, return empty
-            print(f"🔍 DEBUG API: No matching observer found - returning null")
-            return jsonify({'observer': None})
-        except (ValueError, IndexError) as e:
+        except ValueError as e:
             return jsonify({'error': f'Invalid parameters: {e}'}), 400
+        
+        # Find the latest record of this observer where seit <= observation date
+        site = get_observer_registry(current_app.config).as_of(kk_param, month_value(jj, mm))
+        if site is None:
+            return jsonify({'observer': None})
+        
+        # Return single observer with GH and GN
+        record = site.record
+        return jsonify({'observer': {
+            'KK': record[0],
+            'VName': record[1],
+            'NName': record[2],
+            'seit': record[3],
+            'aktiv': record[4],
+            'HbOrt': record[5],
+            'GH': record[6],
+            'GN': record[14] if len(record) > 14 else ''
+        }})
     
     if filter_type == 'none':
         # Return all observers
@@ -4089,21 +4456,9 @@ def get_observers() -> Dict[str, Any]:
                 continue
                 
             kk = obs[0]
-            seit = obs[3]  # seit field in MM/YY format
-            
-            # Parse seit (MM/YY) to compare dates
-            try:
-                month, year = map(int, seit.split('/'))
-                # Convert to full year (assume 20xx for years < 50, 19xx otherwise)
-                full_year = 2000 + year if year < 50 else 1900 + year
-                date_key = (full_year, month)
-                
-                if kk not in latest_sites or date_key > latest_sites[kk][1]:
-                    latest_sites[kk] = (obs, date_key)
-            except (ValueError, AttributeError):
-                # If date parsing fails, keep the record
-                if kk not in latest_sites:
-                    latest_sites[kk] = (obs, (0, 0))
+            seit = seit_value(obs[3])  # seit field in MM/YY format, 0 if invalid
+            if kk not in latest_sites or seit > latest_sites[kk][1]:
+                latest_sites[kk] = (obs, seit)
         
         filtered = [obs_tuple[0] for obs_tuple in latest_sites.values()]
     
@@ -4176,33 +4531,61 @@ def get_observers_list() -> Dict[str, Any]:
     return jsonify({'observers': observer_list})
 
 
-def _parse_seit(seit_str: str) -> int:
-    """Parse 'seit' field from MM/YY format to seit value (month + 13 × year).
-    
-    Args:
-        seit_str: String in format 'MM/YY' (e.g., '01/86', '12/05')
-    
-    Returns:
-        seit value as integer (month + 13 × year)
-        
-    Note:
-        Years 00-49 are treated as 2000-2049 (add 100 to year for formula)
-        Years 50-99 are treated as 1950-1999 (use year as-is)
+@api_blueprint.route('/observers/participation', methods=['GET'])
+def get_observer_participation() -> Dict[str, Any]:
+    """Observer × year participation matrix over the whole archive.
+
+    Query parameters:
+        kk: Comma-separated observers (KK) to include (optional, default all)
+        from: First 4-digit year (optional)
+        to: Last 4-digit year (optional)
+        metric: Metric of the heatmap - 'solar_ee' (default), 'halo_days' or 'active_months'
+        format: Output format - 'json' (default) or 'heatmap' (PNG)
+
+    Metrics per observer and year:
+    - solar_ee: individual solar halo types, counted once per day
+    - halo_days: days with solar or lunar halos
+    - active_months: months with at least one observation
+
+    The matrix is built once per loaded dataset and cached until the observations change.
     """
+    from flask import current_app, Response
+    from halo.services.dataset import cached, get_observation_table, observations_key
+    from halo.services.participation import PARTICIPATION_METRICS, ParticipationMatrix
+
+    observations = current_app.config.get('OBSERVATIONS', [])
+    if not observations:
+        return jsonify({'error': 'No observations loaded. Please load a file first.'}), 400
+
     try:
-        parts = seit_str.split('/')
-        if len(parts) == 2:
-            month = int(parts[0])
-            year = int(parts[1])
-            
-            # Handle century boundary: years 00-49 are 2000+, so add 100 to year
-            if year < 50:
-                year += 100
-            
-            return month + 13 * year
-    except (ValueError, AttributeError):
-        pass
-    return 0
+        observers = _parse_int_list(request.args.get('kk', ''))
+        first_year = int(request.args['from']) if request.args.get('from', '').strip() else None
+        last_year = int(request.args['to']) if request.args.get('to', '').strip() else None
+    except ValueError:
+        return jsonify({'error': 'Invalid numeric parameters'}), 400
+
+    metric = request.args.get('metric', 'solar_ee').lower()
+    if metric not in PARTICIPATION_METRICS:
+        return jsonify({'error': f'Invalid metric: {metric}. Use {", ".join(PARTICIPATION_METRICS)}.'}), 400
+
+    config = current_app.config
+    matrix = cached(
+        config, 'participation', observations_key(config),
+        lambda: ParticipationMatrix(get_observation_table(config))
+    )
+    data = matrix.select(observers, first_year, last_year)
+
+    output_format = request.args.get('format', 'json').lower()
+    if output_format == 'json':
+        return jsonify(data)
+    elif output_format == 'heatmap':
+        if not data['observers'] or not data['years']:
+            return jsonify({'error': 'No observations for the selected observers and years'}), 400
+        i18n = _request_i18n()
+        img_data = charts.render(current_app.config, 'participation_heatmap', data, metric, i18n)
+        return Response(img_data, mimetype='image/png')
+    else:
+        return jsonify({'error': f'Invalid format: {output_format}. Use json or heatmap.'}), 400
 
 
 @api_blueprint.route('/observers/regions', methods=['GET'])
@@ -4321,21 +4704,9 @@ def add_observer() -> Dict[str, Any]:
         observers.append(new_row)
         
         # Sort by KK (column 0), then by seit (column 3)
-        def sort_key(obs):
-            kk = obs[0]
-            seit_str = obs[3]  # Format: MM/YY
-            # Parse seit to numeric value for sorting
-            try:
-                parts = seit_str.split('/')
-                month = int(parts[0])
-                year = int(parts[1])
-                seit_val = year * 100 + month  # YYMM for sorting
-            except:
-                seit_val = 0
-            return (kk, seit_val)
-        
-        observers.sort(key=sort_key)
+        observers.sort(key=lambda obs: (obs[0], seit_value(obs[3])))
         current_app.config['OBSERVERS'] = observers
+        observer_updated(current_app.config, kk)
         
         # Rewrite entire file with sorted data
         with open(halobeo_path, 'w', encoding='utf-8', newline='') as f:
@@ -4438,6 +4809,7 @@ def update_observer(kk: str) -> Dict[str, Any]:
         
         # Update config with modified list
         current_app.config['OBSERVERS'] = observers
+        observer_updated(current_app.config, kk)
         
         # Update metadata in observation files (if loaded)
         observations = current_app.config.get('OBSERVATIONS', [])
@@ -4558,39 +4930,15 @@ def check_observer_active(kk):
     # Normalize KK to 2 digits
     kk = str(kk).zfill(2)
     
-    observers = current_app.config.get('OBSERVERS', [])
-    
-    # Convert jj to 4-digit year for comparison
-    year_4digit = (2000 + jj) if jj < 50 else (1900 + jj)
-    check_date = year_4digit * 100 + mm
-    
-    # Find all site entries for this observer where seit <= check_date
-    matching_records = []
-    for obs in observers:
-        if obs[0] == kk:  # obs[0] is KK
-            # Parse seit (start date)
-            seit_parts = obs[3].split('/')
-            seit_month = int(seit_parts[0])
-            seit_year = int(seit_parts[1])
-            seit_year_4digit = (2000 + seit_year) if seit_year < 50 else (1900 + seit_year)
-            seit_date = seit_year_4digit * 100 + seit_month
-            
-            # Only consider records where seit <= check_date
-            if seit_date <= check_date:
-                matching_records.append((seit_date, obs))
+    # Record with the LATEST seit date before or at MM/JJ
+    site = get_observer_registry(current_app.config).as_of(kk, month_value(jj, mm))
     
     # No matching records found
-    if not matching_records:
+    if site is None:
         return jsonify({'active': False})
     
-    # Find the record with the LATEST seit date (most recent before or at check_date)
-    matching_records.sort(key=lambda x: x[0], reverse=True)
-    latest_record = matching_records[0][1]
-    
     # Check if that record is active (aktiv=1)
-    is_active = int(latest_record[4]) == 1
-    
-    return jsonify({'active': is_active})
+    return jsonify({'active': site.active})
 
 
 @api_blueprint.route('/observers/<kk>/sites', methods=['POST'])
@@ -4662,22 +5010,8 @@ def add_observer_site(kk):
     # Add to list
     observers.append(new_row)
     
-    # Sort observers by KK, then by seit (convert MM/YY to YYMM for proper sorting)
-    def sort_key(obs):
-        kk_val = obs[0]  # obs[0] is KK
-        seit = obs[3]    # obs[3] is seit
-        if seit and '/' in seit:
-            parts = seit.split('/')
-            if len(parts) == 2:
-                month = int(parts[0])
-                year = int(parts[1])
-                # Convert to full year: years < 50 are 20xx, years >= 50 are 19xx
-                full_year = 2000 + year if year < 50 else 1900 + year
-                # Create sortable value: YYYYMM
-                return (kk_val, full_year * 100 + month)
-        return (kk_val, 0)
-    
-    observers.sort(key=sort_key)
+    # Sort observers by KK, then by seit
+    observers.sort(key=lambda obs: (obs[0], seit_value(obs[3])))
     
     # Write to CSV
     try:
@@ -4688,6 +5022,7 @@ def add_observer_site(kk):
             writer.writerows(observers)
         
         current_app.config['OBSERVERS'] = observers
+        observer_updated(current_app.config, kk)
         
         return jsonify({
             'success': True,
@@ -4765,15 +5100,7 @@ def update_observer_site(kk):
         return jsonify({'error': 'Site entry not found'}), 404
     
     # Sort by KK and then by date
-    def sort_key(obs):
-        kk_val = obs[0]
-        seit_parts = obs[3].split('/')
-        month = int(seit_parts[0])
-        year = int(seit_parts[1])
-        full_year = 2000 + year if year < 50 else 1900 + year
-        return (kk_val, full_year * 100 + month)
-    
-    updated_observers.sort(key=sort_key)
+    updated_observers.sort(key=lambda obs: (obs[0], seit_value(obs[3])))
     
     # Write back to CSV
     try:
@@ -4786,6 +5113,7 @@ def update_observer_site(kk):
         
         # Update in-memory cache
         current_app.config['OBSERVERS'] = updated_observers
+        observer_updated(current_app.config, kk)
         
         return jsonify({
             'success': True,
@@ -4843,6 +5171,7 @@ def delete_observer_site(kk):
             writer.writerows(new_observers)
         
         current_app.config['OBSERVERS'] = new_observers
+        observer_updated(current_app.config, kk)
         
         return jsonify({
             'success': True,
@@ -4891,6 +5220,7 @@ def delete_observer():
             writer.writerows(new_observers)
         
         current_app.config['OBSERVERS'] = new_observers
+        observer_updated(current_app.config, kk)
         
         return jsonify({
             'success': True,
@@ -4901,13 +5231,25 @@ def delete_observer():
         return jsonify({'error': f'Failed to delete observer: {str(e)}'}), 500
 
 
+# Limits of /analysis/pivot
+PIVOT_MAX_DIMENSIONS = 6
+PIVOT_MAX_DENSE_CELLS = 1000000
+
+# Options of a pivot dimension, as {prefix}_<option> of a parameter
+PIVOT_DIMENSION_OPTIONS = ('from', 'to', 'month', 'year', 'timezone', 'ee_split', 'c_split')
+
+# Limit of /analysis/batch
+BATCH_MAX_ANALYSES = 200
+
+
 @api_blueprint.route('/analysis', methods=['POST'])
 def analyze_observations() -> Dict[str, Any]:
     """
     Perform analysis on observations with selected parameters.
     
     Request body:
-        - param1: Primary parameter (MM, JJ, TT, ZZ, SH, KK, GG, O, f, C, d, EE, DD, H, F, V, zz, HO_HU, SE)
+        - param1: Primary parameter (MM, JJ, TT, ZZ, SH, MH, MP, KK, GG, O, f, C, d, EE, DD, H, F, V, zz, HO_HU, SE)
+          MH = moon altitude, MP = moon phase (illuminated %), both for lunar halos (O=2)
         - param1_from: Range start for param1 (varies by parameter type, e.g., day 1-31 for TT, degree -90 to +90 for SH)
         - param1_to: Range end for param1 (varies by parameter type, e.g., day 1-31 for TT, degree -90 to +90 for SH)
         - param1_month: Month for TT parameter (1-12, required when param1=TT)
@@ -4930,72 +5272,36 @@ def analyze_observations() -> Dict[str, Any]:
         - filter2_ee_split: Split filter2 EE parameter (true/false)
         - filter2_c_split: Split filter2 C parameter (true/false)
         - filter2_dd_incomplete: Include incomplete filter2 DD (true/false)
+        - sh_type: Solar altitude at 'min', 'mean' (default) or 'max' of the observation
+        - mh_type: Moon altitude at 'min', 'mean' (default) or 'max' of the observation
+        - sparse: Return a two-parameter cross-tab in sparse form (true/false, default false)
     
     Returns:
         JSON object with:
         - success: True/False
         - data: Object with grouped observation counts {value: count, ...}
+          (sparse: {rows: [...], columns: [...], cells: [[row, column, count], ...]}
+          with non-zero cells only)
         - total: Total number of observations matching criteria
     """
+    return _analysis_response(request.get_json(silent=True), _request_i18n())
+
+
+def _analysis_response(params, i18n):
+    """Response of /analysis for the request body params, with the texts of i18n."""
     from halo.io.csv_handler import ObservationCSV
     from collections import defaultdict
     
     try:
-        # Get request parameters
-        params = request.get_json()
-        
         # Load observations from current session or default file
-        observations = current_app.config.get('OBSERVATIONS', [])
-        if not observations:
-            csv_handler = ObservationCSV()
-            data_path = Path(__file__).parent.parent.parent.parent / 'data' / 'ALLE.CSV'
-            observations, needs_conversion = csv_handler.read_observations(str(data_path))
-            # Auto-convert legacy format
-            if needs_conversion:
-                csv_handler.write_observations(data_path, observations)
-        
-        # Apply filters first
-        filtered_obs = observations
-        
-        # Apply filter1 if specified
-        if params.get('filter1'):
-            filter1 = params['filter1']
-            filter1_value = params.get('filter1_value', '')
-            filtered_obs = _apply_filter(filtered_obs, filter1, filter1_value, params, 'filter1')
-        
-        # Apply filter2 if specified
-        if params.get('filter2'):
-            filter2 = params['filter2']
-            filter2_value = params.get('filter2_value', '')
-            filtered_obs = _apply_filter(filtered_obs, filter2, filter2_value, params, 'filter2')
-        
-        # Apply param1 range filter if needed
-        param1 = params.get('param1')
-        filtered_obs = _apply_param_range_filter(filtered_obs, param1, params, 'param1')
-        
-        # Apply param2 range filter if specified
-        param2 = params.get('param2')
-        if param2:
-            filtered_obs = _apply_param_range_filter(filtered_obs, param2, params, 'param2')
-        
-        # Group by parameter(s)
-        if not param2:
-            # Single parameter analysis
-            data = _group_by_parameter(filtered_obs, param1, params, 'param1')
-        else:
-            # Two parameter analysis (cross-tabulation)
-            data, debug_info = _group_by_two_parameters(filtered_obs, param1, param2, params)
+        observations = _analysis_observations()
         
-        response_payload = {
-            'success': True,
-            'data': data,
-            'total': len(filtered_obs)
-        }
-        # Include SH debug info when present
-        if param2 and param1 and (param1 == 'SH' or param2 == 'SH'):
-            response_payload['debug'] = debug_info
-
-        return jsonify(response_payload)
+        if observations is current_app.config.get('OBSERVATIONS'):
+            # Results of the loaded observations are cached until they change
+            return jsonify(_cached_result(
+                'analysis', params, lambda: _analysis_result(params, observations), i18n.language
+            ))
+        return jsonify(_analysis_result(params, observations))
         
     except Exception as e:
         import traceback
@@ -5006,65 +5312,361 @@ def analyze_observations() -> Dict[str, Any]:
         }), 400
 
 
-def _apply_filter(observations, param_name, param_value, all_params, prefix):
-    """Apply a single filter constraint to observations."""
-    result = []
-    for obs in observations:
-        if _matches_parameter(obs, param_name, param_value, all_params, prefix):
-            result.append(obs)
-    return result
+@api_blueprint.route('/analysis/batch', methods=['POST'])
+def analyze_observations_batch() -> Dict[str, Any]:
+    """
+    Perform several analyses of the same observations in one request.
+    
+    Analyses with the same filters share one scan of the observations: every
+    distinct filter1/filter2 combination is evaluated once, the parameter
+    ranges are applied to the filtered observations (again once per distinct
+    range) and all group-bys are computed from these shared sets.
+    
+    Request body:
+        - analyses: List of analysis requests, each with the parameters of
+          /analysis (param1, param2, filter1, ..., sh_type, sparse);
+          at most BATCH_MAX_ANALYSES
+    
+    Returns:
+        JSON object with:
+        - success: True/False
+        - results: Result of every analysis in request order, as returned by
+          /analysis ({success, data, total} or {success: False, error})
+    """
+    return _analysis_batch_response(request.get_json(silent=True), _request_i18n())
 
 
-def _get_timezone_offset(region_code):
-    """Calculate timezone offset (in hours) for a geographic region.
+def _analysis_batch_response(params, i18n):
+    """Response of /analysis/batch for the request body params, with the texts of i18n."""
+    try:
+        params = params or {}
+        analyses = params.get('analyses')
+        if not isinstance(analyses, list) or not 1 <= len(analyses) <= BATCH_MAX_ANALYSES:
+            return jsonify({
+                'success': False,
+                'error': f'analyses must be a list of 1 to {BATCH_MAX_ANALYSES} analysis requests'
+            }), 400
+        
+        observations = _analysis_observations()
+        loaded = observations is current_app.config.get('OBSERVATIONS')
+        table, _ = _table_rows(observations)
+        scans = {}
+        results = []
+        for number, analysis in enumerate(analyses, 1):
+            try:
+                if not isinstance(analysis, dict):
+                    raise ValueError(f'analysis {number} is not an object')
+                compute = lambda: _analysis_result(analysis, observations, table, scans)
+                results.append(_cached_result('analysis', analysis, compute, i18n.language) if loaded else compute())
+            except Exception as e:
+                results.append({
+                    'success': False,
+                    'error': f'Analysis error: {str(e)}'
+                })
+            report_progress(number, len(analyses), list(results))
+        
+        return jsonify({'success': True, 'results': results})
+        
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': f'Analysis error: {str(e)}'
+        }), 400
+
+
+@api_blueprint.route('/analysis/pivot', methods=['POST'])
+def pivot_observations() -> Dict[str, Any]:
+    """
+    Count observations over several parameters at once (n-dimensional cross-tabulation).
     
-    Args:
-        region_code: Geographic region code (GG field, 1-39)
+    Request body:
+        - dimensions: Ordered list of 1-6 dimensions, each an object with
+          - param: Parameter (as param1/param2 of /analysis)
+          - from, to, month, year, timezone, ee_split, c_split: Options of the
+            parameter (as param1_from, param1_to, ... of /analysis)
+        - filter1, filter1_value, filter2, filter2_value: Filters (as for /analysis)
+        - sh_type, mh_type: Solar/moon altitude calculation type (as for /analysis)
+        - sparse: Return only the non-zero cells (true/false, default false)
+    
+    Every dimension is counted like a parameter of the two-parameter analysis:
+    its range restricts the observations, split parameters count once per
+    component and ZZ skips observations without time. A pivot with two
+    dimensions therefore has the counts of the two-parameter cross-tab.
     
     Returns:
-        Hour offset to add to CET to get local time
+        JSON object with:
+        - success: True/False
+        - axes: List of {param, keys} with the keys of every dimension in axis order
+          (values in the range, otherwise the values that occur)
+        - data: Nested lists of counts, axes[0] outermost; with sparse a list of
+          [index_0, ..., index_n-1, count] for every non-zero cell
+        - total: Number of observations matching filters and ranges
     """
+    return _pivot_response(request.get_json(silent=True), _request_i18n())
+
+
+def _pivot_response(params, i18n):
+    """Response of /analysis/pivot for the request body params, with the texts of i18n."""
     try:
-        region = int(region_code)
-    except (ValueError, TypeError):
-        return 0
-    
-    # Asia regions (15-26)
-    if 15 <= region <= 20:
-        return 4
-    elif 21 <= region <= 26:
-        return 7
+        params = params or {}
+        dimensions = params.get('dimensions')
+        if not isinstance(dimensions, list) or not 1 <= len(dimensions) <= PIVOT_MAX_DIMENSIONS:
+            return jsonify({
+                'success': False,
+                'error': f'dimensions must be a list of 1 to {PIVOT_MAX_DIMENSIONS} parameters'
+            }), 400
+        
+        # Dimension i gets the options of a parameter with prefix dim<i>
+        all_params = dict(params)
+        names = []
+        for number, dimension in enumerate(dimensions, 1):
+            if not isinstance(dimension, dict) or not dimension.get('param'):
+                return jsonify({'success': False, 'error': f'Dimension {number} has no param'}), 400
+            prefix = f'dim{number}'
+            names.append((prefix, dimension['param']))
+            for option in PIVOT_DIMENSION_OPTIONS:
+                if option in dimension:
+                    all_params[f'{prefix}_{option}'] = dimension[option]
+        
+        # Filters and the ranges of all dimensions in one query
+        plan = _analysis_filter_plan(all_params)
+        for prefix, name in names:
+            plan.add(compile_range(name, all_params, prefix))
+        filtered_obs = _run_query(_analysis_observations(), plan)
+        
+        # Count all key combinations in one pass
+        table, rows = _table_rows(filtered_obs)
+        entries = [
+            parameter_keys(filtered_obs, table, rows, name, all_params, prefix, _computed_values, cross=True)
+            for prefix, name in names
+        ]
+        valid = None
+        if any(name == 'ZZ' for _, name in names):
+            valid = get_column(table, 'ZS')[rows] != -1
+        labels, cells, counts = count_cells(len(filtered_obs), entries, valid)
+        
+        # Axis keys: values in the range (or that occur) plus values that occur outside the range
+        axes = []
+        flat = np.zeros(cells.size, dtype=np.int64)
+        keep = np.ones(cells.size, dtype=bool)
+        remaining = cells.copy()
+        codes = []
+        for dim_labels in reversed(labels):
+            codes.append(remaining % max(len(dim_labels), 1))
+            remaining //= max(len(dim_labels), 1)
+        codes.reverse()
+        for (prefix, name), dim_labels, dim_codes in zip(names, labels, codes):
+            keys = _range_keys(name, all_params, prefix)
+            known = set(keys)
+            keys += sorted((k for k in dim_labels if k not in known), key=_key_sort_order)
+            combined = set(_combined_keys(name, all_params, prefix))
+            keys = [k for k in keys if k not in combined]
+            axes.append({'param': name, 'keys': keys})
+            
+            # Position of every observed key on the axis
+            position = {k: i for i, k in enumerate(keys)}
+            axis_index = np.array([position.get(k, -1) for k in dim_labels], dtype=np.int64)[dim_codes]
+            keep &= axis_index >= 0
+            flat = flat * len(keys) + axis_index
+        
+        shape = [len(axis['keys']) for axis in axes]
+        flat, counts = flat[keep], counts[keep]
+        if params.get('sparse'):
+            order = np.argsort(flat)
+            index = np.stack(np.unravel_index(flat[order], shape), axis=1) if flat.size else np.zeros((0, len(shape)), dtype=np.int64)
+            data = [row + [count] for row, count in zip(index.tolist(), counts[order].tolist())]
+        else:
+            size = int(np.prod(shape, dtype=np.int64))
+            if size > PIVOT_MAX_DENSE_CELLS:
+                return jsonify({
+                    'success': False,
+                    'error': f'Pivot has {size} cells, use sparse output for more than {PIVOT_MAX_DENSE_CELLS}'
+                }), 400
+            cube = np.zeros(size, dtype=np.int64)
+            cube[flat] = counts
+            data = cube.reshape(shape).tolist()
+        
+        return jsonify({
+            'success': True,
+            'axes': axes,
+            'data': data,
+            'total': len(filtered_obs)
+        })
     
-    # Americas regions (27-34)
-    elif 27 <= region <= 30:
-        return -6
-    elif 31 <= region <= 34:
-        return -4
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': f'Analysis error: {str(e)}'
+        }), 400
+
+
+def _request_i18n():
+    """I18n of the session language of the current request.
+
+    Responses are formatted and charts rendered with this per-language
+    instance (see get_language_i18n), never with the global one that
+    concurrent requests switch to their own language.
+    """
+    from flask import session
     
-    # Europe and other regions (1-14, 35-39)
+    return get_language_i18n(session.get('language', 'de'))
+
+
+def _cached_result(endpoint, params, compute, language):
+    """Result of compute() from the result cache (see services.result_cache).
+
+    The key consists of the endpoint, the normalized request parameters,
+    ACTIVE_OBSERVERS_ONLY, the language of the response and the generations
+    of the observations and observer records, so any change of these recomputes.
+    """
+    config = current_app.config
+    key = (
+        endpoint,
+        json.dumps(params, sort_keys=True, default=str),
+        bool(config.get('ACTIVE_OBSERVERS_ONLY', False)),
+        language,
+        observations_key(config),
+        observers_key(config)
+    )
+    return get_result_cache(config).get_or_compute(key, compute)
+
+
+def _analysis_observations():
+    """Observations to analyze: the loaded observations, or the default data file if none are loaded."""
+    observations = current_app.config.get('OBSERVATIONS', [])
+    if not observations:
+        csv_handler = ObservationCSV()
+        data_path = Path(__file__).parent.parent.parent.parent / 'data' / 'ALLE.CSV'
+        observations, needs_conversion = csv_handler.read_observations(str(data_path))
+        # Auto-convert legacy format
+        if needs_conversion:
+            csv_handler.write_observations(data_path, observations)
+    return observations
+
+
+def _analysis_result(params, observations, table=None, scans=None):
+    """Result of one analysis request (see analyze_observations).
+
+    Args:
+        params: Analysis request parameters
+        observations: Observations to analyze
+        table: ObservationTable containing the observations (looked up if None)
+        scans: Filtered observations shared by the analyses of a batch, keyed
+            by filters and ranges; None filters in a single query
+
+    Returns:
+        Response payload {success, data, total[, debug]}
+    """
+    param1 = params.get('param1')
+    param2 = params.get('param2')
+    range_prefixes = ('param1', 'param2') if param2 else ('param1',)
+
+    if scans is None:
+        # Filters and parameter ranges in one query
+        plan = _analysis_filter_plan(params)
     else:
-        return 0
+        # Filters once per distinct filter set, ranges on the filtered observations
+        filter_key = _options_key(params, tuple(p for p in ('filter1', 'filter2') if params.get(p)))
+        if filter_key not in scans:
+            scans[filter_key] = _run_query(observations, _analysis_filter_plan(params), table)
+        observations = scans[filter_key]
+        plan = QueryPlan()
+
+    # Range of param1 (and param2 if specified)
+    for prefix in range_prefixes:
+        plan.add(compile_range(params.get(prefix), params, prefix))
+
+    if scans is None:
+        filtered_obs = _run_query(observations, plan, table)
+    else:
+        range_key = (filter_key, _options_key(params, range_prefixes))
+        if range_key not in scans:
+            scans[range_key] = _run_query(observations, plan, table)
+        filtered_obs = scans[range_key]
+
+    # Group by parameter(s)
+    if not param2:
+        # Single parameter analysis
+        data = _group_by_parameter(filtered_obs, param1, params, 'param1', table)
+    else:
+        # Two parameter analysis (cross-tabulation)
+        data, debug_info = _group_by_two_parameters(filtered_obs, param1, param2, params, table)
+        if params.get('sparse'):
+            data = sparse_cross_tab(data)
+
+    response_payload = {
+        'success': True,
+        'data': data,
+        'total': len(filtered_obs)
+    }
+    # Include SH debug info when present
+    if param2 and param1 and (param1 == 'SH' or param2 == 'SH'):
+        response_payload['debug'] = debug_info
+    return response_payload
+
+
+def _options_key(params, prefixes):
+    """Hashable key of the parameters with the given prefixes (and the altitude types)."""
+    return tuple(sorted(
+        (name, repr(value)) for name, value in params.items()
+        if name.startswith(prefixes) or name in ('sh_type', 'mh_type')
+    ))
+
 
+def _analysis_filter_plan(params):
+    """Query plan of the analysis filters filter1/filter2 (parameter equals a value)."""
+    plan = QueryPlan()
+    for prefix in ('filter1', 'filter2'):
+        if params.get(prefix):
+            plan.add(compile_match(params[prefix], params.get(f'{prefix}_value', ''), params, prefix))
+    return plan
 
-def _extract_sector_letters(sector_str: str) -> list[str]:
-    """Return unique sector octant letters (a-h) found in the sector string."""
-    if not sector_str:
-        return []
-    cleaned = []
-    for ch in sector_str.lower():
-        if 'a' <= ch <= 'h':
-            cleaned.append(ch)
-    return sorted(set(cleaned))
 
+def _table_rows(observations, table=None):
+    """Observation table and table rows of a list of observations.
 
-def _calculate_observation_solar_altitude(obs, observers_list, sh_type='mean'):
+    Observations from the loaded data (or from the given table) are looked
+    up in the cached observation table; any other list gets a temporary table.
+    """
+    rows = table.rows_of(observations) if table is not None else None
+    if rows is None:
+        table = get_observation_table(current_app.config)
+        rows = table.rows_of(observations)
+    if rows is None:
+        table = ObservationTable(observations)
+        rows = np.arange(table.size)
+    return table, rows
+
+
+def _computed_values(observations, column):
+    """Values of a computed query column: ('SH', sh_type), ('MH', mh_type) or ('MP', _)."""
+    name, option = column
+    registry = get_observer_registry(current_app.config)
+    if name == 'SH':
+        return _calculate_observation_solar_altitudes(observations, registry, option)
+    return _calculate_observation_lunar_values(observations, registry, name, option)
+
+
+def _run_query(observations, plan, table=None):
+    """Observations matching a compiled query plan (see services.query), in their order."""
+    if not plan.terms:
+        return observations
+    table, rows = _table_rows(observations, table)
+    return table.subset(rows[plan.select(observations, table, rows, _computed_values)])
+
+
+def _calculate_observation_solar_altitude(obs, registry, sh_type='mean'):
     """Calculate solar altitude for an observation.
     
     This is only applicable for sun observations (O=1) with known observer location.
     
     Args:
         obs: Observation object
-        observers_list: List of observer records
+        registry: ObserverRegistry of the observer records
         sh_type: Altitude calculation type ('min', 'mean', or 'max')
     
     Returns:
@@ -5078,67 +5680,21 @@ def _calculate_observation_solar_altitude(obs, observers_list, sh_type='mean'):
     if obs.g == 1:
         return None
     
-    # Find observer record valid for this observation date
+    # Altitudes already calculated for this observer and sh_type
     observer_kk = str(obs.KK).zfill(2)
-    observer_record = None
-    
-    # Convert observation date to comparable format
-    # obs.JJ is 2-digit year: >= 50 means 19xx, < 50 means 20xx
-    obs_month = obs.MM
-    obs_year_2digit = obs.JJ
-    obs_year = 1900 + obs_year_2digit if obs_year_2digit >= 50 else 2000 + obs_year_2digit
-    
-    # Create sortable seit value for observation: YYYYMM (year*100 + month)
-    obs_seit_comparable = obs_year * 100 + obs_month
-    
-    # Find the observer record for this KK that is valid on this observation date
-    # Multiple records per observer - find the latest one with seit <= obs_seit
-    candidates = []
-    for obs_rec in observers_list:
-        if obs_rec[0] == observer_kk:  # obs_rec[0] is KK field
-            # obs_rec[3] is seit field in format "MM/YY"
-            try:
-                seit_parts = obs_rec[3].split('/')
-                seit_month = int(seit_parts[0])
-                seit_year_2digit = int(seit_parts[1])
-                seit_year = 1900 + seit_year_2digit if seit_year_2digit >= 50 else 2000 + seit_year_2digit
-                
-                # Create sortable seit value for record: YYYYMM
-                rec_seit_comparable = seit_year * 100 + seit_month
-                
-                # Check if this record is valid on the observation date
-                if rec_seit_comparable <= obs_seit_comparable:
-                    candidates.append((rec_seit_comparable, obs_rec))
-            except (ValueError, IndexError):
-                pass
+    memo = registry.memo(observer_kk, f'sh_{sh_type}')
+    key = _ephemeris_key(obs)
+    if key in memo:
+        return memo[key]
     
-    if candidates:
-        # Use the record with the most recent seit date that is still valid
-        candidates.sort(key=lambda x: x[0], reverse=True)
-        observer_record = candidates[0][1]
-    
-    if not observer_record:
+    # Find observer record valid for this observation date
+    site = registry.as_of(observer_kk, month_value(obs.JJ, obs.MM))
+    if site is None:
+        memo[key] = None
         return None
     
-    # Convert observer record tuple to dict for easier access
-    # Format: (KK, VName, NName, seit, aktiv, HbOrt, GH, HLG, HLM, HOW, HBG, HBM, HNS, NbOrt, GN, NLG, NLM, NOW, NBG, NBM, NNS)
-    observer_dict = {
-        'HLG': observer_record[7],   # Main site longitude degrees
-        'HLM': observer_record[8],   # Main site longitude minutes
-        'HOW': observer_record[9],   # Main site E/W ('O' for Ost/East, 'W' for West)
-        'HBG': observer_record[10],  # Main site latitude degrees
-        'HBM': observer_record[11],  # Main site latitude minutes
-        'HNS': observer_record[12],  # Main site N/S
-        'NLG': observer_record[15],  # Alternate site longitude degrees
-        'NLM': observer_record[16],  # Alternate site longitude minutes
-        'NOW': observer_record[17],  # Alternate site E/W ('O' for Ost/East, 'W' for West)
-        'NBG': observer_record[18],  # Alternate site latitude degrees
-        'NBM': observer_record[19],  # Alternate site latitude minutes
-        'NNS': observer_record[20],  # Alternate site N/S
-    }
-    
     # Get observer coordinates
-    longitude, latitude = get_observer_coordinates(observer_dict, obs.g)
+    longitude, latitude = site.coordinates(obs.g)
     
     # Calculate solar altitude
     # Convert DD (duration in units of 10 minutes) to actual minutes
@@ -5158,497 +5714,155 @@ def _calculate_observation_solar_altitude(obs, observers_list, sh_type='mean'):
         gg=obs.g
     )
     
+    memo[key] = altitude
     return altitude
 
 
-def _apply_param_range_filter(observations, param_name, all_params, prefix):
-    """Apply range filter to a parameter."""
-    # Special handling for TT (day) - ALWAYS filter by month/year, regardless of range
-    if param_name == 'TT':
-        month_key = f'{prefix}_month'
-        year_key = f'{prefix}_year'
-        month = all_params.get(month_key)
-        year = all_params.get(year_key)
-        
-        # TT parameter REQUIRES month and year context
-        if month is None or year is None:
-            return observations  # Can't filter without month/year
-        
-        try:
-            month = int(month)
-            year = int(year)
-            # Convert 4-digit year to 2-digit if needed
-            if year >= 1900:
-                year = year % 100
-        except (ValueError, TypeError):
-            return observations
-        
-        # Filter by month and year first
-        filtered = []
-        for obs in observations:
-            if obs.MM == month and obs.JJ == year:
-                filtered.append(obs)
-        
-        # Then apply day range if specified
-        from_key = f'{prefix}_from'
-        to_key = f'{prefix}_to'
-        if from_key in all_params and to_key in all_params:
-            from_val = all_params.get(from_key)
-            to_val = all_params.get(to_key)
-            if from_val is not None and to_val is not None:
-                try:
-                    from_val = int(from_val)
-                    to_val = int(to_val)
-                    result = []
-                    for obs in filtered:
-                        if from_val <= obs.TT <= to_val:
-                            result.append(obs)
-                    return result
-                except (ValueError, TypeError):
-                    pass
-        
-        return filtered
-    
-    from_key = f'{prefix}_from'
-    to_key = f'{prefix}_to'
-    
-    # Handle parameters with no range (single values)
-    if from_key not in all_params or to_key not in all_params:
-        return observations
-    
-    from_val = all_params.get(from_key)
-    to_val = all_params.get(to_key)
-    
-    if from_val is None or to_val is None:
-        return observations
-    
-    # Convert to appropriate numeric type
-    try:
-        if param_name == 'ZZ':
-            # Time can be float
-            from_val = float(from_val)
-            to_val = float(to_val)
-        elif param_name == 'JJ':
-            # Year - convert 4-digit to 2-digit (1988 -> 88)
-            from_val = int(from_val)
-            to_val = int(to_val)
-            if from_val >= 1900:
-                from_val = from_val % 100
-            if to_val >= 1900:
-                to_val = to_val % 100
-        else:
-            # Most parameters are integers
-            from_val = int(from_val)
-            to_val = int(to_val)
-    except (ValueError, TypeError):
-        return observations
-    
-    # Special handling for different parameter types
-    if param_name == 'TT':
-        # Day parameter - requires month/year context
-        return _apply_tt_range_filter(observations, all_params, prefix)
-    elif param_name == 'JJ':
-        # Year parameter - special handling for century boundary
-        result = []
-        
-        # Handle year ranges that cross century boundary
-        if from_val > to_val:
-            # Range crosses century (e.g., 50-49 means 1950-1999 AND 2000-2049)
-            for obs in observations:
-                val = getattr(obs, param_name, None)
-                if val is not None and (from_val <= val <= 99 or 0 <= val <= to_val):
-                    result.append(obs)
-        else:
-            # Normal range within same century
-            for obs in observations:
-                val = getattr(obs, param_name, None)
-                if val is not None and from_val <= val <= to_val:
-                    result.append(obs)
-        
-        return result
-    elif param_name == 'ZZ':
-        # Time parameter - from/to are hours (0-23 or float)
-        # Note: ZZ refers to ZS (hour) field in the observation model
-        # Observations are stored in CET, but may need conversion to local time
-        
-        # Check if timezone conversion is needed
-        timezone_key = f'{prefix}_timezone'
-        use_local = all_params.get(timezone_key) == 'local'
-        
-        result = []
-        for obs in observations:
-            zz = obs.ZS if hasattr(obs, 'ZS') else 0
-            
-            # If local time requested, convert from CET to observer's local time
-            if use_local:
-                # Get observer's region to determine timezone offset
-                # GG contains the geographic region code
-                region_code = obs.GG if hasattr(obs, 'GG') else 0
-                
-                # Calculate timezone offset based on region
-                # This is a simplified approach - in reality, timezones are complex
-                # For now, we'll use rough approximations based on longitude
-                # Europe regions (1-14): mostly CET (offset = 0)
-                # Asia regions (15-26): UTC+5 to UTC+9 (offset = +4 to +8 from CET)
-                # Americas regions (27-34): UTC-5 to UTC-8 (offset = -6 to -9 from CET)
-                # Other regions: assume CET
-                
-                offset = 0
-                if 15 <= region_code <= 20:  # West/Central Asia
-                    offset = 4  # Roughly UTC+5 = CET+4
-                elif 21 <= region_code <= 26:  # East Asia
-                    offset = 7  # Roughly UTC+8 = CET+7
-                elif 27 <= region_code <= 30:  # North America
-                    offset = -6  # Roughly UTC-6 = CET-7
-                elif 31 <= region_code <= 34:  # South America
-                    offset = -4  # Roughly UTC-3 = CET-4
-                
-                # Apply offset (with wraparound for 24-hour clock)
-                zz = (zz + offset) % 24
-            
-            if from_val <= zz <= to_val:
-                result.append(obs)
-        return result
-    elif param_name == 'SH':
-        # Solar altitude parameter - must be calculated on-the-fly
-        # Only applicable for sun observations (O=1) at known observer locations (g != 1)
-        observers = current_app.config.get('OBSERVERS', [])
-        
-        result = []
-        for obs in observations:
-            # Filter out observations that can't have solar altitude calculated
-            if obs.O != 1 or obs.g == 1:
-                continue
-            
-            sh_type = all_params.get('sh_type', 'mean')
-            altitude = _calculate_observation_solar_altitude(obs, observers, sh_type)
-            if altitude is not None and from_val <= altitude <= to_val:
-                result.append(obs)
-        
-        return result
-    elif param_name == 'HO_HU':
-        # Pillar height parameter - check both HO and HU values
-        result = []
-        for obs in observations:
-            ho = getattr(obs, 'HO', None)
-            hu = getattr(obs, 'HU', None)
-            # Include observation if either HO or HU is in range
-            if (ho is not None and from_val <= ho <= to_val) or \
-               (hu is not None and from_val <= hu <= to_val):
-                result.append(obs)
-        return result
-    else:
-        # Numeric range parameters
-        result = []
-        for obs in observations:
-            val = getattr(obs, param_name, None)
-            if val is not None and from_val <= val <= to_val:
-                result.append(obs)
-        return result
-
-
-def _apply_tt_range_filter(observations, all_params, prefix):
-    """Apply day range filter to TT parameter with month/year context."""
-    month_key = f'{prefix}_month'
-    year_key = f'{prefix}_year'
-    from_key = f'{prefix}_from'
-    to_key = f'{prefix}_to'
-    
-    month = all_params.get(month_key)
-    year = all_params.get(year_key)
-    day_from = all_params.get(from_key)
-    day_to = all_params.get(to_key)
-    
-    # If any required parameter is missing, don't filter
-    if month is None or year is None or day_from is None or day_to is None:
-        return observations
-    
-    try:
-        month = int(month)
-        year = int(year)
-        day_from = int(day_from)
-        day_to = int(day_to)
-        
-        # Convert 4-digit year to 2-digit if needed
-        if year >= 1900:
-            year = year % 100
-    except (ValueError, TypeError):
-        return observations
-    
-    result = []
-    for obs in observations:
-        # Only include observations from the specified month and year, within day range
-        if obs.MM == month and obs.JJ == year:
-            if day_from <= obs.TT <= day_to:
-                result.append(obs)
-    
-    return result
+def _ephemeris_key(obs):
+    """Fields of an observation its sun and moon positions depend on (besides KK and the observer sites)."""
+    return (obs.JJ, obs.MM, obs.TT, obs.ZS, obs.ZM, obs.DD, obs.g)
 
 
-def _matches_parameter(obs, param_name, param_value, all_params, prefix):
-    """Check if observation matches a parameter filter value."""
-    # Special handling for TT (day) - requires month and year context
-    if param_name == 'TT':
-        # Day parameter requires month and year to be meaningful
-        month_key = f'{prefix}_month'
-        year_key = f'{prefix}_year'
-        filter_month = all_params.get(month_key)
-        filter_year = all_params.get(year_key)
-        
-        # If month/year not provided, can't match properly
-        if filter_month is None or filter_year is None:
-            return False
-        
-        try:
-            filter_day = int(param_value)
-            filter_month = int(filter_month)
-            filter_year = int(filter_year)
-            
-            # Convert 4-digit year to 2-digit if needed
-            if filter_year >= 1900:
-                filter_year = filter_year % 100
-            
-            # Match all three: day, month, year
-            return (obs.TT == filter_day and 
-                    obs.MM == filter_month and 
-                    obs.JJ == filter_year)
-        except (ValueError, TypeError):
-            return False
-    
-    # Get the parameter value from observation
-    # Special handling for ZZ (time) - use ZS (hour) field
-    if param_name == 'ZZ':
-        obs_value = getattr(obs, 'ZS', None)
-        # Apply timezone conversion if needed
-        if obs_value is not None:
-            timezone_key = f'{prefix}_timezone'
-            use_local = all_params.get(timezone_key) == 'local'
-            if use_local:
-                region_code = getattr(obs, 'GG', None)
-                offset = _get_timezone_offset(region_code)
-                obs_value = (obs_value + offset) % 24
-    elif param_name == 'SH':
-        # Solar altitude - must be calculated (only for sun observations at known locations)
+def _calculate_observation_solar_altitudes(observations, registry, sh_type='mean'):
+    """Calculate solar altitudes for a list of observations in one pass.
+
+    Same results as _calculate_observation_solar_altitude() per observation,
+    but missing altitudes are computed with calculate_solar_altitude_array().
+    Altitudes are memoized per observer in the registry, so repeated analyses
+    of unchanged observations only look them up.
+
+    Args:
+        observations: List of Observation objects
+        registry: ObserverRegistry of the observer records
+        sh_type: Altitude calculation type ('min', 'mean', or 'max')
+
+    Returns:
+        List with the solar altitude (integer) or None for every observation
+    """
+    altitudes = [None] * len(observations)
+    memos = {}
+    rows = []
+    columns = []
+    for i, obs in enumerate(observations):
+        # Only sun observations at known observer locations
         if obs.O != 1 or obs.g == 1:
-            obs_value = None
+            continue
+        memo = memos.get(obs.KK)
+        if memo is None:
+            memo = memos[obs.KK] = registry.memo(str(obs.KK).zfill(2), f'sh_{sh_type}')
+        key = _ephemeris_key(obs)
+        if key in memo:
+            altitudes[i] = memo[key]
+            continue
+        site = registry.as_of(str(obs.KK).zfill(2), month_value(obs.JJ, obs.MM))
+        if site is None:
+            memo[key] = None
+            continue
+        longitude, latitude = site.coordinates(obs.g)
+        rows.append((i, memo, key))
+        columns.append((
+            obs.JJ, obs.MM, obs.TT, obs.ZS, obs.ZM, obs.DD * 10 if obs.DD >= 0 else 0,
+            longitude, latitude
+        ))
+
+    if rows:
+        year, month, day, hour, minute, duration, longitude, latitude = zip(*columns)
+        values = calculate_solar_altitude_array(
+            year, month, day, hour, minute, duration, longitude, latitude, sh_type
+        )
+        for (i, memo, key), value in zip(rows, values.tolist()):
+            altitudes[i] = memo[key] = value
+
+    return altitudes
+
+
+def _calculate_observation_lunar_values(observations, registry, param_name, mh_type='mean'):
+    """Calculate moon altitude (MH) or moon phase (MP) for a list of observations.
+
+    Only applicable for moon observations (O=2). The moon altitude also needs
+    a known observer location (g != 1); the phase is the illuminated fraction
+    in percent. Values are memoized per observer in the registry like the
+    solar altitudes.
+
+    Args:
+        observations: List of Observation objects
+        registry: ObserverRegistry of the observer records
+        param_name: 'MH' or 'MP'
+        mh_type: Altitude calculation type for MH ('min', 'mean', or 'max')
+
+    Returns:
+        List with the value (integer) or None for every observation
+    """
+    memo_name = f'mh_{mh_type}' if param_name == 'MH' else 'mp'
+    values = [None] * len(observations)
+    memos = {}
+    rows = []
+    columns = []
+    for i, obs in enumerate(observations):
+        if obs.O != 2 or (param_name == 'MH' and obs.g == 1):
+            continue
+        memo = memos.get(obs.KK)
+        if memo is None:
+            memo = memos[obs.KK] = registry.memo(str(obs.KK).zfill(2), memo_name)
+        key = _ephemeris_key(obs)
+        if key in memo:
+            values[i] = memo[key]
+            continue
+        if param_name == 'MH':
+            site = registry.as_of(str(obs.KK).zfill(2), month_value(obs.JJ, obs.MM))
+            if site is None:
+                memo[key] = None
+                continue
+            longitude, latitude = site.coordinates(obs.g)
         else:
-            observers = current_app.config.get('OBSERVERS', [])
-            sh_type = all_params.get('sh_type', 'mean')
-            obs_value = _calculate_observation_solar_altitude(obs, observers, sh_type)
-    elif param_name == 'SE':
-        # Sectors: check if the filter octant letter is present in the sectors string
-        sector_letters = _extract_sector_letters(getattr(obs, 'sectors', ''))
-        # param_value should be a single letter a-h
-        return param_value.lower() in sector_letters
-    else:
-        obs_value = getattr(obs, param_name, None)
-    
+            # The phase does not depend on the location
+            longitude, latitude = 0.0, 0.0
+        rows.append((i, memo, key))
+        columns.append((
+            obs.JJ, obs.MM, obs.TT, obs.ZS, obs.ZM, obs.DD * 10 if obs.DD >= 0 else 0,
+            longitude, latitude
+        ))
+
+    if rows:
+        year, month, day, hour, minute, duration, longitude, latitude = zip(*columns)
+        altitudes, fractions = calculate_lunar_position_array(
+            year, month, day, hour, minute, duration, longitude, latitude, mh_type
+        )
+        if param_name == 'MH':
+            results = altitudes.tolist()
+        else:
+            results = np.rint(fractions * 100).astype(np.int64).tolist()
+        for (i, memo, key), value in zip(rows, results):
+            values[i] = memo[key] = value
 
-    
-    if obs_value is None:
-        return False
-    
-    # Convert param_value to appropriate type for comparison
+    return values
+
+
+def _key_sort_order(key):
+    """Sort order of group keys: 'keine Angabe' first, then numeric keys by value, then others."""
+    if key == 'keine Angabe':
+        return (0, float('-inf'))  # Sort to beginning
     try:
-        if param_name in ['MM', 'JJ', 'ZZ', 'SH', 'KK', 'GG', 'O', 'f', 'd', 'EE', 'DD', 'H', 'F', 'V', 'zz']:
-            # Most parameters are integers (note: TT handled above)
-            if param_name == 'ZZ':
-                # Time can be float
-                param_value = float(param_value)
-            elif param_name == 'JJ':
-                # Year - convert 4-digit to 2-digit (1988 -> 88)
-                param_value = int(param_value)
-                if param_value >= 1900:
-                    param_value = param_value % 100
-            else:
-                param_value = int(param_value)
-            return obs_value == param_value
+        return (1, float(key))  # Sort numerically
     except (ValueError, TypeError):
-        return False
-    
-    # For composite parameters, handle special cases
-    if param_name == 'C':
-        # Completeness can have split option
-        split_key = f'{prefix}_c_split'
-        try:
-            param_value = int(param_value)
-        except (ValueError, TypeError):
-            return False
-        if all_params.get(split_key):
-            # When split, compare the full C value
-            return obs.C == param_value
-        else:
-            # When not split, compare without suffix
-            return str(obs.C).rstrip('+') == str(param_value)
-    
-    elif param_name == 'EE':
-        # Halo type can have split option
-        split_key = f'{prefix}_ee_split'
-        try:
-            param_value = int(param_value)
-        except (ValueError, TypeError):
-            return False
-        if all_params.get(split_key):
-            return obs.EE == param_value
-        else:
-            return str(obs.EE).rstrip('*') == str(param_value)
-    
-    elif param_name == 'HO_HU':
-        # Match if either HO or HU equals the requested height (only valid when >=0)
-        try:
-            param_value = int(param_value)
-        except (ValueError, TypeError):
-            return False
-        ho = getattr(obs, 'HO', None)
-        hu = getattr(obs, 'HU', None)
-        ho_match = ho is not None and ho >= 0 and ho == param_value
-        hu_match = hu is not None and hu >= 0 and hu == param_value
-        return ho_match or hu_match
-
-    elif param_name == 'DD':
-        # Duration with incomplete option
-        incomplete_key = f'{prefix}_dd_incomplete'
-        try:
-            param_value = int(param_value)
-        except (ValueError, TypeError):
-            return False
-        if all_params.get(incomplete_key):
-            # Include all observations
-            return True
-        else:
-            # Exclude observations with kA or kE
-            return obs.DD is not None and obs.DD not in ['kA', 'kE', '', None]
-    
-    return obs_value == param_value
+        return (2, key)  # Non-numeric at end
 
 
-def _group_by_parameter(observations, param_name, all_params, prefix):
+def _combined_keys(param_name, all_params, prefix):
+    """Keys of combined types that are dropped when a parameter is split (C4-C7, e.g. EE 04)."""
+    if param_name == 'C' and all_params.get(f'{prefix}_c_split'):
+        return ['4', '5', '6', '7']
+    if param_name == 'EE' and all_params.get(f'{prefix}_ee_split'):
+        from halo.models.constants import COMBINED_TO_INDIVIDUAL_HALOS
+        return [str(k) for k in COMBINED_TO_INDIVIDUAL_HALOS.keys()]
+    return []
+
+
+def _group_by_parameter(observations, param_name, all_params, prefix, table=None):
     """Group observations by a single parameter and return counts."""
-    from collections import defaultdict
-    
-    groups = defaultdict(int)
-    
-    # Check if timezone conversion is needed for ZZ parameter
-    timezone_key = f'{prefix}_timezone'
-    use_local = all_params.get(timezone_key) == 'local' and param_name == 'ZZ'
-    
-    # Check if we need observer data for SH calculation
-    observers = None
-    if param_name == 'SH':
-        observers = current_app.config.get('OBSERVERS', [])
-    
-    for obs in observations:
-        # Get parameter value from observation
-        # Special handling for TT (day) - observations are already filtered by month/year in _apply_param_range_filter
-        if param_name == 'TT':
-            # Just use the day value directly - filtering by month/year already done
-            value = obs.TT
-        # Special handling for ZZ (time) - use ZS (hour) field
-        elif param_name == 'ZZ':
-            value = getattr(obs, 'ZS', None)
-            
-            # Apply timezone conversion if needed
-            if value is not None and use_local:
-                region_code = obs.GG if hasattr(obs, 'GG') else 0
-                offset = _get_timezone_offset(region_code)
-                value = (value + offset) % 24
-        elif param_name == 'SH':
-            # Solar altitude - must be calculated (only for sun observations at known locations)
-            if obs.O != 1 or obs.g == 1:
-                value = None
-            else:
-                sh_type = all_params.get('sh_type', 'mean')
-                value = _calculate_observation_solar_altitude(obs, observers, sh_type)
-        elif param_name == 'HO_HU':
-            # Light pillar heights: count both HO and HU if present (>=0)
-            ho = getattr(obs, 'HO', None)
-            hu = getattr(obs, 'HU', None)
-            added = False
-            if ho is not None and ho >= 0:
-                groups[str(ho)] += 1
-                added = True
-            if hu is not None and hu >= 0:
-                groups[str(hu)] += 1
-                added = True
-            value = None if added else None
-        elif param_name == 'C':
-            # Cirrus type with split option
-            value = getattr(obs, 'C', None)
-            split_key = f'{prefix}_c_split'
-            if value is not None and all_params.get(split_key):
-                # When split is enabled, expand C4/C5/C6/C7 into components
-                c_value = int(value) if isinstance(value, (int, str)) else value
-                if c_value == 4:  # C4 (Ci + Cc) → count as both C1 and C2
-                    groups['1'] += 1
-                    groups['2'] += 1
-                    value = None  # Don't count again below
-                elif c_value == 5:  # C5 (Ci + Cs) → count as both C1 and C3
-                    groups['1'] += 1
-                    groups['3'] += 1
-                    value = None  # Don't count again below
-                elif c_value == 6:  # C6 (Cc + Cs) → count as both C2 and C3
-                    groups['2'] += 1
-                    groups['3'] += 1
-                    value = None  # Don't count again below
-                elif c_value == 7:  # C7 (Ci + Cc + Cs) → count as C1, C2, and C3
-                    groups['1'] += 1
-                    groups['2'] += 1
-                    groups['3'] += 1
-                    value = None  # Don't count again below
-        elif param_name == 'EE':
-            # Halo type with split option
-            value = getattr(obs, 'EE', None)
-            split_key = f'{prefix}_ee_split'
-            if value is not None and all_params.get(split_key):
-                # When split is enabled, expand combined halo types into components
-                from halo.models.constants import COMBINED_TO_INDIVIDUAL_HALOS
-                ee_value = int(value) if isinstance(value, (int, str)) else value
-                if ee_value in COMBINED_TO_INDIVIDUAL_HALOS:
-                    left, right = COMBINED_TO_INDIVIDUAL_HALOS[ee_value]
-                    groups[str(left)] += 1
-                    groups[str(right)] += 1
-                    value = None  # Don't count again below
-        elif param_name == 'SE':
-            # Sectors: count octants present or visible
-            # V=2 (complete halo): all segments a-h are visible
-            # V=1 (incomplete halo): only explicitly listed segments are visible
-            # No segments: "nicht zutreffend" - skip this observation entirely
-            v = getattr(obs, 'V', None)
-            if v == 2:
-                # Complete halo: count all segments a-h
-                sector_letters = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
-            else:
-                # Incomplete halo: extract explicit sectors
-                sector_letters = _extract_sector_letters(getattr(obs, 'sectors', ''))
-            
-            # Only count observations that have sectors (skip "nicht zutreffend")
-            for letter in sector_letters:
-                groups[letter] += 1
-            continue  # Skip further processing for this observation
-        else:
-            value = getattr(obs, param_name, None)
-        
-        # Convert 2-digit years to 4-digit years for JJ parameter
-        if param_name == 'JJ' and value is not None:
-            year = int(value) if isinstance(value, (int, str)) else value
-            # Year < 50 = 20xx, Year >= 50 = 19xx (as per HALO key standard)
-            if year < 50:
-                value = 2000 + year
-            elif year < 100:
-                value = 1900 + year
-            # else: already 4-digit year
-        
-        # Use unformatted key for grouping to avoid duplicates
-        if value is None:
-            if param_name in ['C', 'EE', 'HO_HU']:
-                # For split/combined parameters, component values may already be counted
-                pass
-            else:
-                group_key = 'keine Angabe'  # "not observed"
-                groups[group_key] += 1
-        else:
-            group_key = str(value)  # Keep numeric/raw value for grouping
-            groups[group_key] += 1
+    table, rows = _table_rows(observations, table)
+    _, keys = parameter_keys(observations, table, rows, param_name, all_params, prefix, _computed_values)
+    groups = count_keys(keys)
     
     # Generate all values in the range if range is specified
     result = dict(groups)
@@ -5737,29 +5951,12 @@ def _group_by_parameter(observations, param_name, all_params, prefix):
                 except (ValueError, TypeError):
                     pass
     
-    # Sort keys intelligently (before formatting)
-    def numeric_sort_key(item):
-        key = item[0]
-        if key == 'keine Angabe':
-            return (0, float('-inf'))  # Sort to beginning
-        try:
-            return (1, float(key))  # Sort numerically
-        except (ValueError, TypeError):
-            return (2, key)  # Non-numeric at end
-    
     # Apply numeric sorting for all parameters (numeric parameters sort numerically, others alphabetically)
-    result = dict(sorted(result.items(), key=numeric_sort_key))
+    result = dict(sorted(result.items(), key=lambda item: _key_sort_order(item[0])))
     
     # Remove combined types when split is enabled (they will have 0 counts)
-    if param_name == 'C' and all_params.get(f'{prefix}_c_split'):
-        # Remove C4, C5, C6, C7 (combined cirrus types)
-        for combined_c in ['4', '5', '6', '7']:
-            result.pop(combined_c, None)
-    elif param_name == 'EE' and all_params.get(f'{prefix}_ee_split'):
-        # Remove combined halo types
-        from halo.models.constants import COMBINED_TO_INDIVIDUAL_HALOS
-        for combined_ee in COMBINED_TO_INDIVIDUAL_HALOS.keys():
-            result.pop(str(combined_ee), None)
+    for combined in _combined_keys(param_name, all_params, prefix):
+        result.pop(combined, None)
     
     # Format values for display - return as ordered list to preserve sort order in JSON
     formatted_result = [
@@ -5770,211 +5967,26 @@ def _group_by_parameter(observations, param_name, all_params, prefix):
     return formatted_result
 
 
-def _group_by_two_parameters(observations, param1_name, param2_name, all_params):
-    """Group observations by two parameters and return cross-tabulation."""
-    from collections import defaultdict
-    
-    # Create nested structure for cross-tab
-    groups = defaultdict(lambda: defaultdict(int))
-    
-    # Check if we need observer data for SH calculation
-    observers = None
-    if param1_name == 'SH' or param2_name == 'SH':
-        observers = current_app.config.get('OBSERVERS', [])
+def _range_keys(param_name, all_params, prefix):
+    """Keys of all values in the range of a cross-tab parameter ({prefix}_from/{prefix}_to).
 
-    # Debug counters for SH and HO_HU calculations
-    hohu_debug = {
-        'processed': 0,
-        'samples': []
-    }
-    sh_debug = {
-        'param1_attempts': 0,
-        'param1_none': 0,
-        'param2_attempts': 0,
-        'param2_none': 0,
-    }
-    
-    for obs in observations:
-        # Get values for both parameters
-        # Special handling for ZZ (time) - use ZS (hour) field
-        if param1_name == 'ZZ':
-            val1 = getattr(obs, 'ZS', None)
-            # ZS=-1 means time not specified - skip this observation for time analysis
-            if val1 == -1:
-                continue
-        elif param1_name == 'SH':
-            if obs.O != 1 or obs.g == 1:
-                val1 = None
-                sh_debug['param1_none'] += 1
-            else:
-                sh_type = all_params.get('sh_type', 'mean')
-                val1 = _calculate_observation_solar_altitude(obs, observers, sh_type)
-                sh_debug['param1_attempts'] += 1
-                if val1 is None:
-                    sh_debug['param1_none'] += 1
-        else:
-            val1 = getattr(obs, param1_name, None)
-        
-        if param2_name == 'ZZ':
-            val2 = getattr(obs, 'ZS', None)
-            # ZS=-1 means time not specified - skip this observation for time analysis
-            if val2 == -1:
-                continue
-        elif param2_name == 'SH':
-            if obs.O != 1 or obs.g == 1:
-                val2 = None
-                sh_debug['param2_none'] += 1
-            else:
-                sh_type = all_params.get('sh_type', 'mean')
-                val2 = _calculate_observation_solar_altitude(obs, observers, sh_type)
-                sh_debug['param2_attempts'] += 1
-                if val2 is None:
-                    sh_debug['param2_none'] += 1
-        else:
-            val2 = getattr(obs, param2_name, None)
-        
-        # Apply timezone conversion for time parameters if needed
-        if param1_name == 'ZZ' and val1 is not None:
-            use_local = all_params.get('param1_timezone') == 'local'
-            if use_local:
-                region_code = getattr(obs, 'GG', None)
-                offset = _get_timezone_offset(region_code)
-                val1 = (val1 + offset) % 24
-        
-        if param2_name == 'ZZ' and val2 is not None:
-            use_local = all_params.get('param2_timezone') == 'local'
-            if use_local:
-                region_code = getattr(obs, 'GG', None)
-                offset = _get_timezone_offset(region_code)
-                val2 = (val2 + offset) % 24
-        
-        # Handle C (cirrus) splitting for param1
-        if param1_name == 'SE':
-            # Sectors: count octants present or visible
-            # V=2 (complete halo): all segments a-h are visible
-            # V=1 (incomplete halo): only explicitly listed segments are visible
-            v = getattr(obs, 'V', None)
-            if v == 2:
-                # Complete halo: count all segments a-h
-                val1_list = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
-            else:
-                # Incomplete halo: extract explicit sectors
-                sector_letters = _extract_sector_letters(getattr(obs, 'sectors', ''))
-                val1_list = sector_letters if sector_letters else []
-        elif param1_name == 'HO_HU':
-            ho = getattr(obs, 'HO', None)
-            hu = getattr(obs, 'HU', None)
-            val1_list = []
-            if ho is not None and ho >= 0:
-                val1_list.append(str(ho))
-            if hu is not None and hu >= 0:
-                val1_list.append(str(hu))
-            if not val1_list:
-                val1_list = ['keine Angabe']
-            if len(hohu_debug['samples']) < 5:
-                hohu_debug['samples'].append({'obs': obs.__dict__.get('KK', None), 'ho': ho, 'hu': hu, 'val1_list': list(val1_list)})
-            hohu_debug['processed'] += 1
-        elif param1_name == 'C' and val1 is not None and all_params.get('param1_c_split'):
-            c_value = int(val1) if isinstance(val1, (int, str)) else val1
-            if c_value == 4:  # C4 (Ci + Cc) → count as both C1 and C2
-                val1_list = ['1', '2']
-            elif c_value == 5:  # C5 (Ci + Cs) → count as both C1 and C3
-                val1_list = ['1', '3']
-            elif c_value == 6:  # C6 (Cc + Cs) → count as both C2 and C3
-                val1_list = ['2', '3']
-            elif c_value == 7:  # C7 (Ci + Cc + Cs) → count as C1, C2, and C3
-                val1_list = ['1', '2', '3']
-            else:
-                val1_list = [str(c_value)]
-        # Handle EE (halo) splitting for param1
-        elif param1_name == 'EE' and val1 is not None and all_params.get('param1_ee_split'):
-            from halo.models.constants import COMBINED_TO_INDIVIDUAL_HALOS
-            ee_value = int(val1) if isinstance(val1, (int, str)) else val1
-            if ee_value in COMBINED_TO_INDIVIDUAL_HALOS:
-                left, right = COMBINED_TO_INDIVIDUAL_HALOS[ee_value]
-                val1_list = [str(left), str(right)]
-            else:
-                val1_list = [str(ee_value)]
-        else:
-            val1_list = [str(val1) if val1 is not None else 'keine Angabe']
-        
-        # Handle C (cirrus) splitting for param2
-        if param2_name == 'SE':
-            # Sectors: count octants present or visible
-            # V=2 (complete halo): all segments a-h are visible
-            # V=1 (incomplete halo): only explicitly listed segments are visible
-            v = getattr(obs, 'V', None)
-            if v == 2:
-                # Complete halo: count all segments a-h
-                val2_list = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
-            else:
-                # Incomplete halo: extract explicit sectors
-                sector_letters = _extract_sector_letters(getattr(obs, 'sectors', ''))
-                val2_list = sector_letters if sector_letters else []
-        elif param2_name == 'HO_HU':
-            ho = getattr(obs, 'HO', None)
-            hu = getattr(obs, 'HU', None)
-            val2_list = []
-            if ho is not None and ho >= 0:
-                val2_list.append(str(ho))
-            if hu is not None and hu >= 0:
-                val2_list.append(str(hu))
-            if not val2_list:
-                val2_list = ['keine Angabe']
-            if param1_name != 'HO_HU' and len(hohu_debug['samples']) < 5:
-                hohu_debug['samples'].append({'obs': obs.__dict__.get('KK', None), 'ho': ho, 'hu': hu, 'val2_list': list(val2_list)})
-            hohu_debug['processed'] += 1
-        elif param2_name == 'C' and val2 is not None and all_params.get('param2_c_split'):
-            c_value = int(val2) if isinstance(val2, (int, str)) else val2
-            if c_value == 4:  # C4 (Ci + Cc) → count as both C1 and C2
-                val2_list = ['1', '2']
-            elif c_value == 5:  # C5 (Ci + Cs) → count as both C1 and C3
-                val2_list = ['1', '3']
-            elif c_value == 6:  # C6 (Cc + Cs) → count as both C2 and C3
-                val2_list = ['2', '3']
-            elif c_value == 7:  # C7 (Ci + Cc + Cs) → count as C1, C2, and C3
-                val2_list = ['1', '2', '3']
-            else:
-                val2_list = [str(c_value)]
-        # Handle EE (halo) splitting for param2
-        elif param2_name == 'EE' and val2 is not None and all_params.get('param2_ee_split'):
-            from halo.models.constants import COMBINED_TO_INDIVIDUAL_HALOS
-            ee_value = int(val2) if isinstance(val2, (int, str)) else val2
-            if ee_value in COMBINED_TO_INDIVIDUAL_HALOS:
-                left, right = COMBINED_TO_INDIVIDUAL_HALOS[ee_value]
-                val2_list = [str(left), str(right)]
-            else:
-                val2_list = [str(ee_value)]
-        else:
-            val2_list = [str(val2) if val2 is not None else 'keine Angabe']
-        
-        # Count all combinations
-        for v1 in val1_list:
-            for v2 in val2_list:
-                groups[v1][v2] += 1
-
-    # Debug: summarize HO_HU counts before range expansion
-    if (param1_name == 'HO_HU' or param2_name == 'HO_HU'):
-        hohu_total = 0
-        hohu_rows = []
-        for k1, inner in groups.items():
-            for k2, cnt in inner.items():
-                hohu_total += cnt
-                if len(hohu_rows) < 5 and cnt > 0:
-                    hohu_rows.append((k1, k2, cnt))
-    
-    # Generate all values for param1 range FIRST
-    # Only fill ranges for parameters where all values in range are meaningful
-    param1_from_key = 'param1_from'
-    param1_to_key = 'param1_to'
-    param1_range_values = []
+    Only parameters where every value in the range is meaningful are filled;
+    EE and GG are limited to the defined halo types and regions, KK to
+    the observers in the observer database.
+
+    Returns:
+        List of keys (2-digit years for JJ), empty if no range applies
+    """
+    from_key = f'{prefix}_from'
+    to_key = f'{prefix}_to'
+    range_values = []
     
     # Parameters that support complete range filling (every value exists/is meaningful)
-    rangeable_params = ['ZZ', 'MM', 'TT', 'JJ', 'DD', 'C', 'dd', 'SH', 'EE', 'GG', 'KK', 'HO_HU']
+    rangeable_params = ['ZZ', 'MM', 'TT', 'JJ', 'DD', 'C', 'dd', 'SH', 'MH', 'MP', 'EE', 'GG', 'KK', 'HO_HU']
     
-    if param1_name in rangeable_params and param1_from_key in all_params and param1_to_key in all_params:
-        from_val = all_params[param1_from_key]
-        to_val = all_params[param1_to_key]
+    if param_name in rangeable_params and from_key in all_params and to_key in all_params:
+        from_val = all_params[from_key]
+        to_val = all_params[to_key]
         
         if from_val is not None and to_val is not None:
             try:
@@ -5982,120 +5994,91 @@ def _group_by_two_parameters(observations, param1_name, param2_name, all_params)
                 to_val = int(to_val) if to_val else None
                 
                 if from_val is not None and to_val is not None:
-                    if param1_name == 'JJ':
+                    if param_name == 'JJ':
                         # Year - handle century boundary
                         if from_val > to_val:
-                            param1_range_values = list(range(from_val, 100)) + list(range(0, to_val + 1))
+                            range_values = list(range(from_val, 100)) + list(range(0, to_val + 1))
                         else:
-                            param1_range_values = list(range(from_val, to_val + 1))
-                    elif param1_name == 'EE':
-                        # Halo types - only those defined in i18n
-                        from halo.resources.i18n import get_i18n
-                        i18n = get_i18n()
+                            range_values = list(range(from_val, to_val + 1))
+                    elif param_name == 'EE':
+                        # Halo types - only those defined in i18n (the same in every language)
+                        i18n = get_language_i18n('de')
                         valid_ee = set(int(k) for k in i18n.strings['halo_types'].keys())
-                        param1_range_values = []
+                        range_values = []
                         for val in range(from_val, to_val + 1):
                             if val in valid_ee:
-                                param1_range_values.append(val)
-                    elif param1_name == 'GG':
-                        # Geographic regions - only those defined in i18n
-                        from halo.resources.i18n import get_i18n
-                        i18n = get_i18n()
+                                range_values.append(val)
+                    elif param_name == 'GG':
+                        # Geographic regions - only those defined in i18n (the same in every language)
+                        i18n = get_language_i18n('de')
                         valid_gg = set(int(k) for k in i18n.strings['geographic_regions'].keys())
-                        param1_range_values = []
+                        range_values = []
                         for val in range(from_val, to_val + 1):
                             if val in valid_gg:
-                                param1_range_values.append(val)
-                    elif param1_name == 'KK':
+                                range_values.append(val)
+                    elif param_name == 'KK':
                         # Observers - show all that exist in observer database, regardless of observations
                         observers = current_app.config.get('OBSERVERS', [])
                         # Observers are lists, KK is at index 0
                         existing_kk = sorted(set(int(obs[0]) for obs in observers))
-                        param1_range_values = []
+                        range_values = []
                         for val in range(from_val, to_val + 1):
                             if val in existing_kk:
-                                param1_range_values.append(val)
+                                range_values.append(val)
                     else:
-                        param1_range_values = list(range(from_val, to_val + 1))
+                        range_values = list(range(from_val, to_val + 1))
             except (ValueError, TypeError):
                 pass
     
-    # Generate all values for param2 range
-    param2_from_key = 'param2_from'
-    param2_to_key = 'param2_to'
-    param2_range_values = []
+    return [str(v % 100) if param_name == 'JJ' else str(v) for v in range_values]
+
+
+def _group_by_two_parameters(observations, param1_name, param2_name, all_params, table=None):
+    """Group observations by two parameters and return cross-tabulation."""
+    table, rows = _table_rows(observations, table)
+    position1, keys1 = parameter_keys(
+        observations, table, rows, param1_name, all_params, 'param1', _computed_values, cross=True
+    )
+    position2, keys2 = parameter_keys(
+        observations, table, rows, param2_name, all_params, 'param2', _computed_values, cross=True
+    )
     
-    if param2_name in rangeable_params and param2_from_key in all_params and param2_to_key in all_params:
-        from_val = all_params[param2_from_key]
-        to_val = all_params[param2_to_key]
-        
-        if from_val is not None and to_val is not None:
-            try:
-                from_val = int(from_val) if from_val else None
-                to_val = int(to_val) if to_val else None
-                
-                if from_val is not None and to_val is not None:
-                    if param2_name == 'JJ':
-                        # Year - handle century boundary
-                        if from_val > to_val:
-                            param2_range_values = list(range(from_val, 100)) + list(range(0, to_val + 1))
-                        else:
-                            param2_range_values = list(range(from_val, to_val + 1))
-                    elif param2_name == 'EE':
-                        # Halo types - only those defined in i18n
-                        from halo.resources.i18n import get_i18n
-                        i18n = get_i18n()
-                        valid_ee = set(int(k) for k in i18n.strings['halo_types'].keys())
-                        param2_range_values = []
-                        for val in range(from_val, to_val + 1):
-                            if val in valid_ee:
-                                param2_range_values.append(val)
-                    elif param2_name == 'GG':
-                        # Geographic regions - only those defined in i18n
-                        from halo.resources.i18n import get_i18n
-                        i18n = get_i18n()
-                        valid_gg = set(int(k) for k in i18n.strings['geographic_regions'].keys())
-                        param2_range_values = []
-                        for val in range(from_val, to_val + 1):
-                            if val in valid_gg:
-                                param2_range_values.append(val)
-                    elif param2_name == 'KK':
-                        # Observers - show all that exist in observer database, regardless of observations
-                        observers = current_app.config.get('OBSERVERS', [])
-                        # Observers are lists, KK is at index 0
-                        existing_kk = sorted(set(int(obs[0]) for obs in observers))
-                        param2_range_values = []
-                        for val in range(from_val, to_val + 1):
-                            if val in existing_kk:
-                                param2_range_values.append(val)
-                    else:
-                        param2_range_values = list(range(from_val, to_val + 1))
-            except (ValueError, TypeError):
-                pass
+    # ZS=-1 means time not specified - skip these observations for time analysis
+    valid = None
+    if 'ZZ' in (param1_name, param2_name):
+        valid = get_column(table, 'ZS')[rows] != -1
+    groups = cross_count_keys(len(observations), position1, keys1, position2, keys2, valid)
+    
+    # Debug counters for SH calculations: observations with/without solar altitude
+    sh_debug = {
+        'param1_attempts': 0,
+        'param1_none': 0,
+        'param2_attempts': 0,
+        'param2_none': 0,
+    }
+    for number, name, keys in ((1, param1_name, keys1), (2, param2_name, keys2)):
+        if name != 'SH':
+            continue
+        counted = np.ones(len(observations), dtype=bool)
+        if number == 2 and param1_name == 'ZZ':
+            counted = valid
+        attempted = (get_column(table, 'O')[rows] == 1) & (get_column(table, 'g')[rows] != 1)
+        sh_debug[f'param{number}_attempts'] = int((counted & attempted).sum())
+        sh_debug[f'param{number}_none'] = int((counted & (keys == MISSING)).sum())
     
     # Build complete result table with pre-initialization strategy
     # Step 1: Determine which param1 and param2 values to include
     
-    # Convert param1_range_values to string keys for display
-    param1_values_to_show = []
-    if param1_range_values:
-        param1_values_to_show = [str(v % 100) if param1_name == 'JJ' else str(v) for v in param1_range_values]
-    else:
-        # Use all param1 values that appear in observations
-        param1_values_to_show = sorted(groups.keys())
+    # Values in the param1 range, otherwise all param1 values that appear in observations
+    param1_values_to_show = _range_keys(param1_name, all_params, 'param1') or sorted(groups.keys())
     
     # Collect all param2 values from observations
     param2_from_observations = set()
     for p1_val in groups:
         param2_from_observations.update(groups[p1_val].keys())
     
-    # Determine param2 values to show
-    param2_values_to_show = []
-    if param2_range_values:
-        param2_values_to_show = [str(v % 100) if param2_name == 'JJ' else str(v) for v in param2_range_values]
-    else:
-        # Use all param2 values that appear in observations
-        param2_values_to_show = sorted(param2_from_observations)
+    # Values in the param2 range, otherwise all param2 values that appear in observations
+    param2_values_to_show = _range_keys(param2_name, all_params, 'param2') or sorted(param2_from_observations)
     
     # Step 2: Initialize result table with all param1 × param2 combinations = 0
     result = {}
@@ -6116,27 +6099,12 @@ def _group_by_two_parameters(observations, param1_name, param2_name, all_params)
             result[p1_val][p2_val] = groups[p1_val][p2_val]
     
     # Remove combined types when split is enabled (they will have 0 counts)
-    # For param1
-    if param1_name == 'C' and all_params.get('param1_c_split'):
-        for combined_c in ['4', '5', '6', '7']:
-            result.pop(combined_c, None)
-    elif param1_name == 'EE' and all_params.get('param1_ee_split'):
-        from halo.models.constants import COMBINED_TO_INDIVIDUAL_HALOS
-        for combined_ee in COMBINED_TO_INDIVIDUAL_HALOS.keys():
-            result.pop(str(combined_ee), None)
-    
-    # For param2
-    if param2_name == 'C' and all_params.get('param2_c_split'):
-        combined_c_list = ['4', '5', '6', '7']
-        for param1_val in result:
-            for combined_c in combined_c_list:
-                result[param1_val].pop(combined_c, None)
-    elif param2_name == 'EE' and all_params.get('param2_ee_split'):
-        from halo.models.constants import COMBINED_TO_INDIVIDUAL_HALOS
-        combined_ee_list = [str(k) for k in COMBINED_TO_INDIVIDUAL_HALOS.keys()]
-        for param1_val in result:
-            for combined_ee in combined_ee_list:
-                result[param1_val].pop(combined_ee, None)
+    for combined in _combined_keys(param1_name, all_params, 'param1'):
+        result.pop(combined, None)
+    combined_param2 = _combined_keys(param2_name, all_params, 'param2')
+    for param1_val in result:
+        for combined in combined_param2:
+            result[param1_val].pop(combined, None)
 
     # Emit debug info for SH calculations to diagnose empty tables
     if (param1_name == 'SH' or param2_name == 'SH'):
@@ -6223,3 +6191,179 @@ def _format_parameter_value(value, param_name, all_params, prefix):
     
     return value
 
+
+
+# Requests that can run as a job: type -> (handler of the endpoint, whether params is a request body)
+JOB_REQUESTS = {
+    'analysis': (_analysis_response, True),
+    'analysis_batch': (_analysis_batch_response, True),
+    'pivot': (_pivot_response, True),
+    'monthly_report': (_monthly_report_response, False),
+    'monthly_report_all': (_all_monthly_reports_response, False),
+    'monthly_stats': (_monthly_stats_response, False),
+    'annual_stats': (_annual_stats_response, False),
+    'range_stats': (_range_stats_response, False),
+    'climatology': (_climatology_response, False),
+    'charts_bundle': (_chart_bundle_response, False),
+}
+
+
+def warm_up_statistics(app, language: Optional[str] = None) -> None:
+    """Warm up the statistics caches of the loaded observations in the background.
+    
+    The statistics are computed in the given language (default: that of the
+    current session). Does nothing unless WARMUP_ENABLED is set; see
+    halo.services.warmup.
+    """
+    from flask import has_request_context, session
+    
+    if not app.config.get('WARMUP_ENABLED') or not app.config.get('OBSERVATIONS'):
+        return
+    if language is None:
+        language = session.get('language', 'de') if has_request_context() else 'de'
+    requests = warmup_requests(get_observation_table(app.config), app.config.get('WARMUP_MONTHS', 12))
+    start_warmup(app.config, requests, lambda kind, params: _job_request(app, kind, params, language))
+
+
+def _job_request(app, kind, params, language):
+    """Run the request of a job type and return (status code, content type, body).
+    
+    The handler runs in an application context with the given language; a
+    query (all but the analysis types) takes its parameters as strings, as
+    if they came from the query string.
+    """
+    from werkzeug.datastructures import MultiDict
+    
+    handler, is_body = JOB_REQUESTS[kind]
+    if not is_body:
+        params = MultiDict([
+            (key, str(value))
+            for key, values in params.items()
+            for value in (values if isinstance(values, list) else [values])
+        ])
+    with app.app_context():
+        response = app.make_response(handler(params, get_language_i18n(language)))
+        return response.status_code, response.content_type, response.get_data()
+
+
+@api_blueprint.route('/jobs', methods=['POST'])
+def submit_job() -> Dict[str, Any]:
+    """
+    Run an analysis, statistics or report request in the background.
+    
+    The request runs on the job pool (JOB_WORKERS threads) with the language
+    of the current session; poll /api/jobs/<id> for its progress and fetch
+    the response from /api/jobs/<id>/result when the job is done.
+    
+    Request body:
+        - type: analysis, analysis_batch, pivot, monthly_report, monthly_report_all,
+          monthly_stats, annual_stats, range_stats, climatology or charts_bundle
+        - params: Request body (analysis, analysis_batch, pivot) or query
+          parameters (all others) of the corresponding endpoint
+    
+    Returns:
+        JSON object with success and job (see /api/jobs/<id>), status 202
+    """
+    from flask import session
+    body = request.get_json() or {}
+    kind = body.get('type')
+    if kind not in JOB_REQUESTS:
+        return jsonify({
+            'success': False,
+            'error': f'Unknown job type. Supported: {", ".join(JOB_REQUESTS)}'
+        }), 400
+    params = body.get('params') or {}
+    if not isinstance(params, dict):
+        return jsonify({'success': False, 'error': 'params must be an object'}), 400
+    
+    app = current_app._get_current_object()
+    language = session.get('language', 'de')
+    try:
+        job = get_job_manager(current_app.config).submit(
+            kind, params, lambda: _job_request(app, kind, params, language)
+        )
+    except JobStoreFull as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
+    return jsonify({'success': True, 'job': job.info()}), 202
+
+
+@api_blueprint.route('/jobs', methods=['GET'])
+def list_jobs() -> Dict[str, Any]:
+    """List the jobs in the job store (oldest first)."""
+    jobs = get_job_manager(current_app.config).jobs()
+    return jsonify({'success': True, 'jobs': [job.info() for job in jobs]})
+
+
+@api_blueprint.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id: str) -> Dict[str, Any]:
+    """
+    Status of a job.
+    
+    Returns:
+        JSON object with success and job:
+        - id, type
+        - status: queued, running, done, failed or cancelled
+        - done, total, progress: Steps done, total steps and their ratio
+          (total and progress are null while unknown)
+        - partial: Partial result so far (only for jobs reporting one, e.g.
+          the results of the analyses done of an analysis_batch)
+        - created, started, finished: Timestamps (seconds since epoch)
+        - error: Error message of a failed job
+        - result_status: HTTP status of the response (done jobs)
+    """
+    job = get_job_manager(current_app.config).get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    info = job.info()
+    if job.status == DONE:
+        info['result_status'] = job.result[0]
+    return jsonify({'success': True, 'job': info})
+
+
+@api_blueprint.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id: str) -> Response:
+    """Response of a finished job, as returned by the endpoint of its request."""
+    job = get_job_manager(current_app.config).get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    if job.status != DONE:
+        return jsonify({'success': False, 'error': f'Job is {job.status}', 'job': job.info()}), 409
+    status, content_type, data = job.result
+    return Response(data, status=status, content_type=content_type)
+
+
+@api_blueprint.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id: str) -> Dict[str, Any]:
+    """
+    Cancel a queued or running job, or remove a finished job from the store.
+    
+    A running job stops at its next progress report; its status changes to
+    cancelled then.
+    """
+    job = get_job_manager(current_app.config).cancel(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job.info()})
+
+
+@api_blueprint.route('/cache/stats', methods=['GET'])
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    Statistics of the result cache of the statistics, report and analysis endpoints.
+    
+    Returns:
+        JSON object with success and hits, misses, hit_rate, evictions,
+        entries, bytes (estimated memory use) and budget (RESULT_CACHE_BYTES);
+        charts: the same counters of the chart image cache (bytes on disk,
+        budget CHART_CACHE_BYTES)
+    """
+    stats = get_result_cache(current_app.config).stats()
+    stats['charts'] = _chart_cache().stats()
+    return jsonify({'success': True, **stats})
+
+
+@api_blueprint.route('/cache', methods=['DELETE'])
+def clear_cache() -> Dict[str, Any]:
+    """Remove all entries from the result cache."""
+    get_result_cache(current_app.config).clear()
+    return jsonify({'success': True})
@@ -0,0 +1,322 @@
+"""
+HALO key format (Kurzausgabe) of observations
+
+One observation per line, in the traditional fixed-width key
+
+    KKOJJ MMTTg ZZZZd DDNCc EEHFV fzzGG 8HHHH sectors(15) remarks(60)
+
+Special values: -1 = ' ' (not observed), 0 = '/' for the two-digit fields
+ZS, ZM, DD, zz, HO and HU; zz = 99 is written as '//'. Observer numbers
+from 100 on are written with a letter for the tens (A0 = 100, B0 = 110, ...).
+
+The codes of all field values are looked up in tables built once, so
+formatting a whole file costs one table lookup per field and one string
+formatting per line. Reading works on chunks of lines: the fixed-width
+columns of a chunk are decoded at once as a character matrix.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+import numpy as np
+
+from ..models.types import Observation
+
+
+# Values covered by the code tables (Byte and ShortInt fields)
+VALUE_RANGE = range(-128, 256)
+
+# Observations per chunk of a streamed export
+CHUNK_SIZE = 1000
+
+
+def _digits(value: int) -> str:
+    """Two digits of a value."""
+    return str(value // 10) + str(value % 10)
+
+
+def _code1(value: int) -> str:
+    """One-digit field: -1→' ', else the digit."""
+    return ' ' if value == -1 else str(value)
+
+
+def _code2(value: int) -> str:
+    """Two-digit field: -1→'  ', 0→'//', else the digits."""
+    if value == -1:
+        return '  '
+    if value == 0:
+        return '//'
+    return _digits(value)
+
+
+def _observer_code(kk: int) -> str:
+    """Observer number KK, with a letter for the tens from 100 on."""
+    if kk < 100:
+        return _digits(kk)
+    return chr(kk // 10 + 55) + str(kk % 10)
+
+
+def _precipitation_code(zz: int) -> str:
+    """Precipitation zz: 99→'//', else a two-digit field."""
+    return '//' if zz == 99 else _code2(zz)
+
+
+def _region_code(gg: int) -> str:
+    """Region GG: unknown is written as 00."""
+    return _digits(0 if gg == -1 else gg)
+
+
+def _table(code, width: int) -> dict:
+    """Codes of all values in VALUE_RANGE that have the field width."""
+    table = {}
+    for value in VALUE_RANGE:
+        text = code(value)
+        if len(text) == width:
+            table[value] = text
+    return table
+
+
+DIGIT = _table(str, 1)
+DIGITS = _table(_digits, 2)
+CODE1 = _table(_code1, 1)
+CODE2 = _table(_code2, 2)
+OBSERVER_CODES = _table(_observer_code, 2)
+PRECIPITATION_CODES = _table(_precipitation_code, 2)
+REGION_CODES = _table(_region_code, 2)
+
+_LINE = '%s%s%s %s%s%s %s%s%s %s%s%s%s %s%s%s%s %s%s%s %s %s %s'
+
+
+def _light_pillar(ee: int, ho: int, hu: int) -> str:
+    """8HHHH group: upper/lower light pillar (EE 8, 9, 10), else '/////'."""
+    if ee == 8:
+        return '8' + _code2(ho) + '//'
+    if ee == 9:
+        return '8//' + _code2(hu)
+    if ee == 10:
+        return '8' + _code2(ho) + _code2(hu)
+    return '/////'
+
+
+def _one_line(value: str) -> str:
+    """Text with line breaks replaced by spaces."""
+    return value.replace('\r', ' ').replace('\n', ' ')
+
+
+def _format_generic(obs: Observation) -> str:
+    """Key line of an observation with field values outside the code tables.
+
+    Fields are concatenated and grouped by five characters, whatever
+    their widths.
+    """
+    first = (
+        _observer_code(obs.KK) + str(obs.O) + _digits(obs.JJ) + _digits(obs.MM) + _digits(obs.TT)
+        + str(obs.g) + _code2(obs.ZS) + _code2(obs.ZM) + _code1(obs.d) + _code2(obs.DD)
+        + _code1(obs.N) + _code1(obs.C) + _code1(obs.c) + _digits(obs.EE)
+        + _code1(obs.H) + _code1(obs.F) + _code1(obs.V) + _code1(obs.f)
+        + _precipitation_code(obs.zz) + _region_code(obs.GG)
+    )
+    line = ''
+    for i in range(0, len(first), 5):
+        chunk = first[i:i + 5]
+        line += chunk + ' ' if len(chunk) == 5 else chunk
+    return (
+        line + _light_pillar(obs.EE, obs.HO, obs.HU)
+        + ' ' + _one_line(getattr(obs, 'sectors', ''))[:15].ljust(15)
+        + ' ' + _one_line(getattr(obs, 'remarks', '')).ljust(60)
+    )
+
+
+def format_key_lines(observations: Iterable[Observation]) -> Iterator[str]:
+    """Key lines (without line ends) of the observations, one per observation."""
+    digit, digits, code1, code2 = DIGIT, DIGITS, CODE1, CODE2
+    observer_codes, precipitation_codes, region_codes = OBSERVER_CODES, PRECIPITATION_CODES, REGION_CODES
+    line = _LINE
+    for obs in observations:
+        try:
+            ee = obs.EE
+            if ee == 8:
+                pillar = '8' + code2[obs.HO] + '//'
+            elif ee == 9:
+                pillar = '8//' + code2[obs.HU]
+            elif ee == 10:
+                pillar = '8' + code2[obs.HO] + code2[obs.HU]
+            else:
+                pillar = '/////'
+            sectors = obs.sectors
+            if '\r' in sectors or '\n' in sectors:
+                sectors = _one_line(sectors)
+            remarks = obs.remarks
+            if '\r' in remarks or '\n' in remarks:
+                remarks = _one_line(remarks)
+            yield line % (
+                observer_codes[obs.KK], digit[obs.O], digits[obs.JJ],
+                digits[obs.MM], digits[obs.TT], digit[obs.g],
+                code2[obs.ZS], code2[obs.ZM], code1[obs.d],
+                code2[obs.DD], code1[obs.N], code1[obs.C], code1[obs.c],
+                digits[ee], code1[obs.H], code1[obs.F], code1[obs.V],
+                code1[obs.f], precipitation_codes[obs.zz], region_codes[obs.GG],
+                pillar, sectors[:15].ljust(15), remarks.ljust(60)
+            )
+        except (KeyError, AttributeError):
+            yield _format_generic(obs)
+
+
+def format_key_line(obs: Observation) -> str:
+    """Key line (Kurzausgabe) of an observation."""
+    return next(format_key_lines((obs,)))
+
+
+def iter_key_text(observations: Iterable[Observation], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Key-format text of the observations, in chunks of chunk_size lines.
+
+    Each line ends with a newline; only one chunk is held in memory at a time.
+    """
+    chunk = []
+    for line in format_key_lines(observations):
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            chunk.append('')
+            yield '\n'.join(chunk)
+            chunk = []
+    if chunk:
+        chunk.append('')
+        yield '\n'.join(chunk)
+
+
+# Columns of the fields in a key line (name, start, width)
+KEY_FIELDS = (
+    ('KK', 0, 2), ('O', 2, 1), ('JJ', 3, 2),
+    ('MM', 6, 2), ('TT', 8, 2), ('g', 10, 1),
+    ('ZS', 12, 2), ('ZM', 14, 2), ('d', 16, 1),
+    ('DD', 18, 2), ('N', 20, 1), ('C', 21, 1), ('c', 22, 1),
+    ('EE', 24, 2), ('H', 26, 1), ('F', 27, 1), ('V', 28, 1),
+    ('f', 30, 1), ('zz', 31, 2), ('GG', 33, 2),
+    ('HO', 37, 2), ('HU', 39, 2),
+)
+
+# Fields that must be given in every line
+REQUIRED_FIELDS = ('KK', 'O', 'JJ', 'MM', 'TT', 'g', 'EE', 'GG')
+
+# Value of '/' (or '//') per field, the inverse of the codes written above;
+# elsewhere a slash means unknown (-1), as in the CSV files
+SLASH_VALUES = {'ZS': 0, 'ZM': 0, 'd': 0, 'DD': 0, 'zz': 99, 'HO': 0, 'HU': 0}
+
+# Key groups through the 8HHHH group, followed by sectors and remarks
+KEY_WIDTH = 41
+SECTORS_START = 42
+REMARKS_START = 58
+
+_DIGIT, _SPACE, _SLASH = ord('0'), ord(' '), ord('/')
+
+
+def _decode_line(line: Union[str, bytes]) -> str:
+    """Text of a line (UTF-8 or, as the HALO files, latin-1) without line end."""
+    if isinstance(line, bytes):
+        try:
+            line = line.decode('utf-8')
+        except UnicodeDecodeError:
+            line = line.decode('latin-1')
+    return line.rstrip('\r\n')
+
+
+def _spaced(line: str) -> str:
+    """Key line with the groups separated by spaces (as typed without them)."""
+    if len(line) > 5 and line[5] != ' ':
+        return ' '.join((line[0:5], line[5:10], line[10:15], line[15:20], line[20:25],
+                         line[25:30], line[30:35], line[35:50], line[50:]))
+    return line
+
+
+def decode_key_columns(codes: np.ndarray) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """Field values of key lines given as character codes.
+
+    Args:
+        codes: uint8 matrix, one key line (first KEY_WIDTH characters) per row
+
+    Returns:
+        (values, valid): int16 column per field name, and which rows are
+        valid key lines (all REQUIRED_FIELDS given and the date in range)
+    """
+    digits = codes.astype(np.int16) - _DIGIT
+    is_digit = (digits >= 0) & (digits <= 9)
+    is_space = codes == _SPACE
+    is_slash = codes == _SLASH
+    values = {}
+    valid = np.ones(len(codes), dtype=bool)
+    for name, start, width in KEY_FIELDS:
+        columns = slice(start, start + width)
+        digit, space = is_digit[:, columns], is_space[:, columns]
+        slash = is_slash[:, columns].all(axis=1)
+        if width == 1:
+            given = digit[:, 0]
+            value = digits[:, start]
+        else:
+            high, low = digits[:, start], digits[:, start + 1]
+            if name == 'KK':
+                # Observer numbers from 100 on: letter for the tens
+                letter = (codes[:, start] >= ord('A')) & (codes[:, start] <= ord('Z'))
+                high = np.where(letter, codes[:, start].astype(np.int16) - 55, high)
+                digit = digit.copy()
+                digit[:, 0] |= letter
+            both = digit.all(axis=1)
+            # One digit next to a space counts on its own (like int(' 5'))
+            given = both | ((digit | space).all(axis=1) & digit.any(axis=1))
+            value = np.where(both, high * 10 + low, np.where(digit[:, 0], high, low))
+        value = np.where(given, value, np.where(slash, SLASH_VALUES.get(name, -1), -1))
+        if name in REQUIRED_FIELDS:
+            valid &= given
+        values[name] = value.astype(np.int16)
+    valid &= (values['MM'] >= 1) & (values['MM'] <= 12) & (values['TT'] >= 1) & (values['TT'] <= 31)
+    return values, valid
+
+
+class KeyLineReader:
+    """
+    Read observations from HALO key lines (as written by format_key_lines).
+
+    Lines are read in chunks: the key columns of a chunk are decoded in
+    bulk with decode_key_columns(), then the observations are built. Empty
+    lines are skipped; the numbers of lines that are no valid key lines
+    are collected in invalid_lines.
+    """
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.line_count = 0
+        self.invalid_lines: List[int] = []
+
+    def read(self, lines: Iterable[Union[str, bytes]]) -> Iterator[Observation]:
+        """Observations of the valid key lines, in file order."""
+        chunk = []
+        for line in lines:
+            self.line_count += 1
+            line = _decode_line(line)
+            if not line.strip():
+                continue
+            chunk.append((self.line_count, _spaced(line)))
+            if len(chunk) == self.chunk_size:
+                yield from self._read_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield from self._read_chunk(chunk)
+
+    def _read_chunk(self, chunk: list) -> Iterator[Observation]:
+        keys = ''.join(line[:KEY_WIDTH].ljust(KEY_WIDTH) for _, line in chunk)
+        codes = np.frombuffer(keys.encode('latin-1', 'replace'), dtype=np.uint8).reshape(-1, KEY_WIDTH)
+        values, valid = decode_key_columns(codes)
+        names = [name for name, _, _ in KEY_FIELDS]
+        rows = zip(*(values[name].tolist() for name in names))
+        for (number, line), row, is_valid in zip(chunk, rows, valid.tolist()):
+            if not is_valid:
+                self.invalid_lines.append(number)
+                continue
+            yield Observation(
+                sectors=line[SECTORS_START:REMARKS_START - 1].strip(),
+                remarks=line[REMARKS_START:].strip(),
+                **dict(zip(names, row))
+            )
+
+
+def read_key_lines(lines: Iterable[Union[str, bytes]]) -> List[Observation]:
+    """Observations of all valid key lines (invalid lines are skipped)."""
+    return list(KeyLineReader().read(lines))
@@ -55,6 +55,12 @@ HALO_BRIGHTNESS_FACTORS = {
     3: 1.4
 }
 
+# Regions considered for halo activity (Germany and neighbouring countries)
+ACTIVITY_REGIONS = {1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 16, 17, 21, 26, 27, 29, 32}
+
+# Individual halo types listed in the monthly "Ergebnisübersicht Sonnenhalos"
+OVERVIEW_HALO_TYPES = {1, 2, 3, 5, 6, 7, 8, 9, 10, 11, 12}
+
 def calculate_halo_activity(observations, observers, mm, jj, active_observers_only=True):
     """
     Calculate halo activity for a month (reusable function).
@@ -100,7 +106,7 @@ def calculate_halo_activity(observations, observers, mm, jj, active_observers_on
             continue
         if obs.O != 1:  # Only solar halos
             continue
-        if obs.GG not in {1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 16, 17, 21, 26, 27, 29, 32}:  # Germany + neighbors
+        if obs.GG not in ACTIVITY_REGIONS:  # Germany + neighbors
             continue
         if obs.d < -1 or obs.d > 2:  # Cirrus condition (d = cirrus density)
             continue
@@ -251,6 +257,62 @@ def calculate_daylight_factor(day, month, latitude):
         return 1.0
 
 
+def calculate_activity_factors(ee, h, dd):
+    """
+    Vectorized weight factor of calculate_halo_activity() for arrays of EE, H and DD.
+    
+    Args:
+        ee: Array of halo types
+        h: Array of brightness values
+        dd: Array of durations (×10 minutes)
+    
+    Returns:
+        Array of real activity contributions (before observer normalization)
+    """
+    import numpy as np
+    
+    ee = np.asarray(ee)
+    h = np.asarray(h)
+    dd = np.asarray(dd).astype(float)
+    
+    # Same indexing as HALO_TYPE_FACTORS[obs.EE] (negative values wrap around)
+    factor = np.asarray(HALO_TYPE_FACTORS, dtype=float)[ee]
+    brightness = np.ones(ee.shape, dtype=float)
+    for value, weight in HALO_BRIGHTNESS_FACTORS.items():
+        brightness[h == value] = weight
+    factor = factor * brightness
+    
+    # Duration/completeness adjustment
+    return np.where(dd > 0, factor * dd / 6.0, np.where(dd == 0, factor / 12.0, factor / 6.0))
+
+
+def calculate_daylight_factor_array(day, month, latitude):
+    """
+    Vectorized calculate_daylight_factor() for arrays of days, months and latitudes.
+    """
+    import numpy as np
+    
+    day = np.asarray(day, dtype=float)
+    month = np.asarray(month, dtype=int)
+    latitude = np.asarray(latitude, dtype=float)
+    
+    # Day offset from start of year (starting at -81), non-leap year days
+    offsets = np.full(14, -81.0)
+    for i in range(12):
+        offsets[i + 2] = offsets[i + 1] + DAYS_PER_MONTH[i][0]
+    dd = offsets[np.clip(month, 0, 13)]
+    
+    delta = 0.41 * np.sin((dd + day) * np.pi / 182.6)
+    phi = latitude * np.pi / 180.0
+    cos_arg = np.clip(-np.tan(delta) * np.tan(phi), -1.0, 1.0)
+    angle = np.arccos(cos_arg)
+    
+    # Fallback 1.0 where the scalar version fails (polar day: ArcCos = 0)
+    with np.errstate(divide='ignore'):
+        factor = (np.pi / 2.0) / angle
+    return np.where(angle > 0, factor, 1.0)
+
+
 # Version flag for file format
 FILE_FORMAT_VERSION = 25  # v2.5
 
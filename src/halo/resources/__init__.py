@@ -1,5 +1,5 @@
 """Resource management package for internationalization."""
 
-from .i18n import I18n, get_string, set_language, get_language, get_current_language, get_i18n
+from .i18n import I18n, get_string, set_language, get_language, get_current_language, get_i18n, get_language_i18n
 
-__all__ = ['I18n', 'get_string', 'set_language', 'get_language', 'get_current_language', 'get_i18n']
+__all__ = ['I18n', 'get_string', 'set_language', 'get_language', 'get_current_language', 'get_i18n', 'get_language_i18n']
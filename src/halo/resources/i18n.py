@@ -4,6 +4,7 @@ Loads language-specific strings from JSON resource files.
 """
 
 import json
+import threading
 # Force reload for combined_prompt addition
 from pathlib import Path
 from typing import Dict, Any, Optional
@@ -161,6 +162,34 @@ def get_i18n(language: Optional[str] = None, force_reload: bool = False) -> I18n
     return _i18n_instance
 
 
+# One instance per language that is never switched to another language,
+# so it can be shared by concurrent requests, jobs and background threads
+_language_instances: Dict[str, I18n] = {}
+_language_lock = threading.Lock()
+
+
+def get_language_i18n(language: str) -> I18n:
+    """
+    Get the i18n instance of a language.
+    
+    Unlike the global instance of get_i18n(), which every request switches
+    to its session language, these instances keep their language. Use them
+    for output built while other requests may run (formatters, charts,
+    jobs and background threads).
+    
+    Args:
+        language: Language code ('de' or 'en')
+        
+    Returns:
+        I18n instance of the language (created on first use)
+    """
+    with _language_lock:
+        i18n = _language_instances.get(language)
+        if i18n is None:
+            i18n = _language_instances[language] = I18n(language)
+    return i18n
+
+
 def get_string(key: str, default: Optional[str] = None) -> str:
     """
     Convenience function to get localized string.
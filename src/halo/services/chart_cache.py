@@ -0,0 +1,178 @@
+"""
+Persistent cache of rendered chart images.
+
+Rendering a statistics chart with matplotlib takes hundreds of
+milliseconds, while clients ask for the same (mostly historical) charts
+over and over. Rendered images are stored in a cache directory under the
+digest of their key: chart type, parameters, language, application version
+and a digest of the chart's input data. A chart whose data has not changed
+is therefore served from disk, also after a restart, while any change of
+the data yields a new key.
+
+The files' modification times serve as last-access times: a hit touches
+the file, and when the total size exceeds the byte budget the least
+recently used files are deleted.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+# Default byte budget of the cache directory
+DEFAULT_BUDGET = 100 * 1024 * 1024
+
+SUFFIX = '.png'
+
+# File suffixes of the cached images
+SUFFIXES = ('.png', '.svg')
+
+
+def digest(value: Any) -> str:
+    """Hex digest of a JSON-serializable value (independent of dict order)."""
+    text = json.dumps(value, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ChartCache:
+    """Chart images in a directory, with a byte budget and LRU eviction."""
+
+    def __init__(self, directory: Path, budget: int = DEFAULT_BUDGET):
+        self.directory = Path(directory)
+        self.budget = budget
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._files: Optional['OrderedDict[str, int]'] = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _scan(self) -> None:
+        """Index the files of the cache directory, least recently used first."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in self.directory.iterdir():
+            if path.suffix not in SUFFIXES:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.name, stat.st_size))
+        entries.sort()
+        self._files = OrderedDict((name, size) for _, name, size in entries)
+        self._size = sum(self._files.values())
+
+    def get(self, key: Dict[str, Any], suffix: str = SUFFIX) -> Optional[bytes]:
+        """Cached image of key, None on a miss."""
+        name = digest(key) + suffix
+        path = self.directory / name
+        with self._lock:
+            if self._files is None:
+                self._scan()
+            if name in self._files:
+                try:
+                    image = path.read_bytes()
+                    os.utime(path)
+                except OSError:
+                    self._size -= self._files.pop(name)
+                else:
+                    self._files.move_to_end(name)
+                    self.hits += 1
+                    return image
+            self.misses += 1
+        return None
+
+    def put(self, key: Dict[str, Any], image: bytes, suffix: str = SUFFIX) -> None:
+        """Store the image of key, evicting the least recently used images if over budget."""
+        if len(image) > self.budget:
+            return
+        name = digest(key) + suffix
+        with self._lock:
+            if self._files is None:
+                self._scan()
+        try:
+            # Write to a temporary file first so readers never see a partial image
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(image)
+            os.replace(temp_path, self.directory / name)
+        except OSError:
+            return
+
+        with self._lock:
+            self._size -= self._files.pop(name, 0)
+            self._files[name] = len(image)
+            self._size += len(image)
+            while self._size > self.budget and self._files:
+                evicted, size = self._files.popitem(last=False)
+                self._size -= size
+                self.evictions += 1
+                try:
+                    (self.directory / evicted).unlink()
+                except OSError:
+                    pass
+
+    def get_or_render(self, key: Dict[str, Any], render: Callable[[], bytes], suffix: str = SUFFIX) -> bytes:
+        """Image of key from the cache; rendered with render() and stored on a miss.
+
+        The image is stored in a file with the given suffix (one of SUFFIXES).
+        """
+        image = self.get(key, suffix)
+        if image is None:
+            image = render()
+            self.put(key, image, suffix)
+        return image
+
+    def clear(self) -> None:
+        """Delete all cached images (the counters are kept)."""
+        with self._lock:
+            if self._files is None:
+                self._scan()
+            for name in self._files:
+                try:
+                    (self.directory / name).unlink()
+                except OSError:
+                    pass
+            self._files.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and disk use."""
+        with self._lock:
+            if self._files is None:
+                self._scan()
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'evictions': self.evictions,
+                'entries': len(self._files),
+                'bytes': self._size,
+                'budget': self.budget
+            }
+
+
+_cache_lock = threading.Lock()
+
+
+def get_chart_cache(config: Dict[str, Any], default_directory: Path) -> ChartCache:
+    """Chart cache of the app, created on first use.
+
+    The directory and byte budget are taken from CHART_CACHE_DIR
+    (default_directory if not set) and CHART_CACHE_BYTES.
+    """
+    with _cache_lock:
+        cache = config.get('CHART_CACHE')
+        if cache is None:
+            cache = config['CHART_CACHE'] = ChartCache(
+                config.get('CHART_CACHE_DIR') or default_directory,
+                config.get('CHART_CACHE_BYTES', DEFAULT_BUDGET)
+            )
+    return cache
@@ -0,0 +1,660 @@
+"""
+Chart images of the statistics and observer endpoints.
+
+The charts are drawn with the object-oriented matplotlib API (Figure with
+an Agg canvas) instead of pyplot, so no global figure state is involved and
+charts can be rendered concurrently by several threads.
+
+Rendering is CPU bound and holds the GIL for most of its time. With
+CHART_RENDER_PROCESSES > 0 in the app config, charts are rendered by a
+pool of worker processes instead (see ChartRenderPool), which have
+matplotlib imported and warmed up already, so concurrent chart requests
+scale across cores. Charts rendered together (/api/charts/bundle) use a
+pool by default, one worker per CPU (see get_bundle_pool).
+
+All renderers take plain data (the data dict of the endpoint, an I18n
+instance and the image options) and return image bytes, so they can run in
+a worker process. The image options (see image_options()) select the image
+size in pixels, the resolution and PNG or SVG output; without options a
+chart is a PNG of its default figure size at 150 DPI.
+
+The *_spec functions describe the statistics charts as JSON (axis labels,
+data points and the smoothed curves of the line charts), so clients can
+draw them without server-side rendering.
+"""
+
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import matplotlib
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+from matplotlib.image import imread
+
+
+DEFAULT_DPI = 150
+
+# Mimetypes of the image formats
+IMAGE_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+# Limits of the image options
+SIZE_RANGE = (50, 4000)
+DPI_RANGE = (20, 600)
+
+
+def image_options(args: Dict[str, str]) -> Dict[str, Any]:
+    """Image options from request parameters width, height (pixels), dpi and image (png, svg).
+
+    Only the parameters given are included; raises ValueError for invalid values.
+    """
+    options = {}
+    for name, (low, high) in (('width', SIZE_RANGE), ('height', SIZE_RANGE), ('dpi', DPI_RANGE)):
+        value = args.get(name, '').strip()
+        if value:
+            try:
+                number = int(value)
+            except ValueError:
+                raise ValueError(f'{name} must be a number')
+            if not low <= number <= high:
+                raise ValueError(f'{name} must be between {low} and {high}')
+            options[name] = number
+    image = args.get('image', '').strip().lower()
+    if image:
+        if image not in IMAGE_TYPES:
+            raise ValueError(f'Invalid image format: {image}. Use {" or ".join(IMAGE_TYPES)}.')
+        if image != 'png':
+            options['image'] = image
+    return options
+
+
+def _figure(figsize: Tuple[float, float], options: Optional[Dict[str, Any]] = None):
+    """New figure with an Agg canvas and one axis.
+
+    A width or height in the image options overrides figsize (a single one
+    keeps the aspect ratio).
+    """
+    options = options or {}
+    if 'width' in options or 'height' in options:
+        dpi = options.get('dpi', DEFAULT_DPI)
+        width, height = figsize
+        if 'width' in options and 'height' in options:
+            figsize = (options['width'] / dpi, options['height'] / dpi)
+        elif 'width' in options:
+            figsize = (options['width'] / dpi, height * options['width'] / dpi / width)
+        else:
+            figsize = (width * options['height'] / dpi / height, options['height'] / dpi)
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots()
+
+
+def _image(fig: Figure, options: Optional[Dict[str, Any]] = None) -> bytes:
+    """Image of a figure in the format of the image options (default: PNG at 150 DPI).
+
+    The image is cropped to its content unless an explicit size was requested.
+    """
+    options = options or {}
+    image = options.get('image', 'png')
+    buf = io.BytesIO()
+    fig.savefig(
+        buf, format=image, dpi=options.get('dpi', DEFAULT_DPI),
+        bbox_inches=None if 'width' in options or 'height' in options else 'tight',
+        # No creation date, so equal charts give equal images
+        metadata={'Date': None} if image == 'svg' else None
+    )
+    return buf.getvalue()
+
+
+def _smoothed(x: List[int], values: List[float], points: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Smooth curve through the values as drawn by the line charts, None if all are 0.
+
+    The values are interpolated linearly at points positions and smoothed with
+    a moving average (like Chart.js tension: 0.4).
+    """
+    if max(values) <= 0:
+        return None
+    x_smooth = np.linspace(x[0], x[-1], points)
+    # Use numpy interpolation
+    smooth = np.interp(x_smooth, x, values)
+    # Apply smoothing via convolution for visual effect
+    kernel_size = 9
+    kernel = np.ones(kernel_size) / kernel_size
+    smooth = np.convolve(smooth, kernel, mode='same')
+    smooth = np.maximum(smooth, 0)  # Clip to [0, inf)
+    return x_smooth, smooth
+
+
+def _trace(name: str, color: str, x: List[int], values: List[float], points: int) -> Dict[str, Any]:
+    """JSON description of a data series with its smoothed curve."""
+    curve = _smoothed(x, values, points)
+    return {
+        'name': name,
+        'color': color,
+        'x': x,
+        'y': values,
+        'smoothed': None if curve is None else {
+            'x': np.round(curve[0], 4).tolist(),
+            'y': np.round(curve[1], 4).tolist()
+        }
+    }
+
+
+def monthly_stats_chart(data: Dict[str, Any], mm: int, jj: int, i18n, options: Optional[Dict[str, Any]] = None) -> bytes:
+    """Generate activity chart as image using matplotlib.
+    
+    Creates a line chart with:
+    - Red line: Real activity (normalized)
+    - Green line: Relative activity (normalized)
+    - Days 1-31 on x-axis
+    - Title and subtitle with month/year and observation count
+    
+    Returns:
+        bytes: Image data (PNG unless the image options select SVG)
+    """
+    # Prepare data - days 1-31
+    days = list(range(1, 32))
+    real_data = [data.get('activity_real', {}).get(str(d), 0) for d in days]
+    relative_data = [data.get('activity_relative', {}).get(str(d), 0) for d in days]
+    
+    # Get month name and year for title
+    month_name = i18n.get(f'months.{mm}')
+    year = f"19{str(jj).zfill(2)}" if jj >= 50 else f"20{str(jj).zfill(2)}"
+    observation_count = data.get('activity_observation_count', 0)
+    
+    # Get labels from i18n
+    label_real = i18n.get('monthly_stats.activity_real')
+    label_relative = i18n.get('monthly_stats.activity_relative')
+    x_axis_label = i18n.get('monthly_stats.x_axis')
+    y_axis_label = i18n.get('monthly_stats.y_axis')
+    
+    # Create figure and axis
+    fig, ax = _figure((12, 6), options)
+    
+    # Smooth interpolation for real data
+    curve = _smoothed(days, real_data, 300)
+    if curve is not None:  # Only if there's data
+        ax.plot(*curve, color='#dc3545', linewidth=2, label=label_real)
+    else:
+        ax.plot(days, real_data, color='#dc3545', linewidth=2, label=label_real)
+    
+    # Smooth interpolation for relative data
+    curve = _smoothed(days, relative_data, 300)
+    if curve is not None:  # Only if there's data
+        ax.plot(*curve, color='#28a745', linewidth=2, label=label_relative)
+    else:
+        ax.plot(days, relative_data, color='#28a745', linewidth=2, label=label_relative)
+    
+    # Add data points as markers
+    ax.plot(days, real_data, 'o', color='#dc3545', markersize=4, markerfacecolor='#dc3545')
+    ax.plot(days, relative_data, 'o', color='#28a745', markersize=4, markerfacecolor='#28a745')
+    
+    # Configure axes
+    ax.set_xlabel(x_axis_label, fontsize=12, fontweight='bold')
+    ax.set_ylabel(y_axis_label, fontsize=12, fontweight='bold')
+    ax.set_xlim(0.5, 31.5)
+    ax.set_ylim(bottom=0)
+    ax.set_xticks(range(1, 32))
+    ax.grid(True, alpha=0.3, linestyle='--')
+    
+    # Add legend
+    ax.legend(loc='upper left', fontsize=10, framealpha=0.9)
+    
+    # Add title and subtitle
+    title = f'Haloaktivität im {month_name} {year}'
+    subtitle = f'berechnet aus {observation_count} Einzelbeobachtungen'
+    fig.suptitle(title, fontsize=14, fontweight='bold', y=0.98)
+    ax.text(0.5, 1.02, subtitle, transform=ax.transAxes, 
+            ha='center', va='bottom', fontsize=10, style='italic')
+    
+    # Adjust layout to prevent label cutoff
+    fig.tight_layout(rect=[0, 0, 1, 0.96])
+    
+    return _image(fig, options)
+
+
+def monthly_stats_bar_chart(data: Dict[str, Any], mm: int, jj: int, i18n, options: Optional[Dict[str, Any]] = None) -> bytes:
+    """Generate activity bar chart as image using matplotlib.
+    
+    Creates a bar chart with:
+    - Two side-by-side bars for each day: red (real) and green (relative)
+    - Days 1-31 on x-axis
+    - Title and subtitle with month/year and observation count
+    
+    Returns:
+        bytes: Image data (PNG unless the image options select SVG)
+    """
+    # Prepare data - days 1-31
+    days = list(range(1, 32))
+    real_data = [data.get('activity_real', {}).get(str(d), 0) for d in days]
+    relative_data = [data.get('activity_relative', {}).get(str(d), 0) for d in days]
+    
+    # Get month name and year for title
+    month_name = i18n.get(f'months.{mm}')
+    year = f"19{str(jj).zfill(2)}" if jj >= 50 else f"20{str(jj).zfill(2)}"
+    observation_count = data.get('activity_observation_count', 0)
+    
+    # Get labels from i18n
+    label_real = i18n.get('monthly_stats.activity_real')
+    label_relative = i18n.get('monthly_stats.activity_relative')
+    x_axis_label = i18n.get('monthly_stats.x_axis')
+    y_axis_label = i18n.get('monthly_stats.y_axis')
+    
+    # Create figure and axis
+    fig, ax = _figure((14, 6), options)
+    
+    # Set up bar positions
+    bar_width = 0.35
+    x_pos = np.arange(len(days))
+    
+    # Create bars
+    bars1 = ax.bar(x_pos - bar_width/2, real_data, bar_width, 
+                   label=label_real, color='#dc3545', alpha=0.8)
+    bars2 = ax.bar(x_pos + bar_width/2, relative_data, bar_width,
+                   label=label_relative, color='#28a745', alpha=0.8)
+    
+    # Configure axes
+    ax.set_xlabel(x_axis_label, fontsize=12, fontweight='bold')
+    ax.set_ylabel(y_axis_label, fontsize=12, fontweight='bold')
+    ax.set_xticks(x_pos)
+    ax.set_xticklabels(days)
+    ax.set_ylim(bottom=0)
+    ax.grid(True, alpha=0.3, linestyle='--', axis='y')
+    
+    # Add legend
+    ax.legend(loc='upper left', fontsize=10, framealpha=0.9)
+    
+    # Add title and subtitle
+    title = f'Haloaktivität im {month_name} {year}'
+    subtitle = f'berechnet aus {observation_count} Einzelbeobachtungen'
+    fig.suptitle(title, fontsize=14, fontweight='bold', y=0.98)
+    ax.text(0.5, 1.02, subtitle, transform=ax.transAxes, 
+            ha='center', va='bottom', fontsize=10, style='italic')
+    
+    # Adjust layout to prevent label cutoff
+    fig.tight_layout(rect=[0, 0, 1, 0.96])
+    
+    return _image(fig, options)
+
+
+def annual_stats_chart(data: Dict[str, Any], jj: int, i18n, options: Optional[Dict[str, Any]] = None) -> bytes:
+    """Generate annual activity chart as image using matplotlib.
+    
+    Creates a line chart with:
+    - Red line: Real activity (normalized)
+    - Green line: Relative activity (normalized)
+    - Months 1-12 on x-axis
+    - Title with year
+    
+    Returns:
+        bytes: Image data (PNG unless the image options select SVG)
+    """
+    # Prepare data - months 1-12
+    months = list(range(1, 13))
+    real_data = [data.get('monthly_stats', {}).get(str(m), {}).get('real', 0) for m in months]
+    relative_data = [data.get('monthly_stats', {}).get(str(m), {}).get('relative', 0) for m in months]
+    
+    # Get month names and year for labels
+    month_labels = [i18n.get(f'months.{m}')[:3] for m in months]  # Use first 3 chars (Jan, Feb, etc.)
+    year = f"19{str(jj).zfill(2)}" if jj >= 50 else f"20{str(jj).zfill(2)}"
+    
+    # Get labels from i18n
+    label_real = i18n.get('annual_stats.chart_real')
+    label_relative = i18n.get('annual_stats.chart_relative')
+    x_axis_label = i18n.get('annual_stats.chart_x_axis')
+    y_axis_label = i18n.get('annual_stats.chart_y_axis')
+    
+    # Create figure and axis
+    fig, ax = _figure((12, 6), options)
+    
+    # Smooth interpolation for real data
+    curve = _smoothed(months, real_data, 120)
+    if curve is not None:  # Only if there's data
+        ax.plot(*curve, color='#dc3545', linewidth=2, label=label_real)
+    else:
+        ax.plot(months, real_data, color='#dc3545', linewidth=2, label=label_real)
+    
+    # Smooth interpolation for relative data
+    curve = _smoothed(months, relative_data, 120)
+    if curve is not None:  # Only if there's data
+        ax.plot(*curve, color='#28a745', linewidth=2, label=label_relative)
+    else:
+        ax.plot(months, relative_data, color='#28a745', linewidth=2, label=label_relative)
+    
+    # Add data points as markers
+    ax.plot(months, real_data, 'o', color='#dc3545', markersize=4, markerfacecolor='#dc3545')
+    ax.plot(months, relative_data, 'o', color='#28a745', markersize=4, markerfacecolor='#28a745')
+    
+    # Configure axes
+    ax.set_xlabel(x_axis_label, fontsize=12, fontweight='bold')
+    ax.set_ylabel(y_axis_label, fontsize=12, fontweight='bold')
+    ax.set_xlim(0.5, 12.5)
+    ax.set_ylim(bottom=0)
+    ax.set_xticks(months)
+    ax.set_xticklabels(month_labels)
+    ax.grid(True, alpha=0.3, linestyle='--')
+    
+    # Add legend
+    ax.legend(loc='upper left', fontsize=10, framealpha=0.9)
+    
+    # Add title
+    title_template = i18n.get('annual_stats.chart_title')
+    title = title_template.replace('{year}', year)
+    fig.suptitle(title, fontsize=14, fontweight='bold', y=0.98)
+    
+    # Add subtitle with observation count
+    total_ee = data.get('totals', {}).get('total_ee', 0)
+    subtitle = f'berechnet aus {total_ee} Einzelbeobachtungen'
+    fig.text(0.5, 0.91, subtitle, ha='center', fontsize=10, color='#666')
+    
+    # Adjust layout to prevent label cutoff
+    fig.tight_layout(rect=[0, 0, 1, 0.89])
+    
+    return _image(fig, options)
+
+
+def annual_stats_bar_chart(data: Dict[str, Any], jj: int, i18n, options: Optional[Dict[str, Any]] = None) -> bytes:
+    """Generate annual activity bar chart as image using matplotlib.
+    
+    Creates a bar chart with:
+    - Two side-by-side bars for each month: red (real) and green (relative)
+    - Months 1-12 on x-axis
+    - Title with year
+    
+    Returns:
+        bytes: Image data (PNG unless the image options select SVG)
+    """
+    # Prepare data - months 1-12
+    months = list(range(1, 13))
+    real_data = [data.get('monthly_stats', {}).get(str(m), {}).get('real', 0) for m in months]
+    relative_data = [data.get('monthly_stats', {}).get(str(m), {}).get('relative', 0) for m in months]
+    
+    # Get month names and year for labels
+    month_labels = [i18n.get(f'months.{m}')[:3] for m in months]  # Use first 3 chars (Jan, Feb, etc.)
+    year = f"19{str(jj).zfill(2)}" if jj >= 50 else f"20{str(jj).zfill(2)}"
+    
+    # Get labels from i18n
+    label_real = i18n.get('annual_stats.chart_real')
+    label_relative = i18n.get('annual_stats.chart_relative')
+    x_axis_label = i18n.get('annual_stats.chart_x_axis')
+    y_axis_label = i18n.get('annual_stats.chart_y_axis')
+    
+    # Create figure and axis
+    fig, ax = _figure((12, 6), options)
+    
+    # Set up bar positions
+    bar_width = 0.35
+    x_pos = np.arange(len(months))
+    
+    # Create bars
+    bars1 = ax.bar(x_pos - bar_width/2, real_data, bar_width,
+                   label=label_real, color='#dc3545', alpha=0.8)
+    bars2 = ax.bar(x_pos + bar_width/2, relative_data, bar_width,
+                   label=label_relative, color='#28a745', alpha=0.8)
+    
+    # Configure axes
+    ax.set_xlabel(x_axis_label, fontsize=12, fontweight='bold')
+    ax.set_ylabel(y_axis_label, fontsize=12, fontweight='bold')
+    ax.set_xticks(x_pos)
+    ax.set_xticklabels(month_labels)
+    ax.set_ylim(bottom=0)
+    ax.grid(True, alpha=0.3, linestyle='--', axis='y')
+    
+    # Add legend
+    ax.legend(loc='upper left', fontsize=10, framealpha=0.9)
+    
+    # Add title and subtitle
+    title_template = i18n.get('annual_stats.chart_title')
+    title = title_template.replace('{year}', year)
+    fig.suptitle(title, fontsize=14, fontweight='bold', y=0.98)
+    
+    # Add subtitle with observation count
+    total_ee = data.get('totals', {}).get('total_ee', 0)
+    subtitle = f'berechnet aus {total_ee} Einzelbeobachtungen'
+    ax.text(0.5, 1.02, subtitle, transform=ax.transAxes, 
+            ha='center', va='bottom', fontsize=10, style='italic')
+    
+    # Adjust layout to prevent label cutoff
+    fig.tight_layout(rect=[0, 0, 1, 0.96])
+    
+    return _image(fig, options)
+
+
+def monthly_stats_spec(data: Dict[str, Any], mm: int, jj: int, i18n) -> Dict[str, Any]:
+    """JSON description of the monthly activity charts.
+    
+    Contains the titles, axis labels and one trace per activity series with
+    the daily values (as drawn by the bar chart and the markers of the line
+    chart) and the smoothed curve of the line chart (None without activity).
+    """
+    days = list(range(1, 32))
+    real_data = [data.get('activity_real', {}).get(str(d), 0) for d in days]
+    relative_data = [data.get('activity_relative', {}).get(str(d), 0) for d in days]
+    
+    month_name = i18n.get(f'months.{mm}')
+    year = f"19{str(jj).zfill(2)}" if jj >= 50 else f"20{str(jj).zfill(2)}"
+    observation_count = data.get('activity_observation_count', 0)
+    
+    return {
+        'title': f'Haloaktivität im {month_name} {year}',
+        'subtitle': f'berechnet aus {observation_count} Einzelbeobachtungen',
+        'x_axis': {
+            'title': i18n.get('monthly_stats.x_axis'),
+            'values': days,
+            'labels': [str(d) for d in days]
+        },
+        'y_axis': {'title': i18n.get('monthly_stats.y_axis')},
+        'traces': [
+            _trace(i18n.get('monthly_stats.activity_real'), '#dc3545', days, real_data, 300),
+            _trace(i18n.get('monthly_stats.activity_relative'), '#28a745', days, relative_data, 300)
+        ]
+    }
+
+
+def annual_stats_spec(data: Dict[str, Any], jj: int, i18n) -> Dict[str, Any]:
+    """JSON description of the annual activity charts (see monthly_stats_spec)."""
+    months = list(range(1, 13))
+    real_data = [data.get('monthly_stats', {}).get(str(m), {}).get('real', 0) for m in months]
+    relative_data = [data.get('monthly_stats', {}).get(str(m), {}).get('relative', 0) for m in months]
+    
+    year = f"19{str(jj).zfill(2)}" if jj >= 50 else f"20{str(jj).zfill(2)}"
+    total_ee = data.get('totals', {}).get('total_ee', 0)
+    
+    return {
+        'title': i18n.get('annual_stats.chart_title').replace('{year}', year),
+        'subtitle': f'berechnet aus {total_ee} Einzelbeobachtungen',
+        'x_axis': {
+            'title': i18n.get('annual_stats.chart_x_axis'),
+            'values': months,
+            'labels': [i18n.get(f'months.{m}')[:3] for m in months]
+        },
+        'y_axis': {'title': i18n.get('annual_stats.chart_y_axis')},
+        'traces': [
+            _trace(i18n.get('annual_stats.chart_real'), '#dc3545', months, real_data, 120),
+            _trace(i18n.get('annual_stats.chart_relative'), '#28a745', months, relative_data, 120)
+        ]
+    }
+
+
+def participation_heatmap(data: Dict[str, Any], metric: str, i18n) -> bytes:
+    """Generate observer × year participation heatmap as PNG image using matplotlib.
+
+    Creates a heatmap with:
+    - One row per observer (KK), one column per year
+    - Color = value of the selected metric (empty cells white)
+
+    Returns:
+        bytes: PNG image data
+    """
+    observers = data.get('observers', [])
+    years = data.get('years', [])
+    values = np.array(data.get(metric, []), dtype=float).reshape(len(observers), len(years))
+
+    # Figure height grows with the number of observers
+    height = min(max(4, 0.18 * len(observers) + 2), 40)
+    width = min(max(8, 0.25 * len(years) + 3), 30)
+    fig, ax = _figure((width, height))
+
+    masked = np.ma.masked_where(values == 0, values)
+    cmap = matplotlib.colormaps['viridis'].copy()
+    cmap.set_bad('white')
+    image = ax.imshow(masked, aspect='auto', interpolation='nearest', cmap=cmap)
+
+    # Label every year/observer unless there are too many
+    year_step = max(1, len(years) // 40)
+    kk_step = max(1, len(observers) // 120)
+    ax.set_xticks(np.arange(0, len(years), year_step))
+    ax.set_xticklabels([str(y) for y in years[::year_step]], rotation=90, fontsize=8)
+    ax.set_yticks(np.arange(0, len(observers), kk_step))
+    ax.set_yticklabels(observers[::kk_step], fontsize=7)
+    ax.set_xlabel(i18n.get('observers.participation_x_axis'), fontsize=12, fontweight='bold')
+    ax.set_ylabel(i18n.get('observers.participation_y_axis'), fontsize=12, fontweight='bold')
+
+    colorbar = fig.colorbar(image, ax=ax, fraction=0.03, pad=0.02)
+    colorbar.set_label(i18n.get(f'observers.participation_metric_{metric}'))
+
+    fig.suptitle(i18n.get('observers.participation_title'), fontsize=14, fontweight='bold')
+
+    fig.tight_layout(rect=[0, 0, 1, 0.97])
+
+    return _image(fig)
+
+
+# Renderers by chart name
+CHARTS = {
+    'monthly_linegraph': monthly_stats_chart,
+    'monthly_bargraph': monthly_stats_bar_chart,
+    'annual_linegraph': annual_stats_chart,
+    'annual_bargraph': annual_stats_bar_chart,
+    'participation_heatmap': participation_heatmap,
+}
+
+
+def render_chart(name: str, *args: Any) -> bytes:
+    """Image of a chart, rendered in the calling thread."""
+    return CHARTS[name](*args)
+
+
+def _warm_up_worker() -> None:
+    # Load fonts and the Agg backend before the first request
+    fig, ax = _figure((1, 1))
+    ax.plot([0, 1], [0, 1])
+    ax.set_title('warm-up')
+    _image(fig)
+
+
+class ChartRenderPool:
+    """Pool of worker processes rendering charts."""
+
+    def __init__(self, processes: int):
+        self.processes = processes
+        self._executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_warm_up_worker
+        )
+
+    def render(self, name: str, *args: Any) -> bytes:
+        """Image of a chart, rendered by a worker process."""
+        return self._executor.submit(render_chart, name, *args).result()
+
+    def render_all(self, requests: Sequence[Tuple[str, Tuple[Any, ...]]]) -> List[bytes]:
+        """Images of several charts (name, arguments), rendered concurrently."""
+        futures = [self._executor.submit(render_chart, name, *args) for name, args in requests]
+        return [future.result() for future in futures]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool_lock = threading.Lock()
+
+
+def _pool(config: Dict[str, Any], name: str, processes: int) -> ChartRenderPool:
+    """Render pool stored in the app config under name, started on first use."""
+    with _pool_lock:
+        pool = config.get(name)
+        if pool is None:
+            pool = config[name] = ChartRenderPool(processes)
+    return pool
+
+
+def get_render_pool(config: Dict[str, Any]) -> Optional[ChartRenderPool]:
+    """Render pool of the app (CHART_RENDER_PROCESSES workers), None if disabled."""
+    processes = config.get('CHART_RENDER_PROCESSES', 0)
+    if not processes:
+        return None
+    return _pool(config, 'CHART_RENDER_POOL', processes)
+
+
+def get_bundle_pool(config: Dict[str, Any]) -> Optional[ChartRenderPool]:
+    """Render pool for many charts at once, None if they are rendered in the calling thread.
+
+    This is the render pool if enabled, otherwise a pool of
+    CHART_BUNDLE_PROCESSES workers (None = one per CPU), so chart bundles are
+    rendered concurrently even when single charts are not. With fewer than
+    two workers there is nothing to gain from a pool.
+    """
+    pool = get_render_pool(config)
+    if pool is not None:
+        return pool
+    processes = config.get('CHART_BUNDLE_PROCESSES')
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes < 2:
+        return None
+    return _pool(config, 'CHART_BUNDLE_POOL', processes)
+
+
+def render_all(
+    config: Dict[str, Any], requests: Sequence[Tuple[str, Tuple[Any, ...]]], bundle: bool = False
+) -> List[bytes]:
+    """Images of several charts (name, arguments), rendered by the render pool if enabled.
+
+    With the pool, the charts are rendered concurrently by its workers; with
+    bundle, by the pool of get_bundle_pool(). If the worker processes died
+    (e.g. killed by the system), the pool is dropped and the charts are
+    rendered in the calling thread.
+    """
+    pool = get_bundle_pool(config) if bundle else get_render_pool(config)
+    if pool is not None:
+        try:
+            return pool.render_all(requests)
+        except BrokenProcessPool:
+            with _pool_lock:
+                for key in ('CHART_RENDER_POOL', 'CHART_BUNDLE_POOL'):
+                    if config.get(key) is pool:
+                        config[key] = None
+            pool.shutdown()
+    return [render_chart(name, *args) for name, args in requests]
+
+
+def render(config: Dict[str, Any], name: str, *args: Any) -> bytes:
+    """Image of a chart, rendered by the render pool if enabled (see render_all)."""
+    return render_all(config, [(name, args)])[0]
+
+
+def pdf_document(images: Sequence[bytes], dpi: int = DEFAULT_DPI) -> bytes:
+    """Multi-page PDF with one PNG chart image per page (page size = image size at dpi)."""
+    buf = io.BytesIO()
+    # No creation date, so equal charts give equal documents
+    with PdfPages(buf, metadata={'CreationDate': None}) as pdf:
+        for image in images:
+            pixels = imread(io.BytesIO(image), format='png')
+            height, width = pixels.shape[:2]
+            fig = Figure(figsize=(width / dpi, height / dpi))
+            FigureCanvasAgg(fig)
+            ax = fig.add_axes((0, 0, 1, 1))
+            ax.imshow(pixels, interpolation='none')
+            ax.set_axis_off()
+            pdf.savefig(fig, dpi=dpi)
+    return buf.getvalue()
@@ -0,0 +1,176 @@
+"""
+Halo climatology: frequency of halo types per day of year across all years.
+
+For every year of the archive the number of observers reporting each
+individual halo type on each day of year is counted, together with the
+daily halo activity of the monthly statistics. Mean and percentile bands
+across the years then describe the "normal" halo year.
+
+All counting is done with np.bincount over flat (year, day of year, EE)
+indexes, so the whole archive is aggregated without Python loops.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Sequence
+import warnings
+
+import numpy as np
+
+from ..models.constants import ACTIVITY_REGIONS, calculate_activity_factors
+from .dataset import ObservationTable, split_halo_types
+
+
+# Day of year index of the first day of each month in a leap year,
+# so that e.g. 1 March is always day 61 and 29 February has its own slot
+MONTH_OFFSETS = np.array([0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335])
+DAYS_IN_MONTH = np.array([31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+DAYS_OF_YEAR = 366
+FEB_29 = 59
+
+# Individual halo types are stored as two-digit numbers
+EE_SLOTS = 100
+
+DEFAULT_PERCENTILES = (10, 50, 90)
+
+
+def _day_of_year(mm: np.ndarray, tt: np.ndarray) -> np.ndarray:
+    """Day of year index (0-365) on the leap year calendar, -1 for invalid dates."""
+    valid = (mm >= 1) & (mm <= 12)
+    month = np.where(valid, mm - 1, 0)
+    valid &= (tt >= 1) & (tt <= DAYS_IN_MONTH[month])
+    return np.where(valid, MONTH_OFFSETS[month] + tt - 1, -1)
+
+
+def _band(cube: np.ndarray, percentiles: Sequence[int]) -> Dict[str, list]:
+    """Mean and percentiles across years (axis 0), ignoring NaN slots."""
+    with warnings.catch_warnings():
+        # Slots without any contributing year (29 February without leap years)
+        warnings.simplefilter('ignore', RuntimeWarning)
+        result = {'mean': np.nanmean(cube, axis=0)}
+        values = np.nanpercentile(cube, percentiles, axis=0)
+        for p, value in zip(percentiles, values):
+            result[f'p{p}'] = value
+    return {name: np.round(np.nan_to_num(value), 3).tolist() for name, value in result.items()}
+
+
+def calculate_climatology(
+    table: ObservationTable,
+    regions: Optional[Iterable[int]] = None,
+    observers: Optional[Iterable[int]] = None,
+    halo_types: Optional[Iterable[int]] = None,
+    percentiles: Sequence[int] = DEFAULT_PERCENTILES
+) -> Dict[str, Any]:
+    """Calculate the day-of-year climatology of the observations in table.
+
+    Args:
+        table: Columnar observation table
+        regions: Only use observations from these regions (GG), None = all
+        observers: Only use observations of these observers (KK), None = all
+        halo_types: Individual halo types to report, None = all observed types
+        percentiles: Percentiles of the bands across years
+
+    Returns:
+        Dict with the year range, month/day of every day-of-year slot, and
+        mean/percentile series of observers per halo type, observers with
+        any solar halo and real halo activity
+    """
+    selected = np.ones(table.size, dtype=bool)
+    if regions is not None:
+        selected &= np.isin(table['GG'], list(regions))
+    if observers is not None:
+        selected &= np.isin(table['KK'], list(observers))
+
+    year4 = table['year4']
+    doy = _day_of_year(table['MM'].astype(np.int32), table['TT'].astype(np.int32))
+    selected &= doy >= 0
+
+    slot_month = np.searchsorted(MONTH_OFFSETS, np.arange(DAYS_OF_YEAR), 'right') - 1
+    slot_day = np.arange(DAYS_OF_YEAR) - MONTH_OFFSETS[slot_month] + 1
+    result = {
+        'first_year': None,
+        'last_year': None,
+        'year_count': 0,
+        'mm': (slot_month + 1).tolist(),
+        'tt': slot_day.tolist(),
+        'percentiles': list(percentiles),
+        'halo_types': {},
+        'observers': {},
+        'activity': {}
+    }
+    if not selected.any():
+        return result
+
+    # Years covered by the selection: every year from the first to the last
+    first_year = int(year4[selected].min())
+    last_year = int(year4[selected].max())
+    years = np.arange(first_year, last_year + 1)
+    n_years = years.size
+    size = n_years * DAYS_OF_YEAR
+    year_index = year4 - first_year
+
+    # Unique (year, day, KK, individual EE) of solar halos
+    solar = np.flatnonzero(selected & (table['O'] == 1))
+    source, ee = split_halo_types(table['EE'][solar])
+    rows = solar[source]
+    keep = (ee >= 0) & (ee < EE_SLOTS)
+    rows, ee = rows[keep], ee[keep].astype(np.int64)
+    slot = year_index[rows].astype(np.int64) * DAYS_OF_YEAR + doy[rows]
+    kk = table['KK'][rows].astype(np.int64)
+    reports = np.unique((slot * 4096 + kk + 1) * EE_SLOTS + ee)
+    report_slot = reports // EE_SLOTS // 4096
+    report_ee = reports % EE_SLOTS
+
+    # Observers per (year, day, EE)
+    counts = np.bincount(report_slot * EE_SLOTS + report_ee, minlength=size * EE_SLOTS)
+    counts = counts.reshape(n_years, DAYS_OF_YEAR, EE_SLOTS).astype(float)
+
+    # Observers with any solar halo per (year, day)
+    observer_days = np.unique(reports // EE_SLOTS)
+    observer_counts = np.bincount(observer_days // 4096, minlength=size)
+    observer_counts = observer_counts.reshape(n_years, DAYS_OF_YEAR).astype(float)
+
+    # Real activity per (year, day), normalized per month as in the monthly statistics
+    d = table['d']
+    qualifying = np.flatnonzero(
+        selected
+        & (table['O'] == 1)
+        & np.isin(table['GG'], list(ACTIVITY_REGIONS))
+        & (d >= -1) & (d <= 2)
+        & (table['g'] != 1)
+    )
+    factors = calculate_activity_factors(
+        table['EE'][qualifying], table['H'][qualifying], table['DD'][qualifying]
+    )
+    q_year = year_index[qualifying].astype(np.int64)
+    q_month = table['MM'][qualifying].astype(np.int64) - 1
+    activity = np.bincount(
+        q_year * DAYS_OF_YEAR + doy[qualifying], weights=factors, minlength=size
+    ).reshape(n_years, DAYS_OF_YEAR)
+    month_observers = np.unique((q_year * 12 + q_month) * 4096 + table['KK'][qualifying].astype(np.int64))
+    active_count = np.bincount(month_observers // 4096, minlength=n_years * 12)
+    active_count = active_count.reshape(n_years, 12)
+    days_in_month = np.tile(DAYS_IN_MONTH, (n_years, 1))
+    days_in_month[:, 1] = np.where(years % 4 == 0, 29, 28)
+    month_norm = np.where(active_count > 0, 30.0 / days_in_month / np.maximum(active_count, 1), 0.0)
+    activity = activity * month_norm[:, slot_month]
+
+    # 29 February only exists in leap years
+    non_leap = years % 4 != 0
+    counts[non_leap, FEB_29, :] = np.nan
+    observer_counts[non_leap, FEB_29] = np.nan
+    activity[non_leap, FEB_29] = np.nan
+
+    if halo_types is None:
+        halo_types = np.flatnonzero(np.nansum(counts, axis=(0, 1)) > 0)
+
+    result.update({
+        'first_year': first_year,
+        'last_year': last_year,
+        'year_count': int(n_years),
+        'halo_types': {
+            int(e): _band(counts[:, :, int(e)], percentiles)
+            for e in halo_types if 0 <= int(e) < EE_SLOTS
+        },
+        'observers': _band(observer_counts, percentiles),
+        'activity': _band(activity, percentiles)
+    })
+    return result
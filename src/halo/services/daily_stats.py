@@ -0,0 +1,239 @@
+"""
+Per-day aggregates for statistics over arbitrary date ranges.
+
+Monthly and annual statistics rescan the observation list for every request.
+DailyAggregates condenses the archive once per dataset generation into
+day-sorted buckets (deduplicated halo types per observer and day, observer
+days, activity contributions), so the statistics of any date range are
+obtained by slicing and summing these buckets.
+
+The counting rules are those of the monthly statistics (Monatsstatistik):
+- each observer counts each individual halo type only once per day
+- combined halo types are resolved to their components (resolve_halo_type)
+- activity uses the weighting of calculate_halo_activity()
+"""
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ..models.constants import (
+    ACTIVITY_REGIONS,
+    OVERVIEW_HALO_TYPES,
+    calculate_activity_factors,
+    calculate_daylight_factor_array,
+)
+from .dataset import ObservationTable, split_halo_types
+
+
+# KK values are packed together with day keys into one int64 key
+_KK_SLOTS = 4096
+
+
+def _pair_key(days: np.ndarray, kk: np.ndarray) -> np.ndarray:
+    return days.astype(np.int64) * _KK_SLOTS + (kk.astype(np.int64) + 1)
+
+
+def _slice(days: np.ndarray, first: int, last: int) -> slice:
+    """Slice of a day-sorted array covering first..last (inclusive)."""
+    return slice(np.searchsorted(days, first, 'left'), np.searchsorted(days, last, 'right'))
+
+
+def _record_latitude(record: List[str], primary: bool) -> float:
+    """Latitude of the primary or secondary site, as read by calculate_halo_activity()."""
+    deg_idx, min_idx, ns_idx = (10, 11, 12) if primary else (18, 19, 20)
+    lat_deg = int(record[deg_idx]) if len(record) > deg_idx and record[deg_idx] else 50
+    lat_min = int(record[min_idx]) if len(record) > min_idx and record[min_idx] else 0
+    lat_ns = record[ns_idx] if len(record) > ns_idx else 'N'
+    latitude = lat_deg + lat_min / 60.0
+    return -latitude if lat_ns == 'S' else latitude
+
+
+class DailyAggregates:
+    """Day-sorted buckets of the statistics-relevant observation data."""
+
+    def __init__(self, table: ObservationTable):
+        day = table['day_key']
+        kk = table['KK'].astype(np.int32)
+        o = table['O']
+
+        # All observation days, for counting observations in a range
+        self.obs_days = np.sort(day)
+
+        # Unique (day, KK, individual EE) of solar halos
+        solar = np.flatnonzero(o == 1)
+        source, ee = split_halo_types(table['EE'][solar])
+        rows = solar[source]
+        triples = np.unique(np.stack([day[rows], kk[rows], ee.astype(np.int32)], axis=1), axis=0)
+        self.solar_day = triples[:, 0]
+        self.solar_kk = triples[:, 1]
+        self.solar_ee = triples[:, 2]
+
+        # Observer days: number of individual solar EE and lunar flag per (day, KK)
+        solar_pairs, solar_counts = np.unique(_pair_key(self.solar_day, self.solar_kk), return_counts=True)
+        lunar = np.flatnonzero(o == 2)
+        lunar_pairs = np.unique(_pair_key(day[lunar], kk[lunar]))
+        pairs = np.union1d(solar_pairs, lunar_pairs)
+        self.od_day = pairs // _KK_SLOTS
+        self.od_kk = (pairs % _KK_SLOTS - 1).astype(np.int32)
+        self.od_solar = np.zeros(pairs.size, dtype=np.int32)
+        self.od_solar[np.searchsorted(pairs, solar_pairs)] = solar_counts
+        self.od_lunar = np.zeros(pairs.size, dtype=bool)
+        self.od_lunar[np.searchsorted(pairs, lunar_pairs)] = True
+
+        # Site days: unique (day, KK, g) of all observations (g outside 0-2 counts as 0)
+        g = table['g'].astype(np.int32)
+        g = np.where((g >= 0) & (g <= 2), g, 0)
+        sites = np.unique(np.stack([day, kk, g], axis=1), axis=0)
+        self.site_day = sites[:, 0]
+        self.site_kk = sites[:, 1]
+        self.site_g = sites[:, 2]
+
+        # Activity contributions (filter criteria of calculate_halo_activity)
+        d = table['d']
+        qualifying = np.flatnonzero(
+            (o == 1)
+            & np.isin(table['GG'], list(ACTIVITY_REGIONS))
+            & (d >= -1) & (d <= 2)
+            & (table['g'] != 1)
+        )
+        qualifying = qualifying[np.argsort(day[qualifying], kind='stable')]
+        self.act_day = day[qualifying]
+        self.act_kk = kk[qualifying]
+        self.act_tt = table['TT'][qualifying].astype(np.int32)
+        self.act_mm = table['MM'][qualifying].astype(np.int32)
+        self.act_primary = table['g'][qualifying] == 0
+        self.act_real = calculate_activity_factors(
+            table['EE'][qualifying], table['H'][qualifying], table['DD'][qualifying]
+        )
+
+        # Rare solar halos (individual EE > 12), one entry per observation
+        rare = ee > 12
+        rare_rows = rows[rare]
+        order = np.argsort(day[rare_rows], kind='stable')
+        self.rare_day = day[rare_rows][order]
+        self.rare_jj = table['JJ'][rare_rows][order].astype(np.int32)
+        self.rare_tt = table['TT'][rare_rows][order].astype(np.int32)
+        self.rare_mm = table['MM'][rare_rows][order].astype(np.int32)
+        self.rare_ee = ee[rare][order].astype(np.int32)
+        self.rare_kk = kk[rare_rows][order]
+        self.rare_gg = table['GG'][rare_rows][order].astype(np.int32)
+
+    def summarize(self, day_keys: np.ndarray, active_observers: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Statistics for the days in day_keys (sorted, consecutive calendar days).
+
+        Args:
+            day_keys: Day keys (dataset.day_key) of every calendar day in the range
+            active_observers: Observer record per KK string for observers to include
+
+        Returns:
+            Dict with observer overview, EE totals, per-day series and activity
+        """
+        first, last = int(day_keys[0]), int(day_keys[-1])
+        n_days = len(day_keys)
+
+        # Lookup tables indexed by KK
+        active = np.zeros(_KK_SLOTS, dtype=bool)
+        lat_primary = np.full(_KK_SLOTS, np.nan)
+        lat_secondary = np.full(_KK_SLOTS, np.nan)
+        for kk_str, record in active_observers.items():
+            kk_int = int(kk_str)
+            active[kk_int] = True
+            lat_primary[kk_int] = _record_latitude(record, True)
+            lat_secondary[kk_int] = _record_latitude(record, False)
+
+        # Observer overview
+        s = _slice(self.od_day, first, last)
+        od_kk, od_solar, od_lunar = self.od_kk[s], self.od_solar[s], self.od_lunar[s]
+        keep = active[od_kk]
+        od_kk, od_solar, od_lunar = od_kk[keep], od_solar[keep], od_lunar[keep]
+        total_solar = np.bincount(od_kk, weights=od_solar, minlength=_KK_SLOTS)
+        days_solar = np.bincount(od_kk, weights=od_solar > 0, minlength=_KK_SLOTS)
+        days_lunar = np.bincount(od_kk, weights=od_lunar, minlength=_KK_SLOTS)
+        total_days = np.bincount(od_kk, weights=(od_solar > 0) | od_lunar, minlength=_KK_SLOTS)
+
+        s = _slice(self.site_day, first, last)
+        site_days = np.zeros((_KK_SLOTS, 3), dtype=np.int64)
+        np.add.at(site_days, (self.site_kk[s], self.site_g[s]), 1)
+
+        observer_list = []
+        for kk_str, record in active_observers.items():
+            kk_int = int(kk_str)
+            # Predominant site: g with most observation days (ties: lowest g)
+            predominant_g = int(np.argmax(site_days[kk_int]))
+            if predominant_g == 1:
+                region = 39
+            elif predominant_g == 2:
+                region = int(record[14]) if record[14] else 39
+            else:
+                region = int(record[6]) if record[6] else 39
+            observer_list.append({
+                'kk': kk_str,
+                'region': region,
+                'total_solar': int(total_solar[kk_int]),
+                'days_solar': int(days_solar[kk_int]),
+                'days_lunar': int(days_lunar[kk_int]),
+                'total_days': int(total_days[kk_int])
+            })
+        observer_list.sort(key=lambda x: (x['region'], x['kk']))
+
+        # Number of observers per individual solar halo type and day
+        s = _slice(self.solar_day, first, last)
+        keep = active[self.solar_kk[s]] & (self.solar_ee[s] >= 0)
+        ee = self.solar_ee[s][keep]
+        ee_day = np.searchsorted(day_keys, self.solar_day[s][keep])
+        ee_counts = np.bincount(ee, minlength=100)
+        overview = np.isin(ee, list(OVERVIEW_HALO_TYPES))
+        daily_totals = np.bincount(ee_day[overview], minlength=n_days)
+        daily_observers = np.zeros(n_days, dtype=np.int64)
+        observer_days = np.unique(_pair_key(ee_day, self.solar_kk[s][keep]))
+        np.add.at(daily_observers, observer_days // _KK_SLOTS, 1)
+
+        # Activity: normalized by observers contributing in the range and to 30 days
+        s = _slice(self.act_day, first, last)
+        act_kk = self.act_kk[s]
+        real = self.act_real[s]
+        latitude = np.where(self.act_primary[s], lat_primary[act_kk], lat_secondary[act_kk])
+        known = ~np.isnan(latitude)
+        relative = real.copy()
+        relative[known] *= calculate_daylight_factor_array(
+            self.act_tt[s][known], self.act_mm[s][known], latitude[known]
+        )
+        act_days = np.searchsorted(day_keys, self.act_day[s])
+        active_count = int(np.unique(act_kk).size)
+        normalization = 30.0 / n_days / active_count if active_count > 0 else 0.0
+        daily_real = np.bincount(act_days, weights=real, minlength=n_days) * normalization
+        daily_relative = np.bincount(act_days, weights=relative, minlength=n_days) * normalization
+
+        # Rare halos of included observers, sorted by day, then EE, then KK
+        s = _slice(self.rare_day, first, last)
+        rare = sorted(
+            (int(day), int(e), int(k), int(jj), int(mm), int(tt), int(gg))
+            for day, jj, mm, tt, e, k, gg in zip(
+                self.rare_day[s], self.rare_jj[s], self.rare_mm[s], self.rare_tt[s],
+                self.rare_ee[s], self.rare_kk[s], self.rare_gg[s]
+            )
+            if active[k]
+        )
+        rare_halos = [
+            {'jj': jj, 'mm': mm, 'tt': tt, 'ee': e, 'kk': str(k).zfill(2), 'gg': str(gg).zfill(2) if gg != 39 else '//'}
+            for _, e, k, jj, mm, tt, gg in rare
+        ]
+
+        return {
+            'observer_overview': observer_list,
+            'ee_totals': {int(e): int(ee_counts[e]) for e in sorted(OVERVIEW_HALO_TYPES)},
+            'ee_counts': {int(e): int(c) for e, c in enumerate(ee_counts) if c > 0},
+            'daily_totals': daily_totals.tolist(),
+            'daily_observers': daily_observers.tolist(),
+            'activity_real': daily_real.tolist(),
+            'activity_relative': daily_relative.tolist(),
+            'activity_totals': {
+                'real': float(daily_real.sum()),
+                'relative': float(daily_relative.sum())
+            },
+            'activity_count': active_count,
+            'activity_observation_count': int(real.size),
+            'rare_halos': rare_halos,
+            'count': int(np.searchsorted(self.obs_days, last, 'right') - np.searchsorted(self.obs_days, first, 'left'))
+        }
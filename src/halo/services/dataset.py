@@ -0,0 +1,229 @@
+"""
+Dataset generations and columnar observation table.
+
+The observation list (app.config['OBSERVATIONS']) and the observer records
+from halobeo.csv (app.config['OBSERVERS']) are modified by many endpoints.
+Every modification bumps a generation counter, so indexes and aggregates
+derived from the data can be built once and reused until the data changes.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..models.constants import COMBINED_TO_INDIVIDUAL_HALOS
+
+
+# Integer fields of an Observation record that are mirrored as columns
+OBSERVATION_FIELDS = (
+    'KK', 'O', 'JJ', 'MM', 'TT', 'g', 'ZS', 'ZM', 'd', 'DD', 'N', 'C', 'c',
+    'EE', 'H', 'F', 'V', 'f', 'zz', 'GG', 'HO', 'HU'
+)
+
+# Number of subsets whose rows an ObservationTable remembers
+SUBSET_MEMORY = 8
+
+
+def observations_changed(config: Dict[str, Any]) -> None:
+    """Mark the in-memory observation list as modified."""
+    config['OBSERVATIONS_GENERATION'] = config.get('OBSERVATIONS_GENERATION', 0) + 1
+
+
+def observers_changed(config: Dict[str, Any]) -> None:
+    """Mark the observer records (halobeo.csv) as modified."""
+    config['OBSERVERS_GENERATION'] = config.get('OBSERVERS_GENERATION', 0) + 1
+
+
+def observations_key(config: Dict[str, Any]) -> Tuple[int, int, int]:
+    """Cache key identifying the current state of the observation list.
+
+    Besides the generation counter, the identity and length of the list are
+    included so that a list replaced without notification is still detected.
+    """
+    observations = config.get('OBSERVATIONS') or []
+    return (config.get('OBSERVATIONS_GENERATION', 0), id(observations), len(observations))
+
+
+def observers_key(config: Dict[str, Any]) -> Tuple[int, int, int]:
+    """Cache key identifying the current state of the observer records."""
+    observers = config.get('OBSERVERS') or []
+    return (config.get('OBSERVERS_GENERATION', 0), id(observers), len(observers))
+
+
+def cached(config: Dict[str, Any], name: str, key: Any, builder: Callable[[], Any]) -> Any:
+    """Return the value stored under name if it was built for key, else rebuild it.
+
+    Only one value is kept per name, so a new generation simply replaces the
+    previous one.
+    """
+    cache = config.setdefault('DATASET_CACHE', {})
+    entry = cache.get(name)
+    if entry is not None and entry[0] == key:
+        return entry[1]
+    value = builder()
+    cache[name] = (key, value)
+    return value
+
+
+def day_key(year: Any, month: Any, day: Any) -> Any:
+    """Sortable day number for a 4-digit year, month and day.
+
+    Every month occupies 31 slots, so invalid calendar days in the data
+    (e.g. 31 April) still get a unique and correctly ordered key.
+    Works on scalars and numpy arrays alike.
+    """
+    return (year * 12 + (month - 1)) * 31 + (day - 1)
+
+
+def split_halo_types(ee: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized resolve_halo_type().
+
+    Args:
+        ee: Array of halo types
+
+    Returns:
+        Tuple (source, individual): for every individual halo type the index
+        of the element in ee it came from, and the individual type itself.
+        Combined types (e.g. EE 04) yield two entries (EE 02 and EE 03).
+    """
+    ee = np.asarray(ee)
+    combined = np.zeros(ee.shape, dtype=bool)
+    left = ee.astype(np.int16, copy=True)
+    right = np.full(ee.shape, -1, dtype=np.int16)
+    for code, (lo, hi) in COMBINED_TO_INDIVIDUAL_HALOS.items():
+        hit = ee == code
+        combined |= hit
+        left[hit] = lo
+        right[hit] = hi
+    index = np.arange(ee.size)
+    extra = np.flatnonzero(combined)
+    source = np.concatenate([index, extra])
+    individual = np.concatenate([left, right[extra]])
+    order = np.argsort(source, kind='stable')
+    return source[order], individual[order]
+
+
+class ObservationTable:
+    """Column-oriented copy of the observation list.
+
+    Each integer field of Observation is stored as a numpy array, so
+    aggregations over the whole archive can use vectorized operations
+    instead of Python loops. Row i corresponds to observations[i].
+    """
+
+    def __init__(self, observations: List[Any]):
+        self.observations = observations
+        self.size = len(observations)
+        self.columns: Dict[str, np.ndarray] = {}
+        for field in OBSERVATION_FIELDS:
+            self.columns[field] = np.fromiter(
+                (getattr(obs, field) for obs in observations), dtype=np.int16, count=self.size
+            )
+        jj = self.columns['JJ'].astype(np.int32)
+        # 2-digit year: < 50 = 20xx, >= 50 = 19xx (HALO key standard)
+        self.columns['year4'] = np.where(jj < 50, 2000 + jj, 1900 + jj)
+        self.columns['day_key'] = day_key(
+            self.columns['year4'],
+            self.columns['MM'].astype(np.int32),
+            self.columns['TT'].astype(np.int32)
+        )
+
+        # Partition by observer: rows of each KK ordered by date (file order within a day)
+        order = np.lexsort((np.arange(self.size), self.columns['day_key'], self.columns['KK']))
+        self.observers, starts = np.unique(self.columns['KK'][order], return_index=True)
+        self._partition_order = order
+        self._partition_bounds = np.append(starts, self.size)
+        self._partition_days = self.columns['day_key'][order]
+        self._row_index: Optional[Dict[int, int]] = None
+        self._subsets: List[Tuple[List[Any], np.ndarray]] = []
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def rows_of(self, observations: List[Any]) -> Optional[np.ndarray]:
+        """Row indices of the given Observation objects.
+
+        Returns None if any of them is not part of this table (e.g. a list
+        read from a file instead of the loaded observations).
+        """
+        if observations is self.observations:
+            return np.arange(self.size)
+        for subset, rows in reversed(self._subsets):
+            if subset is observations and len(observations) == rows.size:
+                return rows
+        if self._row_index is None:
+            self._row_index = {id(obs): i for i, obs in enumerate(self.observations)}
+        rows = np.fromiter(
+            (self._row_index.get(id(obs), -1) for obs in observations), dtype=np.int64, count=len(observations)
+        )
+        if rows.size and rows.min() < 0:
+            return None
+        return rows
+
+    def subset(self, rows: np.ndarray) -> List[Any]:
+        """Observations of the given rows, as a new list.
+
+        The rows of the most recent subsets are remembered, so rows_of() of
+        the returned list needs no lookup.
+        """
+        observations = [self.observations[i] for i in rows]
+        self._subsets = self._subsets[1 - SUBSET_MEMORY:] + [(observations, rows)]
+        return observations
+
+    def observer_rows(self, kk: int, first_day: Optional[int] = None, last_day: Optional[int] = None) -> np.ndarray:
+        """Row indices of one observer, ordered by date.
+
+        Args:
+            kk: Observer number
+            first_day: First day key (inclusive), None = from the start
+            last_day: Last day key (inclusive), None = up to the end
+
+        Returns:
+            Row indices into observations / the columns
+        """
+        i = int(np.searchsorted(self.observers, kk))
+        if i >= self.observers.size or self.observers[i] != kk:
+            return np.zeros(0, dtype=np.int64)
+        lo, hi = int(self._partition_bounds[i]), int(self._partition_bounds[i + 1])
+        days = self._partition_days[lo:hi]
+        if first_day is not None:
+            lo += int(np.searchsorted(days, first_day, 'left'))
+        if last_day is not None:
+            hi -= days.size - int(np.searchsorted(days, last_day, 'right'))
+        return self._partition_order[lo:max(lo, hi)]
+
+    def observer_observations(self, kk: int, first_day: Optional[int] = None, last_day: Optional[int] = None) -> List[Any]:
+        """Observations of one observer, ordered by date (see observer_rows)."""
+        return [self.observations[i] for i in self.observer_rows(kk, first_day, last_day)]
+
+    def month_rows(self, jj: int, mm: int) -> np.ndarray:
+        """Row indices of the observations of a month (2-digit year), in file order."""
+        return np.flatnonzero((self.columns['JJ'] == jj) & (self.columns['MM'] == mm))
+
+    def year_month_rows(self, jj: int) -> Dict[int, np.ndarray]:
+        """Row indices of the observations of every month 1-12 of a year (2-digit year), in file order.
+
+        One scan of the table, giving the same rows as month_rows() per month.
+        """
+        rows = np.flatnonzero(self.columns['JJ'] == jj)
+        months = self.columns['MM'][rows]
+        order = np.argsort(months, kind='stable')
+        rows, months = rows[order], months[order]
+        bounds = np.searchsorted(months, np.arange(1, 14))
+        return {mm: rows[bounds[mm - 1]:bounds[mm]] for mm in range(1, 13)}
+
+    def month_days(self, year: int, month: int) -> Tuple[int, int]:
+        """First and last day key of a month (4-digit year)."""
+        first = day_key(year, month, 1)
+        return first, first + 30
+
+
+def get_observation_table(config: Dict[str, Any]) -> ObservationTable:
+    """Columnar table for the currently loaded observations (cached per generation)."""
+    return cached(
+        config, 'observation_table', observations_key(config),
+        lambda: ObservationTable(config.get('OBSERVATIONS') or [])
+    )
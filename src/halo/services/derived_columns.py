@@ -0,0 +1,156 @@
+"""
+Derived columns: values computed from the fields of an observation.
+
+Analyses filter and group observations by values that are not stored in
+the record itself, e.g. the hour in local time or the octants of the
+sectors string. Each such value is registered here as a named column and
+computed for a whole ObservationTable on first use. The result is kept
+as a compact numpy array in the table's columns, so it lives exactly as
+long as the table: the table is rebuilt whenever the observation list
+changes (see dataset), which also drops all derived columns.
+
+Registered columns:
+- year4: 4-digit year (2-digit years < 50 = 20xx)
+- local_hour: hour ZS converted from CET to the local time of region GG
+- cet_minutes: time of day in minutes (ZS * 60 + ZM, CET)
+- sector_mask: octants a-h of the sectors string as 8-bit mask (bit 0 = a)
+- ee_parts: individual halo types of EE, shape (n, 2); the second
+  column is -1 unless EE is a combined type (e.g. EE 04 -> 02, 03)
+- c_parts: cirrus types contained in C as 3-bit mask (bit 0 = C1, bit 1 =
+  C2, bit 2 = C3), e.g. C7 -> 0b111; 0 for values outside 1-7
+- sort_key: rank of the observation in file order (spaeter: J, M, T,
+  ZS, ZM, K, E, GG); equal keys get equal ranks
+"""
+
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from ..models.constants import COMBINED_TO_INDIVIDUAL_HALOS
+from .dataset import ObservationTable
+
+
+DERIVED_COLUMNS: Dict[str, Callable[[ObservationTable], np.ndarray]] = {}
+
+SECTOR_LETTERS = 'abcdefgh'
+
+ALL_SECTORS = 0xFF
+
+# Cirrus types as combinations of Ci (C1), Cc (C2) and Cs (C3)
+CIRRUS_PARTS = {1: 0b001, 2: 0b010, 3: 0b100, 4: 0b011, 5: 0b101, 6: 0b110, 7: 0b111}
+
+
+def derived_column(name: str) -> Callable:
+    """Register the builder of a derived column."""
+    def register(builder: Callable[[ObservationTable], np.ndarray]) -> Callable:
+        DERIVED_COLUMNS[name] = builder
+        return builder
+    return register
+
+
+def get_column(table: ObservationTable, name: str) -> np.ndarray:
+    """Derived (or stored) column of a table, built on first use."""
+    column = table.columns.get(name)
+    if column is None:
+        column = table.columns[name] = DERIVED_COLUMNS[name](table)
+    return column
+
+
+def timezone_offset(region: int) -> int:
+    """Hours to add to CET to get the (rough) local time of a region (GG).
+
+    Europe and other regions (1-14, 35-39) are taken as CET.
+    """
+    if 15 <= region <= 20:  # West/Central Asia: roughly UTC+5
+        return 4
+    if 21 <= region <= 26:  # East Asia: roughly UTC+8
+        return 7
+    if 27 <= region <= 30:  # North America: roughly UTC-6
+        return -6
+    if 31 <= region <= 34:  # South America: roughly UTC-3
+        return -4
+    return 0
+
+
+def sector_mask(sectors: str) -> int:
+    """Octants a-h found in a sectors string as 8-bit mask (bit 0 = a)."""
+    mask = 0
+    for ch in (sectors or '').lower():
+        if 'a' <= ch <= 'h':
+            mask |= 1 << (ord(ch) - ord('a'))
+    return mask
+
+
+def sector_letters(mask: int) -> List[str]:
+    """Octant letters of a sector mask, in alphabetical order."""
+    return [letter for i, letter in enumerate(SECTOR_LETTERS) if mask >> i & 1]
+
+
+def cirrus_types(mask: int) -> List[int]:
+    """Cirrus types (1-3) of a c_parts mask."""
+    return [c for c in (1, 2, 3) if mask >> (c - 1) & 1]
+
+
+@derived_column('year4')
+def _year4(table: ObservationTable) -> np.ndarray:
+    return table['year4']
+
+
+@derived_column('local_hour')
+def _local_hour(table: ObservationTable) -> np.ndarray:
+    gg = table['GG'].astype(np.int16)
+    offset = np.zeros(table.size, dtype=np.int16)
+    for lo, hi in ((15, 20), (21, 26), (27, 30), (31, 34)):
+        offset[(gg >= lo) & (gg <= hi)] = timezone_offset(lo)
+    return ((table['ZS'] + offset) % 24).astype(np.int8)
+
+
+@derived_column('cet_minutes')
+def _cet_minutes(table: ObservationTable) -> np.ndarray:
+    return table['ZS'].astype(np.int32) * 60 + table['ZM']
+
+
+@derived_column('sector_mask')
+def _sector_mask(table: ObservationTable) -> np.ndarray:
+    masks: Dict[Any, int] = {}
+    column = np.zeros(table.size, dtype=np.uint8)
+    for i, obs in enumerate(table.observations):
+        sectors = getattr(obs, 'sectors', '')
+        if sectors:
+            mask = masks.get(sectors)
+            if mask is None:
+                mask = masks[sectors] = sector_mask(sectors)
+            column[i] = mask
+    return column
+
+
+@derived_column('ee_parts')
+def _ee_parts(table: ObservationTable) -> np.ndarray:
+    ee = table['EE']
+    parts = np.stack([ee, np.full(table.size, -1, dtype=np.int16)], axis=1)
+    for code, (left, right) in COMBINED_TO_INDIVIDUAL_HALOS.items():
+        hit = ee == code
+        parts[hit] = (left, right)
+    return parts
+
+
+@derived_column('c_parts')
+def _c_parts(table: ObservationTable) -> np.ndarray:
+    lookup = np.zeros(8, dtype=np.uint8)
+    for c, mask in CIRRUS_PARTS.items():
+        lookup[c] = mask
+    c = table['C']
+    return np.where((c >= 1) & (c <= 7), lookup[np.clip(c, 0, 7)], 0).astype(np.uint8)
+
+
+@derived_column('sort_key')
+def _sort_key(table: ObservationTable) -> np.ndarray:
+    keys = [table[name] for name in ('GG', 'EE', 'KK', 'ZM', 'ZS', 'TT', 'MM')] + [table['year4']]
+    order = np.lexsort(keys)
+    if not table.size:
+        return np.zeros(0, dtype=np.int32)
+    stacked = np.stack([k[order] for k in keys], axis=1)
+    new_key = np.r_[True, (stacked[1:] != stacked[:-1]).any(axis=1)]
+    rank = np.empty(table.size, dtype=np.int32)
+    rank[order] = np.cumsum(new_key) - 1
+    return rank
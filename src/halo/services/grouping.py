@@ -0,0 +1,238 @@
+"""
+Array-based group-by for the analysis parameters.
+
+Every analysis parameter is expanded into (position, key) entries: one
+entry per observation for plain parameters, several for split parameters
+(C4-C7 into their cirrus types, combined halo types into left and right,
+sectors into octants, HO and HU of light pillars) and none where the
+observation does not count. The keys are mapped to integer codes and
+counted with np.bincount; cross-tabulations and pivot cubes count every
+combination of the entries of an observation as one cell of an
+n-dimensional table.
+
+Keys are the display keys of the analysis ('1', '2003', 'a', ...), with
+'keine Angabe' for values that are not observed or not calculable.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .dataset import OBSERVATION_FIELDS, ObservationTable
+from .derived_columns import ALL_SECTORS, SECTOR_LETTERS, get_column
+from .query import Resolver, computed_column, time_column
+
+
+NOT_OBSERVED = 'keine Angabe'
+
+# Integer key standing for NOT_OBSERVED
+MISSING = np.iinfo(np.int64).min
+
+# Tables with more cells are counted with np.unique instead of np.bincount
+DENSE_CELL_LIMIT = 1 << 22
+
+
+def _sorted_by_position(position: np.ndarray, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(position, kind='stable')
+    return position[order], keys[order]
+
+
+def parameter_keys(
+    observations: List[Any],
+    table: ObservationTable,
+    rows: np.ndarray,
+    param_name: Any,
+    params: dict,
+    prefix: str,
+    resolver: Resolver,
+    cross: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Group keys of an analysis parameter.
+
+    Args:
+        observations: Observations to group
+        table: ObservationTable containing them
+        rows: Table row of every observation
+        param_name: Parameter (ZZ, SH, EE, SE, ...)
+        params: Analysis request parameters ({prefix}_timezone, splits, sh_type, ...)
+        prefix: Prefix of the parameter options ('param1', 'param2', ...)
+        resolver: Computes SH/MH/MP values (see query)
+        cross: Keys for a cross-tabulation: JJ stays 2-digit and light
+            pillars without heights count as not observed
+
+    Returns:
+        Tuple (position, keys) sorted by position; keys are integers
+        (MISSING = not observed) or strings
+    """
+    n = len(observations)
+    index = np.arange(n)
+
+    def column(name):
+        return get_column(table, name)[rows].astype(np.int64)
+
+    if param_name == 'SE':
+        # Complete halo (V=2): all octants, otherwise the listed ones
+        masks = np.where(column('V') == 2, ALL_SECTORS, column('sector_mask')).astype(np.uint8)
+        position, bit = np.nonzero(np.unpackbits(masks[:, None], axis=1, bitorder='little'))
+        return position, np.array(list(SECTOR_LETTERS))[bit]
+
+    if param_name == 'HO_HU':
+        ho, hu = column('HO'), column('HU')
+        has_ho, has_hu = ho >= 0, hu >= 0
+        position = [index[has_ho], index[has_hu]]
+        keys = [ho[has_ho], hu[has_hu]]
+        if cross:
+            neither = index[~has_ho & ~has_hu]
+            position.append(neither)
+            keys.append(np.full(neither.size, MISSING, dtype=np.int64))
+        return _sorted_by_position(np.concatenate(position), np.concatenate(keys))
+
+    if param_name == 'C' and params.get(f'{prefix}_c_split'):
+        # C4-C7 count as each of their cirrus types
+        c = column('C')
+        parts = np.unpackbits(column('c_parts').astype(np.uint8)[:, None], axis=1, bitorder='little')[:, :3]
+        combined = parts.sum(axis=1) >= 2
+        split_position, component = np.nonzero(parts[combined])
+        return _sorted_by_position(
+            np.concatenate([index[~combined], index[combined][split_position]]),
+            np.concatenate([c[~combined], component + 1])
+        )
+
+    if param_name == 'EE' and params.get(f'{prefix}_ee_split'):
+        # Combined halo types count as left and right type
+        parts = get_column(table, 'ee_parts')[rows].astype(np.int64)
+        combined = parts[:, 1] >= 0
+        return _sorted_by_position(
+            np.concatenate([index, index[combined]]),
+            np.concatenate([parts[:, 0], parts[combined, 1]])
+        )
+
+    if param_name in ('SH', 'MH', 'MP'):
+        values = resolver(observations, computed_column(param_name, params))
+        keys = np.fromiter((MISSING if v is None else v for v in values), dtype=np.int64, count=n)
+    elif param_name == 'ZZ':
+        keys = column(time_column(params, prefix))
+    elif param_name == 'JJ':
+        keys = column('JJ' if cross else 'year4')
+    elif param_name in OBSERVATION_FIELDS:
+        keys = column(param_name)
+    else:
+        # Fields without a column: keys from the records
+        values = [getattr(obs, param_name, None) for obs in observations]
+        keys = np.array([NOT_OBSERVED if v is None else str(v) for v in values], dtype=str)
+    return index, keys
+
+
+def _encode(keys: np.ndarray) -> Tuple[np.ndarray, List[str]]:
+    """Integer codes of the keys and the key string of every code."""
+    uniques, codes = np.unique(keys, return_inverse=True)
+    if keys.dtype.kind in 'iu':
+        labels = [NOT_OBSERVED if v == MISSING else str(v) for v in uniques.tolist()]
+    else:
+        labels = uniques.tolist()
+    return codes.reshape(-1), labels
+
+
+def count_keys(keys: np.ndarray) -> Dict[str, int]:
+    """Number of entries per key (only keys that occur)."""
+    codes, labels = _encode(keys)
+    counts = np.bincount(codes, minlength=len(labels))
+    return {label: int(count) for label, count in zip(labels, counts.tolist()) if count}
+
+
+def count_cells(
+    size: int,
+    entries: Sequence[Tuple[np.ndarray, np.ndarray]],
+    valid: Optional[np.ndarray] = None
+) -> Tuple[List[List[str]], np.ndarray, np.ndarray]:
+    """Count the key combinations of several parameters.
+
+    Every combination of one entry per parameter of the same observation
+    is counted once (the cartesian product of the entries).
+
+    Args:
+        size: Number of observations
+        entries: (position, keys) of every parameter, sorted by position
+        valid: Observations to count (all if None)
+
+    Returns:
+        Tuple (labels, cells, counts): the key strings of every parameter,
+        and for every combination that occurs its flat (C order) index into
+        the labels of all parameters and its count
+    """
+    labels = []
+    cell_position = np.arange(size)
+    cells = np.zeros(size, dtype=np.int64)
+    if valid is not None:
+        cell_position, cells = cell_position[valid], cells[valid]
+    for position, keys in entries:
+        if valid is not None:
+            keep = valid[position]
+            position, keys = position[keep], keys[keep]
+        codes, dim_labels = _encode(keys)
+        labels.append(dim_labels)
+
+        # Pair every combination so far with the entries of its observation
+        per_observation = np.bincount(position, minlength=size)
+        first = np.cumsum(per_observation) - per_observation
+        repeats = per_observation[cell_position]
+        offsets = np.arange(int(repeats.sum())) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        cell_position = np.repeat(cell_position, repeats)
+        cells = np.repeat(cells, repeats) * len(dim_labels) + codes[first[cell_position] + offsets]
+
+    total = int(np.prod([len(dim_labels) for dim_labels in labels], dtype=np.int64))
+    if total <= DENSE_CELL_LIMIT:
+        counts = np.bincount(cells, minlength=total)
+        cells = np.flatnonzero(counts)
+        counts = counts[cells]
+    else:
+        cells, counts = np.unique(cells, return_counts=True)
+    return labels, cells, counts
+
+
+def cross_count_keys(
+    size: int,
+    position1: np.ndarray,
+    keys1: np.ndarray,
+    position2: np.ndarray,
+    keys2: np.ndarray,
+    valid: Optional[np.ndarray] = None
+) -> Dict[str, Dict[str, int]]:
+    """Cross-tabulation of two parameters (only combinations that occur).
+
+    Args:
+        size: Number of observations
+        position1, keys1: Entries of param1 (sorted by position)
+        position2, keys2: Entries of param2 (sorted by position)
+        valid: Observations to count (all if None)
+
+    Returns:
+        Nested dict {param1_key: {param2_key: count}}
+    """
+    (labels1, labels2), cells, counts = count_cells(
+        size, [(position1, keys1), (position2, keys2)], valid
+    )
+    width = len(labels2)
+    result: Dict[str, Dict[str, int]] = {}
+    for cell, count in zip(cells.tolist(), counts.tolist()):
+        result.setdefault(labels1[cell // width], {})[labels2[cell % width]] = count
+    return result
+
+
+def sparse_cross_tab(table: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+    """Sparse form of a cross-tabulation: row and column keys plus the non-zero cells.
+
+    Returns:
+        Dict with 'rows', 'columns' (keys in table order) and 'cells'
+        ([row index, column index, count] for every count > 0)
+    """
+    columns: Dict[str, int] = {}
+    for inner in table.values():
+        for key in inner:
+            columns.setdefault(key, len(columns))
+    cells = []
+    for i, inner in enumerate(table.values()):
+        for key, count in inner.items():
+            if count:
+                cells.append([i, columns[key], count])
+    return {'rows': list(table), 'columns': list(columns), 'cells': cells}
@@ -0,0 +1,203 @@
+"""
+Background jobs for long-running requests.
+
+SH cross-tabs over the whole archive, annual statistics and bulk reports
+can take longer than a browser waits for a response. They are submitted
+as jobs instead: a job runs on a bounded thread pool, reports its progress
+(and partial results) while running, and its result is kept in a bounded
+store until it is fetched or evicted.
+
+Jobs run in threads rather than processes because they work on the
+in-memory observation list and the cached tables of the app (see dataset).
+
+Code running in a job reports its progress with report_progress(); outside
+a job this is a no-op, so endpoints can call it unconditionally. A
+cancelled job stops at its next report_progress() call.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+
+DEFAULT_WORKERS = 2
+
+# Jobs kept in the store (finished jobs are evicted oldest first)
+DEFAULT_STORE_SIZE = 50
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(BaseException):
+    """Raised by report_progress() in a job that was cancelled.
+
+    Derived from BaseException so the generic exception handlers of the
+    endpoints do not turn a cancellation into an error response.
+    """
+
+
+class JobStoreFull(Exception):
+    """Raised by JobManager.submit() when the store holds only unfinished jobs."""
+
+
+class Job:
+    """A submitted job: status, progress and result."""
+
+    def __init__(self, kind: str, spec: Any):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.spec = spec
+        self.status = QUEUED
+        self.done = 0
+        self.total: Optional[int] = None
+        self.partial: Any = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.cancel_requested = False
+        self.future: Optional[Future] = None
+
+    def info(self) -> Dict[str, Any]:
+        """Status of the job as dict (without the result)."""
+        info = {
+            'id': self.id,
+            'type': self.kind,
+            'status': self.status,
+            'done': self.done,
+            'total': self.total,
+            'progress': self.done / self.total if self.total else None,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'error': self.error
+        }
+        if self.partial is not None and self.status != DONE:
+            info['partial'] = self.partial
+        return info
+
+
+_current = threading.local()
+
+
+def report_progress(done: int, total: Optional[int] = None, partial: Any = None) -> None:
+    """Report the progress of the current job (no-op outside a job).
+
+    Args:
+        done: Steps done
+        total: Total number of steps (None if unknown)
+        partial: Partial result so far (optional)
+
+    Raises:
+        JobCancelled: If the job was cancelled
+    """
+    job = getattr(_current, 'job', None)
+    if job is None:
+        return
+    if job.cancel_requested:
+        raise JobCancelled()
+    job.done, job.total = done, total
+    if partial is not None:
+        job.partial = partial
+
+
+class JobManager:
+    """Thread pool running the jobs and the store of submitted jobs."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, store_size: int = DEFAULT_STORE_SIZE):
+        self.store_size = store_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='halo-job')
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, spec: Any, run: Callable[[], Any]) -> Job:
+        """Queue a job; run() computes its result in a worker thread.
+
+        Raises:
+            JobStoreFull: If the store has no room for another unfinished job
+        """
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED]
+            for job_id in finished[:max(len(self._jobs) - self.store_size + 1, 0)]:
+                del self._jobs[job_id]
+            if len(self._jobs) >= self.store_size:
+                raise JobStoreFull(f'Too many unfinished jobs (maximum {self.store_size})')
+            job = Job(kind, spec)
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job, run)
+        return job
+
+    def _run(self, job: Job, run: Callable[[], Any]) -> None:
+        if job.cancel_requested:
+            job.status, job.finished = CANCELLED, time.time()
+            return
+        job.status, job.started = RUNNING, time.time()
+        _current.job = job
+        try:
+            job.result = run()
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            _current.job = None
+            job.finished = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Job with the given id, None if unknown or evicted."""
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Job]:
+        """All jobs in the store, oldest first."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued or running job; a finished job is removed from the store.
+
+        A running job stops at its next report_progress() call.
+
+        Returns:
+            The job, None if unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status in FINISHED:
+                del self._jobs[job_id]
+                return job
+            job.cancel_requested = True
+        if job.future is not None and job.future.cancel():
+            job.status, job.finished = CANCELLED, time.time()
+        return job
+
+
+_manager_lock = threading.Lock()
+
+
+def get_job_manager(config: Dict[str, Any]) -> JobManager:
+    """Job manager of the app, created on first use.
+
+    The pool size and store size are taken from JOB_WORKERS and
+    JOB_STORE_SIZE in the app config.
+    """
+    with _manager_lock:
+        manager = config.get('JOB_MANAGER')
+        if manager is None:
+            manager = config['JOB_MANAGER'] = JobManager(
+                config.get('JOB_WORKERS', DEFAULT_WORKERS),
+                config.get('JOB_STORE_SIZE', DEFAULT_STORE_SIZE)
+            )
+    return manager
@@ -0,0 +1,250 @@
+"""
+Observer registry: typed, indexed view of the observer records (halobeo.csv).
+
+An observer has one record per site period; the record valid for a month
+is the latest one whose "seit" (valid since, MM/YY) is not after that
+month. The registry parses every record once into an ObserverSite with
+numeric fields and keeps the sites of each observer sorted by seit, so
+these as-of lookups are binary searches instead of scans over the string
+records.
+
+Seit and reference months are compared as YYYYMM integers, with 2-digit
+years 00-49 meaning 2000-2049.
+
+The registry is built once per observer generation (see dataset). Endpoints
+modifying the records of a single observer patch it via observer_updated().
+
+Values derived from the sites of an observer, such as the solar altitudes
+of its observations, are memoized per KK in the registry and dropped
+together with the sites of that observer. The memo keys cover every
+observation field the value depends on, so edited observations simply miss;
+each memo keeps its MEMO_SIZE most recently used values, so memos do not
+grow without limit across file loads.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .dataset import cached, observers_changed, observers_key
+
+
+def full_year(jj: int) -> int:
+    """4-digit year for a 2-digit year (< 50 = 20xx)."""
+    return jj + 2000 if jj < 50 else jj + 1900
+
+
+def month_value(jj: int, mm: int) -> int:
+    """Comparable YYYYMM value of a 2-digit year and month."""
+    return full_year(jj) * 100 + mm
+
+
+def seit_value(seit: str) -> int:
+    """Comparable YYYYMM value of a seit field ('MM/YY'), 0 if it cannot be parsed."""
+    try:
+        parts = seit.split('/')
+        if len(parts) == 2:
+            return month_value(int(parts[1]), int(parts[0]))
+    except (ValueError, AttributeError):
+        pass
+    return 0
+
+
+def _int(value: str) -> int:
+    try:
+        return int(value) if value else 0
+    except (ValueError, TypeError):
+        return 0
+
+
+def _coordinate(degrees: str, minutes: str, negative: bool) -> float:
+    value = _int(degrees) + _int(minutes) / 60.0
+    return -value if negative else value
+
+
+@dataclass
+class ObserverSite:
+    """One observer record (site period) from halobeo.csv."""
+    kk: str
+    vname: str
+    nname: str
+    seit: int  # YYYYMM, 0 if missing or invalid
+    active: bool
+    home_site: str
+    home_region: int
+    home_longitude: float
+    home_latitude: float
+    alt_site: str
+    alt_region: int
+    alt_longitude: float
+    alt_latitude: float
+    record: List[str] = field(repr=False)
+
+    @classmethod
+    def from_record(cls, record: List[str]) -> 'ObserverSite':
+        row = list(record) + [''] * (21 - len(record))
+        return cls(
+            kk=row[0],
+            vname=row[1],
+            nname=row[2],
+            seit=seit_value(row[3]),
+            active=_int(row[4]) == 1,
+            home_site=row[5],
+            home_region=_int(row[6]),
+            home_longitude=_coordinate(row[7], row[8], row[9] == 'W'),
+            home_latitude=_coordinate(row[10], row[11], row[12] == 'S'),
+            alt_site=row[13],
+            alt_region=_int(row[14]),
+            alt_longitude=_coordinate(row[15], row[16], row[17] == 'W'),
+            alt_latitude=_coordinate(row[18], row[19], row[20] == 'S'),
+            record=record
+        )
+
+    def coordinates(self, g: int) -> Tuple[float, float]:
+        """(longitude, latitude) for observation location g (0 = home, 2 = secondary site)."""
+        if g == 0:
+            return self.home_longitude, self.home_latitude
+        if g == 2:
+            return self.alt_longitude, self.alt_latitude
+        return 0.0, 0.0
+
+
+# Values kept per memo (observer and kind of value)
+MEMO_SIZE = 20000
+
+
+class LruMemo(OrderedDict):
+    """Dict keeping only its size most recently used entries."""
+
+    def __init__(self, size: int):
+        super().__init__()
+        self.size = size
+
+    def __getitem__(self, key: Any) -> Any:
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.size:
+            self.popitem(last=False)
+
+
+class ObserverRegistry:
+    """Observer sites per KK, sorted by seit."""
+
+    def __init__(self, records: Iterable[List[str]]):
+        self._sites: Dict[str, List[ObserverSite]] = {}
+        self._seits: Dict[str, List[int]] = {}
+        self._memos: Dict[str, Dict[str, LruMemo]] = {}
+        grouped: Dict[str, List[List[str]]] = {}
+        for record in records:
+            if record:
+                grouped.setdefault(record[0], []).append(record)
+        for kk, kk_records in grouped.items():
+            self.set_observer(kk, kk_records)
+
+    def set_observer(self, kk: str, records: Iterable[List[str]]) -> None:
+        """Replace all sites of one observer (no records = remove the observer)."""
+        # Stable sort: records with equal seit keep their file order
+        sites = sorted((ObserverSite.from_record(r) for r in records), key=lambda s: s.seit)
+        self._memos.pop(kk, None)
+        if sites:
+            self._sites[kk] = sites
+            self._seits[kk] = [s.seit for s in sites]
+        else:
+            self._sites.pop(kk, None)
+            self._seits.pop(kk, None)
+
+    def memo(self, kk: str, name: str) -> LruMemo:
+        """Memo dict for values of observer kk that depend on its sites.
+
+        The dict is dropped whenever the sites of kk are replaced.
+        """
+        memos = self._memos.setdefault(kk, {})
+        memo = memos.get(name)
+        if memo is None:
+            memo = memos[name] = LruMemo(MEMO_SIZE)
+        return memo
+
+    def observers(self) -> List[str]:
+        """All KK values, sorted."""
+        return sorted(self._sites)
+
+    def sites(self, kk: str) -> List[ObserverSite]:
+        """All sites of an observer, sorted by seit."""
+        return list(self._sites.get(kk, ()))
+
+    def as_of(self, kk: str, month: int) -> Optional[ObserverSite]:
+        """Site of an observer valid in month (YYYYMM), None if there is none.
+
+        Of several records with the same seit the first one in the file wins.
+        """
+        seits = self._seits.get(kk)
+        if not seits:
+            return None
+        index = bisect_right(seits, month) - 1
+        if index < 0:
+            return None
+        return self._sites[kk][bisect_left(seits, seits[index])]
+
+    def latest(self, kk: str) -> Optional[ObserverSite]:
+        """Most recent site of an observer."""
+        seits = self._seits.get(kk)
+        if not seits:
+            return None
+        return self._sites[kk][bisect_left(seits, seits[-1])]
+
+    def active_observers(self, month: int, active_only: bool = False) -> Dict[str, List[str]]:
+        """Record valid in month (YYYYMM) for every observer.
+
+        Args:
+            month: Reference month as YYYYMM
+            active_only: Only consider records marked as active (aktiv == 1)
+
+        Returns:
+            Dict {KK: observer_record}
+        """
+        result = {}
+        for kk, seits in self._seits.items():
+            hi = bisect_right(seits, month)
+            if not hi:
+                continue
+            if not active_only:
+                result[kk] = self._sites[kk][bisect_left(seits, seits[hi - 1])].record
+                continue
+            best = None
+            for site in self._sites[kk][:hi]:
+                if site.active and (best is None or site.seit > best.seit):
+                    best = site
+            if best is not None:
+                result[kk] = best.record
+        return result
+
+
+def get_observer_registry(config: Dict[str, Any]) -> ObserverRegistry:
+    """Observer registry of the current observer records, built once per generation."""
+    return cached(
+        config, 'observer_registry', observers_key(config),
+        lambda: ObserverRegistry(config.get('OBSERVERS') or [])
+    )
+
+
+def observer_updated(config: Dict[str, Any], kk: str) -> None:
+    """Mark the observer records as modified after changes to a single observer.
+
+    If the registry was built for the previous generation, only the sites
+    of kk are re-parsed instead of rebuilding it.
+    """
+    cache = config.setdefault('DATASET_CACHE', {})
+    entry = cache.get('observer_registry')
+    current = entry is not None and entry[0][0] == config.get('OBSERVERS_GENERATION', 0)
+    observers_changed(config)
+    if not current:
+        return
+    registry = entry[1]
+    registry.set_observer(kk, [r for r in config.get('OBSERVERS') or [] if r and r[0] == kk])
+    cache['observer_registry'] = (observers_key(config), registry)
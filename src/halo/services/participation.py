@@ -0,0 +1,103 @@
+"""
+Observer participation: observer × year matrices over the whole archive.
+
+Counts are built in one grouped pass over the columnar observation table:
+- solar_ee: individual solar halo types, counted once per observer and day
+  (as "total solar" in the monthly statistics)
+- halo_days: days with solar or lunar halos
+- active_months: months with at least one observation
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+from .dataset import ObservationTable, split_halo_types
+
+
+PARTICIPATION_METRICS = ('solar_ee', 'halo_days', 'active_months')
+
+
+class ParticipationMatrix:
+    """Observer × year matrices of the participation metrics."""
+
+    def __init__(self, table: ObservationTable):
+        kk = table['KK'].astype(np.int64)
+        year4 = table['year4'].astype(np.int64)
+        day = table['day_key'].astype(np.int64)
+        o = table['O']
+
+        self.observers = np.unique(kk)
+        if table.size:
+            self.years = np.arange(int(year4.min()), int(year4.max()) + 1)
+        else:
+            self.years = np.zeros(0, dtype=np.int64)
+        n_kk, n_years = self.observers.size, self.years.size
+        row = np.searchsorted(self.observers, kk)
+        col = year4 - (self.years[0] if n_years else 0)
+        cell = row * n_years + col
+        size = n_kk * n_years
+
+        day_slots = int(day.max()) + 1 if table.size else 1
+
+        # Unique (cell, day, individual EE) of solar halos
+        solar = np.flatnonzero(o == 1)
+        source, ee = split_halo_types(table['EE'][solar])
+        rows = solar[source]
+        valid = (ee >= 0) & (ee < 100)
+        rows, ee = rows[valid], ee[valid].astype(np.int64)
+        reports = np.unique((cell[rows] * day_slots + day[rows]) * 100 + ee)
+        solar_ee = np.bincount(reports // 100 // day_slots, minlength=size)
+
+        # Days with solar or lunar halos per cell
+        halo = np.flatnonzero((o == 1) | (o == 2))
+        halo_days = np.unique(cell[halo] * day_slots + day[halo])
+        halo_days = np.bincount(halo_days // day_slots, minlength=size)
+
+        # Months with any observation per cell
+        month = year4 * 12 + table['MM'].astype(np.int64)
+        month_slots = int(month.max()) + 1 if table.size else 1
+        months = np.unique(cell * month_slots + month)
+        active_months = np.bincount(months // month_slots, minlength=size)
+
+        self.matrices = {
+            'solar_ee': solar_ee.reshape(n_kk, n_years),
+            'halo_days': halo_days.reshape(n_kk, n_years),
+            'active_months': active_months.reshape(n_kk, n_years)
+        }
+
+    def select(
+        self,
+        observers: Optional[Iterable[int]] = None,
+        first_year: Optional[int] = None,
+        last_year: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Sub-matrices for the given observers and year range.
+
+        Args:
+            observers: Observers (KK) to include, None = all observers with data
+            first_year: First 4-digit year, None = first year with data
+            last_year: Last 4-digit year, None = last year with data
+
+        Returns:
+            Dict with observer and year labels, one matrix per metric
+            (rows = observers, columns = years) and per-observer totals
+        """
+        kk_mask = np.ones(self.observers.size, dtype=bool)
+        if observers is not None:
+            kk_mask &= np.isin(self.observers, list(observers))
+        year_mask = np.ones(self.years.size, dtype=bool)
+        if first_year is not None:
+            year_mask &= self.years >= first_year
+        if last_year is not None:
+            year_mask &= self.years <= last_year
+
+        data = {
+            'observers': [str(int(k)).zfill(2) for k in self.observers[kk_mask]],
+            'years': self.years[year_mask].tolist()
+        }
+        for metric in PARTICIPATION_METRICS:
+            matrix = self.matrices[metric][np.ix_(kk_mask, year_mask)]
+            data[metric] = matrix.tolist()
+            data[f'{metric}_totals'] = matrix.sum(axis=1).tolist()
+        return data
@@ -0,0 +1,179 @@
+"""
+Halo phenomena index: halo types seen per observer, day and object.
+
+Every (date, KK, O) group of observations is condensed into a 128-bit mask
+of the reported halo types (two uint64 words), built once per dataset
+generation. Searches over the whole archive ("5 or more halo types",
+"46° halo together with Parry arc") then become bitwise operations on
+these masks instead of nested loops over the observations.
+
+The grouping follows the phenomena list of the annual statistics:
+- EE 04 (both 22° parhelia) counts as EE 02 and EE 03
+- the observations of a group are taken in EE order: GG is that of the
+  lowest halo type, the time that of the observations up to the 5th
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .dataset import ObservationTable
+
+
+# Bit used for halo types outside 0-126 (e.g. -1 = not specified)
+OTHER_BIT = 127
+
+DEFAULT_MIN_TYPES = 5
+
+# Time of a phenomenon is frozen once this many halo types are reached
+_TIME_FREEZE = 6
+
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Number of set bits of every uint64 value."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).astype(np.int64)
+    as_bytes = np.ascontiguousarray(words, dtype=np.uint64).view(np.uint8)
+    return _POPCOUNT_TABLE[as_bytes].reshape(-1, 8).sum(axis=1, dtype=np.int64)
+
+
+def type_mask(halo_types: Iterable[int]) -> np.ndarray:
+    """128-bit mask (two uint64 words) of the given halo types."""
+    mask = np.zeros(2, dtype=np.uint64)
+    for ee in halo_types:
+        bit = ee if 0 <= ee < OTHER_BIT else OTHER_BIT
+        mask[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+    return mask
+
+
+def _row_bits(ee: np.ndarray) -> np.ndarray:
+    """Bit position of every halo type (OTHER_BIT outside 0-126)."""
+    ee = ee.astype(np.int64)
+    return np.where((ee >= 0) & (ee < OTHER_BIT), ee, OTHER_BIT)
+
+
+class PhenomenaIndex:
+    """Halo type masks per (date, KK, O), sorted by date."""
+
+    def __init__(self, table: ObservationTable):
+        n = table.size
+        day = table['day_key'].astype(np.int64)
+        kk = table['KK'].astype(np.int64)
+        o = table['O'].astype(np.int64)
+
+        # Rows grouped by (date, KK, O), by EE within a group (file order for
+        # equal EE), as the annual statistics walk them: GG is that of the
+        # lowest EE, the time that of the 5th halo type in EE order
+        ee = table['EE'].astype(np.int64)
+        order = np.lexsort((np.arange(n), ee, o, kk, day))
+        group_key = (day[order] * 4096 + kk[order]) * 16 + (o[order] + 1)
+        starts = np.flatnonzero(np.r_[True, group_key[1:] != group_key[:-1]]) if n else np.zeros(0, dtype=np.int64)
+        group_of_row = np.cumsum(np.r_[False, group_key[1:] != group_key[:-1]]) if n else np.zeros(0, dtype=np.int64)
+
+        # Bits per row: EE 04 sets EE 02 and EE 03
+        ee = ee[order]
+        split = ee == 4
+        bits = np.concatenate([_row_bits(np.where(split, 2, ee)), _row_bits(np.full(int(split.sum()), 3))])
+        bit_rows = np.concatenate([np.arange(n), np.flatnonzero(split)])
+        by_row = np.argsort(bit_rows, kind='stable')
+        bits, bit_rows = bits[by_row], bit_rows[by_row]
+
+        words = np.zeros((n, 2), dtype=np.uint64)
+        np.bitwise_or.at(
+            words, (bit_rows, bits // 64),
+            np.left_shift(np.uint64(1), (bits % 64).astype(np.uint64))
+        )
+        if n:
+            self.masks = np.stack([
+                np.bitwise_or.reduceat(words[:, 0], starts),
+                np.bitwise_or.reduceat(words[:, 1], starts)
+            ], axis=1)
+        else:
+            self.masks = np.zeros((0, 2), dtype=np.uint64)
+        self.counts = popcount(self.masks[:, 0]) + popcount(self.masks[:, 1])
+
+        # Running number of halo types per group, to freeze the time
+        first_seen = np.unique(group_of_row[bit_rows] * 128 + bits, return_index=True)[1]
+        new_types = np.bincount(bit_rows[first_seen], minlength=n)
+        running = np.cumsum(new_types)
+        if n:
+            running -= np.repeat(running[starts] - new_types[starts], np.diff(np.r_[starts, n]))
+        position = np.where(running < _TIME_FREEZE, np.arange(n), -1)
+        time_rows = order[np.maximum.reduceat(position, starts)] if n else np.zeros(0, dtype=np.int64)
+        first_rows = order[starts]
+
+        self.day = day[first_rows]
+        self.kk = kk[first_rows]
+        self.o = o[first_rows]
+        self.jj = table['JJ'][first_rows].astype(np.int64)
+        self.mm = table['MM'][first_rows].astype(np.int64)
+        self.tt = table['TT'][first_rows].astype(np.int64)
+        self.gg = table['GG'][first_rows].astype(np.int64)
+        self.zs = table['ZS'][time_rows].astype(np.int64)
+        self.zm = table['ZM'][time_rows].astype(np.int64)
+
+    def query(
+        self,
+        first_day: Optional[int] = None,
+        last_day: Optional[int] = None,
+        min_types: int = DEFAULT_MIN_TYPES,
+        ee_any: Optional[Iterable[int]] = None,
+        ee_all: Optional[Iterable[int]] = None,
+        observers: Optional[Iterable[int]] = None,
+        objects: Optional[Iterable[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """Find phenomena.
+
+        Args:
+            first_day: First day key (dataset.day_key), None = from the start
+            last_day: Last day key (inclusive), None = up to the end
+            min_types: Minimum number of different halo types
+            ee_any: At least one of these halo types must be reported
+            ee_all: All of these halo types must be reported
+            observers: Only these observers (KK)
+            objects: Only these objects (O)
+
+        Returns:
+            Phenomena sorted by date, KK and time, in the format of the
+            annual statistics phenomena list
+        """
+        lo = 0 if first_day is None else int(np.searchsorted(self.day, first_day, 'left'))
+        hi = self.day.size if last_day is None else int(np.searchsorted(self.day, last_day, 'right'))
+        masks = self.masks[lo:hi]
+        keep = self.counts[lo:hi] >= min_types
+        if ee_any is not None:
+            wanted = type_mask(ee_any)
+            keep &= ((masks[:, 0] & wanted[0]) | (masks[:, 1] & wanted[1])) != 0
+        if ee_all is not None:
+            wanted = type_mask(ee_all)
+            keep &= ((masks[:, 0] & wanted[0]) == wanted[0]) & ((masks[:, 1] & wanted[1]) == wanted[1])
+        if observers is not None:
+            keep &= np.isin(self.kk[lo:hi], list(observers))
+        if objects is not None:
+            keep &= np.isin(self.o[lo:hi], list(objects))
+
+        hits = lo + np.flatnonzero(keep)
+        hits = hits[np.lexsort((self.o[hits], self.zm[hits], self.zs[hits], self.kk[hits], self.day[hits]))]
+
+        # Bit i of the little-endian words is halo type i
+        flags = np.unpackbits(
+            self.masks[hits].astype('<u8').view(np.uint8).reshape(-1, 16), axis=1, bitorder='little'
+        )
+        phenomena = []
+        for i, row_flags in zip(hits, flags):
+            ee_types = [-1 if bit == OTHER_BIT else int(bit) for bit in np.flatnonzero(row_flags)]
+            phenomena.append({
+                'jj': int(self.jj[i]),
+                'mm': int(self.mm[i]),
+                'tt': int(self.tt[i]),
+                'kk': int(self.kk[i]),
+                'gg': int(self.gg[i]),
+                'zs': int(self.zs[i]),
+                'zm': int(self.zm[i]),
+                'o': int(self.o[i]),
+                'ee_types': sorted(ee_types),
+                'ee_count': int(self.counts[i])
+            })
+        return phenomena
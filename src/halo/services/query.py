@@ -0,0 +1,367 @@
+"""
+Compiled observation queries.
+
+Filter parameters of the analysis (filter1/filter2, param ranges) and of
+the observation selection (Datei -> Selektieren) are compiled once into a
+QueryPlan of typed terms - equality, ranges, the JJ century wrap, sector
+bits - that reference columns of the ObservationTable, derived columns
+(see derived_columns) or computed values such as solar altitudes. All
+terms of a plan are evaluated as vectorized masks in one pass over the
+data, cheap terms first, so expensive values are only computed for the
+observations still in question.
+
+Column references are either the name of a stored/derived column or a
+tuple (name, option) of a computed value, which is obtained from the
+resolver passed to QueryPlan.select(). Computed values are lists with
+None where the value is not defined; such observations never match.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .dataset import OBSERVATION_FIELDS, ObservationTable
+from .derived_columns import SECTOR_LETTERS, get_column
+
+
+Column = Union[str, Tuple[str, Any]]
+Resolver = Callable[[List[Any], Tuple[str, Any]], List[Optional[float]]]
+
+# Integer parameters compared by value in analysis filters
+INTEGER_PARAMS = ('MM', 'JJ', 'KK', 'GG', 'O', 'f', 'd', 'EE', 'DD', 'H', 'F', 'V', 'zz')
+
+# Evaluation order: stored columns, derived columns, computed values, per-record tests
+_COST_COLUMN, _COST_DERIVED, _COST_COMPUTED, _COST_RECORD = range(4)
+
+
+class QueryContext:
+    """Observations a plan is evaluated on, with their table rows and column cache."""
+
+    def __init__(self, observations: List[Any], table: ObservationTable, rows: np.ndarray,
+                 resolver: Optional[Resolver] = None):
+        self.observations = observations
+        self.table = table
+        self.rows = rows
+        self.resolver = resolver
+        self._values = {}
+
+    def values(self, column: Column, index: np.ndarray) -> np.ndarray:
+        """Values of a column for the observations at positions index."""
+        if isinstance(column, str):
+            values = self._values.get(column)
+            if values is None:
+                values = self._values[column] = get_column(self.table, column)[self.rows]
+            return values[index]
+        # Computed values: only for the requested observations, None -> NaN
+        computed = self.resolver([self.observations[i] for i in index], column)
+        return np.array([np.nan if v is None else v for v in computed], dtype=np.float64)
+
+
+class Term(ABC):
+    """Condition on a single observation, evaluated for many at once."""
+
+    cost = _COST_COLUMN
+
+    @abstractmethod
+    def mask(self, context: QueryContext, index: np.ndarray) -> np.ndarray:
+        """Boolean mask for the observations at positions index."""
+
+
+def _column_cost(column: Column) -> int:
+    if not isinstance(column, str):
+        return _COST_COMPUTED
+    return _COST_COLUMN if column in OBSERVATION_FIELDS else _COST_DERIVED
+
+
+class Constant(Term):
+    """Matches all or no observations."""
+
+    def __init__(self, value: bool):
+        self.value = value
+
+    def mask(self, context, index):
+        return np.full(index.size, self.value, dtype=bool)
+
+
+class Equals(Term):
+    """column == value"""
+
+    def __init__(self, column: Column, value: float):
+        self.column, self.value = column, value
+        self.cost = _column_cost(column)
+
+    def mask(self, context, index):
+        return context.values(self.column, index) == self.value
+
+
+class Between(Term):
+    """low <= column <= high"""
+
+    def __init__(self, column: Column, low: float, high: float):
+        self.column, self.low, self.high = column, low, high
+        self.cost = _column_cost(column)
+
+    def mask(self, context, index):
+        values = context.values(self.column, index)
+        return (values >= self.low) & (values <= self.high)
+
+
+class YearRange(Term):
+    """2-digit year range; low > high wraps around the century (e.g. 50-49)."""
+
+    def __init__(self, low: int, high: int, column: str = 'JJ'):
+        self.column, self.low, self.high = column, low, high
+
+    def mask(self, context, index):
+        values = context.values(self.column, index)
+        if self.low > self.high:
+            return ((values >= self.low) & (values <= 99)) | ((values >= 0) & (values <= self.high))
+        return (values >= self.low) & (values <= self.high)
+
+
+class HasBit(Term):
+    """Bit set in an integer (mask) column."""
+
+    def __init__(self, column: str, bit: int):
+        self.column, self.bit = column, bit
+        self.cost = _column_cost(column)
+
+    def mask(self, context, index):
+        return (context.values(self.column, index).astype(np.int64) >> self.bit) & 1 == 1
+
+
+class AllOf(Term):
+    """All terms match."""
+
+    def __init__(self, terms: Sequence[Term]):
+        self.terms = list(terms)
+        self.cost = max((t.cost for t in self.terms), default=_COST_COLUMN)
+
+    def mask(self, context, index):
+        result = np.ones(index.size, dtype=bool)
+        for term in sorted(self.terms, key=lambda t: t.cost):
+            result &= term.mask(context, index)
+        return result
+
+
+class AnyOf(Term):
+    """At least one of the terms matches."""
+
+    def __init__(self, terms: Sequence[Term]):
+        self.terms = list(terms)
+        self.cost = max((t.cost for t in self.terms), default=_COST_COLUMN)
+
+    def mask(self, context, index):
+        result = np.zeros(index.size, dtype=bool)
+        for term in self.terms:
+            result |= term.mask(context, index)
+        return result
+
+
+class Not(Term):
+    """The term does not match."""
+
+    def __init__(self, term: Term):
+        self.term = term
+        self.cost = term.cost
+
+    def mask(self, context, index):
+        return ~self.term.mask(context, index)
+
+
+class RecordTest(Term):
+    """Python test of an attribute of every observation (fields without a column)."""
+
+    cost = _COST_RECORD
+
+    def __init__(self, attribute: Any, test: Callable[[Any], bool]):
+        self.attribute, self.test = attribute, test
+
+    def mask(self, context, index):
+        observations = context.observations
+        return np.fromiter(
+            (bool(self.test(getattr(observations[i], self.attribute, None))) for i in index),
+            dtype=bool, count=index.size
+        )
+
+
+MATCH_ALL = Constant(True)
+MATCH_NONE = Constant(False)
+
+
+class QueryPlan:
+    """Conjunction of terms, evaluated in one pass."""
+
+    def __init__(self, terms: Sequence[Term] = ()):
+        self.terms = [t for t in terms if t is not MATCH_ALL]
+
+    def add(self, term: Term) -> 'QueryPlan':
+        if term is not MATCH_ALL:
+            self.terms.append(term)
+        return self
+
+    def select(self, observations: List[Any], table: ObservationTable, rows: np.ndarray,
+               resolver: Optional[Resolver] = None) -> np.ndarray:
+        """Positions of the matching observations (ascending).
+
+        Args:
+            observations: Observations to filter
+            table: ObservationTable containing them
+            rows: Table row of every observation
+            resolver: Computes values of computed columns for a list of observations
+        """
+        context = QueryContext(observations, table, rows, resolver)
+        index = np.arange(len(observations))
+        for term in sorted(self.terms, key=lambda t: t.cost):
+            if not index.size:
+                break
+            index = index[term.mask(context, index)]
+        return index
+
+
+def _two_digit_year(year: int) -> int:
+    """Year as used in JJ (1988 -> 88)."""
+    return year % 100 if year >= 1900 else year
+
+
+def time_column(params: dict, prefix: str) -> str:
+    """CET hour or local hour of the observer's region."""
+    return 'local_hour' if params.get(f'{prefix}_timezone') == 'local' else 'ZS'
+
+
+def computed_column(param_name: str, params: dict) -> Tuple[str, Any]:
+    """Computed column of SH, MH or MP with the altitude type of the request."""
+    if param_name == 'SH':
+        return 'SH', params.get('sh_type', 'mean')
+    return param_name, params.get('mh_type', 'mean')
+
+
+def compile_match(param_name: Any, param_value: Any, params: dict, prefix: str) -> Term:
+    """Term for an analysis filter (filter1/filter2): parameter equals a value.
+
+    TT needs {prefix}_month and {prefix}_year; ZZ uses local time if
+    {prefix}_timezone is 'local'; SE matches an octant letter a-h.
+    Values that cannot be parsed match nothing.
+    """
+    if param_name == 'TT':
+        month = params.get(f'{prefix}_month')
+        year = params.get(f'{prefix}_year')
+        if month is None or year is None:
+            return MATCH_NONE
+        try:
+            day, month, year = int(param_value), int(month), _two_digit_year(int(year))
+        except (ValueError, TypeError):
+            return MATCH_NONE
+        return AllOf([Equals('TT', day), Equals('MM', month), Equals('JJ', year)])
+
+    if param_name == 'SE':
+        letter = param_value.lower()
+        if len(letter) != 1 or letter not in SECTOR_LETTERS:
+            return MATCH_NONE
+        return HasBit('sector_mask', SECTOR_LETTERS.index(letter))
+
+    if param_name in ('ZZ', 'SH', 'MH', 'MP') or param_name in INTEGER_PARAMS or param_name == 'C':
+        try:
+            if param_name == 'ZZ':
+                value = float(param_value)
+            elif param_name == 'JJ':
+                value = _two_digit_year(int(param_value))
+            else:
+                value = int(param_value)
+        except (ValueError, TypeError):
+            return MATCH_NONE
+        if param_name == 'ZZ':
+            return Equals(time_column(params, prefix), value)
+        if param_name in ('SH', 'MH', 'MP'):
+            return Equals(computed_column(param_name, params), value)
+        return Equals(param_name, value)
+
+    # Other fields are compared with the value as given
+    if param_name in OBSERVATION_FIELDS:
+        if isinstance(param_value, (int, float)):
+            return Equals(param_name, param_value)
+        return MATCH_NONE
+    return RecordTest(param_name, lambda v: v is not None and v == param_value)
+
+
+def compile_range(param_name: Any, params: dict, prefix: str) -> Term:
+    """Term for the range of an analysis parameter ({prefix}_from/{prefix}_to).
+
+    TT is always restricted to {prefix}_month/{prefix}_year; JJ ranges with
+    from > to wrap around the century. Missing or unparsable ranges match
+    all observations.
+    """
+    from_val = params.get(f'{prefix}_from')
+    to_val = params.get(f'{prefix}_to')
+
+    if param_name == 'TT':
+        month = params.get(f'{prefix}_month')
+        year = params.get(f'{prefix}_year')
+        if month is None or year is None:
+            return MATCH_ALL
+        try:
+            terms = [Equals('MM', int(month)), Equals('JJ', _two_digit_year(int(year)))]
+        except (ValueError, TypeError):
+            return MATCH_ALL
+        if from_val is not None and to_val is not None:
+            try:
+                terms.append(Between('TT', int(from_val), int(to_val)))
+            except (ValueError, TypeError):
+                pass
+        return AllOf(terms)
+
+    if from_val is None or to_val is None:
+        return MATCH_ALL
+    try:
+        if param_name == 'ZZ':
+            from_val, to_val = float(from_val), float(to_val)
+        elif param_name == 'JJ':
+            from_val, to_val = _two_digit_year(int(from_val)), _two_digit_year(int(to_val))
+        else:
+            from_val, to_val = int(from_val), int(to_val)
+    except (ValueError, TypeError):
+        return MATCH_ALL
+
+    if param_name == 'JJ':
+        return YearRange(from_val, to_val)
+    if param_name == 'ZZ':
+        return Between(time_column(params, prefix), from_val, to_val)
+    if param_name in ('SH', 'MH', 'MP'):
+        return Between(computed_column(param_name, params), from_val, to_val)
+    if param_name == 'HO_HU':
+        # Light pillar: either height in range
+        return AnyOf([Between('HO', from_val, to_val), Between('HU', from_val, to_val)])
+    if param_name in OBSERVATION_FIELDS:
+        return Between(param_name, from_val, to_val)
+    return RecordTest(param_name, lambda v: v is not None and from_val <= v <= to_val)
+
+
+def compile_selection(params: dict) -> Term:
+    """Term for an observation selection (Datei -> Selektieren, /observations/filter).
+
+    Raises ValueError/TypeError for missing or invalid values.
+    """
+    filter_type = params.get('filter_type')
+    if filter_type == 'MM':
+        return AllOf([Equals('MM', int(params.get('month'))), Equals('JJ', int(params.get('year')) % 100)])
+    if filter_type == 'TT':
+        day, month, year = int(params.get('day')), int(params.get('month')), int(params.get('year'))
+        return AllOf([Equals('TT', day), Equals('MM', month), Equals('JJ', year % 100)])
+    if filter_type == 'ZZ':
+        from_time = int(params.get('from_hour')) * 60 + int(params.get('from_minute'))
+        to_time = int(params.get('to_hour')) * 60 + int(params.get('to_minute'))
+        # Observations without time never match
+        return AllOf([
+            Not(Equals('ZS', -1)), Not(Equals('ZM', -1)), Between('cet_minutes', from_time, to_time)
+        ])
+    if filter_type == 'SH':
+        sh_from = int(params.get('from', -90))
+        sh_to = int(params.get('to', 90))
+        return Between(('SH', params.get('sh_time', 'mean')), sh_from, sh_to)
+    value = int(params.get('value'))
+    if filter_type == 'JJ':
+        return Equals('JJ', value % 100)
+    if filter_type in OBSERVATION_FIELDS:
+        return Equals(filter_type, value)
+    return RecordTest(filter_type, lambda v: v == value)
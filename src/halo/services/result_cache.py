@@ -0,0 +1,115 @@
+"""
+Result cache for statistics, reports and analyses.
+
+The statistics and report endpoints compute a data dict from the
+observations and then format it as JSON, text, markdown or chart. The data
+dict is cached here under a key of the canonical request and the dataset
+generations (see dataset), so all output formats of a request share one
+computation and every edit of the observations or observer records
+invalidates exactly the results computed from them.
+
+The cache has a memory budget: when the estimated size of all entries
+exceeds it, the least recently used entries are evicted.
+
+Cached values are shared between requests and must not be modified.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+# Default memory budget in bytes
+DEFAULT_BUDGET = 64 * 1024 * 1024
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory size of a value and everything it contains, in bytes."""
+    size = 0
+    seen = set()
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return size
+
+
+class ResultCache:
+    """LRU cache of computed results with a memory budget."""
+
+    def __init__(self, budget: int = DEFAULT_BUDGET):
+        self.budget = budget
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[Hashable, Tuple[int, Any]]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Cached value of key; computed with compute() and stored on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute()
+        size = estimate_size(value)
+        if size > self.budget:
+            return value
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[0]
+            self._entries[key] = (size, value)
+            self._size += size
+            while self._size > self.budget:
+                _, (evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        """Remove all entries (the counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and memory use."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'budget': self.budget
+            }
+
+
+_cache_lock = threading.Lock()
+
+
+def get_result_cache(config: Dict[str, Any]) -> ResultCache:
+    """Result cache of the app, created on first use with budget RESULT_CACHE_BYTES."""
+    with _cache_lock:
+        cache = config.get('RESULT_CACHE')
+        if cache is None:
+            cache = config['RESULT_CACHE'] = ResultCache(config.get('RESULT_CACHE_BYTES', DEFAULT_BUDGET))
+    return cache
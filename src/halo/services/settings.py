@@ -12,6 +12,8 @@ class Settings:
             - INPUT_MODE: 'M' or 'N'
             - OUTPUT_MODE: 'H', 'P', or 'M'
             - ACTIVE_OBSERVERS_ONLY: '0' or '1'
+            - WARMUP_ENABLED: '0' or '1'
+            - WARMUP_MONTHS: number of recent months to warm up
     """
 
     DEFAULT_FILENAME = 'halo.cfg'
@@ -64,6 +66,13 @@ class Settings:
                             app_config['DATE_DEFAULT_YEAR'] = 2026
                     elif key == 'UPLOAD_PASSWORD':
                         app_config['UPLOAD_PASSWORD'] = value
+                    elif key == 'WARMUP_ENABLED':
+                        app_config['WARMUP_ENABLED'] = value in ('1', 'true', 'True')
+                    elif key == 'WARMUP_MONTHS':
+                        try:
+                            app_config['WARMUP_MONTHS'] = max(0, int(value))
+                        except ValueError:
+                            app_config['WARMUP_MONTHS'] = 12
         except Exception:
             # On any error, keep existing defaults
             pass
@@ -82,6 +91,8 @@ class Settings:
             ['DATE_DEFAULT_MONTH', str(app_config.get('DATE_DEFAULT_MONTH', 1))],
             ['DATE_DEFAULT_YEAR', str(app_config.get('DATE_DEFAULT_YEAR', 2026))],
             ['UPLOAD_PASSWORD', app_config.get('UPLOAD_PASSWORD', '')],
+            ['WARMUP_ENABLED', '1' if app_config.get('WARMUP_ENABLED', False) else '0'],
+            ['WARMUP_MONTHS', str(app_config.get('WARMUP_MONTHS', 12))],
         ]
         with open(cfg_file, 'w', encoding='utf-8', newline='') as f:
             writer = csv.writer(f)
@@ -0,0 +1,97 @@
+"""
+Background warm-up of the statistics caches after a dataset load.
+
+After a file is loaded, the first request for the monthly or annual
+statistics pays the full cost of computing the statistics and rendering
+the charts. With WARMUP_ENABLED, a background thread requests them right
+after the load instead: the annual statistics of every year present and
+the monthly statistics of the most recent WARMUP_MONTHS months, each as
+data plus line and bar chart. They run as the job types monthly_stats and
+annual_stats (see /api/jobs), with the language passed in explicitly. The
+results land in the result cache and the chart cache, so later requests are
+served from there.
+
+The thread runs at low priority and stops as soon as the observations or
+observer records change, since its results would be stale then.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from .dataset import ObservationTable, observations_key, observers_key
+
+
+DEFAULT_MONTHS = 12
+
+# Output formats requested per statistic: data first, the charts reuse it
+WARMUP_FORMATS = ('json', 'linegraph', 'bargraph')
+
+# Job type and query parameters
+Request = Tuple[str, Dict[str, str]]
+
+
+def warmup_requests(table: ObservationTable, months: int = DEFAULT_MONTHS) -> List[Request]:
+    """Statistics requests (job type, query parameters) warming the caches of a dataset.
+
+    The most recent months come first, then the years (newest first).
+    """
+    if not table.size:
+        return []
+    year_months = np.unique(table['year4'].astype(np.int32) * 100 + table['MM'])
+    year_months = year_months[year_months % 100 >= 1][::-1][:months]
+    years = np.unique(table['year4'])[::-1]
+
+    requests = []
+    for value in year_months.tolist():
+        for output_format in WARMUP_FORMATS:
+            requests.append(('monthly_stats', {
+                'mm': str(value % 100), 'jj': str(value // 100 % 100), 'format': output_format
+            }))
+    for year in years.tolist():
+        for output_format in WARMUP_FORMATS:
+            requests.append(('annual_stats', {'jj': str(year % 100), 'format': output_format}))
+    return requests
+
+
+def _lower_priority() -> None:
+    """Lower the scheduling priority of the calling thread (where supported)."""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except (AttributeError, OSError):
+        pass
+
+
+def start_warmup(
+    config: Dict[str, Any],
+    requests: List[Request],
+    run_request: Callable[[str, Dict[str, str]], Any]
+) -> threading.Thread:
+    """Run the requests in a low-priority background thread.
+
+    Args:
+        config: App config (for the dataset generations)
+        requests: Requests from warmup_requests()
+        run_request: Performs one request (job type, query parameters)
+
+    Returns:
+        The started thread; it stops early when the dataset changes
+    """
+    key = (observations_key(config), observers_key(config))
+
+    def warm_up():
+        _lower_priority()
+        for kind, params in requests:
+            if (observations_key(config), observers_key(config)) != key:
+                return
+            try:
+                run_request(kind, params)
+            except Exception:
+                # A failing statistic must not stop the others
+                continue
+
+    thread = threading.Thread(target=warm_up, name='halo-warmup', daemon=True)
+    thread.start()
+    return thread
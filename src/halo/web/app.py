@@ -7,6 +7,7 @@ Licensed under MIT License - see LICENSE file for details.
 from flask import Flask, render_template, session, request, g
 from pathlib import Path
 from halo.services.settings import Settings
+from halo.services.dataset import observations_changed, observers_changed
 
 
 def create_app(config=None):
@@ -46,6 +47,15 @@ def create_app(config=None):
         'ACTIVE_OBSERVERS_ONLY': False,  # Setting: filter to active observers only
         'DIRTY': False,  # Track unsaved changes
         'UPDATE_REPO': 'Molau/Halo',  # GitHub repository for auto-updates
+        'JOB_WORKERS': 2,  # Worker threads for background jobs (/api/jobs)
+        'JOB_STORE_SIZE': 50,  # Jobs kept in the job store
+        'RESULT_CACHE_BYTES': 64 * 1024 * 1024,  # Memory budget of the result cache
+        'CHART_CACHE_DIR': None,  # Directory of the chart image cache (default: cache/charts)
+        'CHART_CACHE_BYTES': 100 * 1024 * 1024,  # Disk budget of the chart image cache
+        'CHART_RENDER_PROCESSES': 0,  # Worker processes rendering charts (0 = render in the request thread)
+        'CHART_BUNDLE_PROCESSES': None,  # Workers rendering /api/charts/bundle without the above (None = one per CPU)
+        'WARMUP_ENABLED': False,  # Setting: warm up the statistics caches after a file load
+        'WARMUP_MONTHS': 12,  # Setting: recent months whose monthly statistics are warmed up
     })
     
     if config:
@@ -66,6 +76,7 @@ def create_app(config=None):
                 from halo.io.csv_handler import ObservationCSV
                 observations, needs_conversion = ObservationCSV.read_observations(data_path)
                 app.config['OBSERVATIONS'] = observations
+                observations_changed(app.config)
                 app.config['LOADED_FILE'] = startup_file
                 app.config['DIRTY'] = needs_conversion  # Mark dirty if converted from legacy format
                 app.config['AUTO_LOADED'] = True  # Flag for showing notification
@@ -85,11 +96,12 @@ def create_app(config=None):
         with open(observers_file, 'r', encoding='utf-8') as f:
             reader = csv.reader(f)
             app.config['OBSERVERS'] = list(reader)
+            observers_changed(app.config)
     else:
         pass
     
     # Initialize i18n
-    from halo.resources import get_current_language, get_i18n
+    from halo.resources import get_current_language, get_i18n, get_language_i18n
     
     @app.before_request
     def setup_language():
@@ -102,7 +114,8 @@ def create_app(config=None):
         
         # Store current language in g for easy template access
         g.language = session.get('language', 'de')
-        g.i18n = get_i18n(g.language)
+        g.i18n = get_language_i18n(g.language)
+        get_i18n(g.language)  # Global instance of get_string()
     
     @app.context_processor
     def inject_i18n():
@@ -178,6 +191,11 @@ def create_app(config=None):
         """About page."""
         return render_template('about.html')
     
+    # Warm up the statistics caches of the startup file (if enabled)
+    if app.config.get('AUTO_LOADED'):
+        from halo.api.routes import warm_up_statistics
+        warm_up_statistics(app)
+    
     return app
 
 
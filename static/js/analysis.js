@@ -198,6 +198,8 @@ document.addEventListener('DOMContentLoaded', async function() {
             { code: 'TT', name: i18nStrings.analysis_dialog.param_names.TT },
             { code: 'ZZ', name: i18nStrings.analysis_dialog.param_names.ZZ },
             { code: 'SH', name: i18nStrings.analysis_dialog.param_names.SH },
+            { code: 'MH', name: i18nStrings.analysis_dialog.param_names.MH },
+            { code: 'MP', name: i18nStrings.analysis_dialog.param_names.MP },
             { code: 'KK', name: i18nStrings.analysis_dialog.param_names.KK },
             { code: 'GG', name: i18nStrings.analysis_dialog.param_names.GG },
             { code: 'O', name: i18nStrings.analysis_dialog.param_names.O },
@@ -323,6 +325,22 @@ document.addEventListener('DOMContentLoaded', async function() {
                 }
                 return altitudes;
             
+            case 'MH':
+                // Lunar altitude: all degrees from -10 to 90
+                const moonAltitudes = [];
+                for (let i = -10; i <= 90; i++) {
+                    moonAltitudes.push({ value: i, display: String(i) + '°' });
+                }
+                return moonAltitudes;
+            
+            case 'MP':
+                // Moon phase: illuminated fraction in percent
+                const phases = [];
+                for (let i = 0; i <= 100; i++) {
+                    phases.push({ value: i, display: String(i) + '%' });
+                }
+                return phases;
+            
             case 'KK':
                 // Format: "44 - Hans Mustermann"
                 return observers.map(obs => ({
@@ -1519,12 +1537,18 @@ document.addEventListener('DOMContentLoaded', async function() {
         }
         
         // Send to backend for processing
+        // Sun/moon altitudes and phases are calculated per observation: run these as background job
+        const computedParams = ['SH', 'MH', 'MP'];
+        const runAsJob = [selectedParams.param1, selectedParams.param2, selectedParams.filter1, selectedParams.filter2]
+            .some(p => computedParams.includes(p));
         try {
-            const response = await fetch('/api/analysis', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify(selectedParams)
-            });
+            const response = runAsJob
+                ? await fetchJob('analysis', selectedParams)
+                : await fetch('/api/analysis', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify(selectedParams)
+                });
             
             if (!response.ok) {
                 showWarningModal('Fehler bei der Auswertung');
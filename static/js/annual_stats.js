@@ -5,6 +5,7 @@ document.addEventListener('DOMContentLoaded', async function() {
 
     // Use global i18n from main.js
     let currentStatsData = null; // Store current stats data for save/print
+    let currentOutputMode = 'P'; // Output mode of the displayed statistics
 
     // Helper function to escape HTML
     function escapeHtml(text) {
@@ -128,10 +129,14 @@ document.addEventListener('DOMContentLoaded', async function() {
         if (btnApply) btnApply.disabled = true;
         
         try {
-            // Fetch annual statistics
-            const url = `/api/annual-stats?jj=${validation.jj}`;
-            const response = await fetch(url);
-            const data = await response.json();
+            // Check output mode setting
+            currentOutputMode = await fetchOutputMode();
+            const formatParam = outputFormat(currentOutputMode);
+            
+            // Fetch annual statistics and their formatted output in one request
+            // (as background job: a whole year of observations)
+            const formats = formatParam === 'html' ? 'json' : `json,${formatParam}`;
+            const response = await fetchJob('annual_stats', { jj: validation.jj, format: 'bundle', formats });
             
             if (!response.ok) {
                 if (yearError) {
@@ -141,6 +146,11 @@ document.addEventListener('DOMContentLoaded', async function() {
                 return;
             }
             
+            const bundle = await response.formData();
+            chartImages = {};
+            const data = JSON.parse(await bundle.get('json').text());
+            const content = formatParam === 'html' ? null : await bundle.get(formatParam).text();
+            
             if (data.activity_count === 0) {
                 if (yearError) {
                     yearError.textContent = i18nStrings.annual_stats.error_no_data;
@@ -160,7 +170,7 @@ document.addEventListener('DOMContentLoaded', async function() {
             modal.hide();
             
             // Show results
-            showStatistics(data);
+            showStatistics(data, formatParam, content);
             
         } catch (error) {
             console.error('Error fetching statistics:', error);
@@ -175,20 +185,48 @@ document.addEventListener('DOMContentLoaded', async function() {
         }
     }
 
-    // Show statistics in results modal
-    async function showStatistics(data) {
-        const statsContent = document.getElementById('stats-content');
-        if (!statsContent) return;
-        
-        // Check output mode setting
-        let outputMode = 'P'; // Default: Pseudografik
+    // Get output mode setting (P = Pseudografik, H = HTML-Tabellen, M = Markdown)
+    async function fetchOutputMode() {
         try {
             const modeResponse = await fetch('/api/config/outputmode');
             const modeData = await modeResponse.json();
-            outputMode = modeData.mode || 'P';
+            return modeData.mode || 'P';
         } catch (error) {
             console.error('Error fetching output mode:', error);
+            return 'P'; // Default: Pseudografik
+        }
+    }
+    
+    // Server output format of an output mode
+    function outputFormat(outputMode) {
+        if (outputMode === 'P') {
+            return 'text';
+        } else if (outputMode === 'M') {
+            return 'markdown';
+        }
+        return 'html';
+    }
+    
+    // Chart images by URL, so printing and saving a chart fetch it only once
+    // (reset when new statistics are generated)
+    let chartImages = {};
+    function fetchChartImage(url) {
+        if (!chartImages[url]) {
+            chartImages[url] = fetch(url).then(response => {
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                return response.blob();
+            }).catch(error => {
+                delete chartImages[url];
+                throw error;
+            });
         }
+        return chartImages[url];
+    }
+    
+    // Show statistics in results modal (content: text or markdown output of formatParam)
+    function showStatistics(data, formatParam, content) {
+        const statsContent = document.getElementById('stats-content');
+        if (!statsContent) return;
         
         // Format year
         const year = data.jj >= 50 ? `19${data.jj.toString().padStart(2, '0')}` : 
@@ -200,30 +238,15 @@ document.addEventListener('DOMContentLoaded', async function() {
             resultsTitle.textContent = i18nStrings.annual_stats.title;
         }
         
-        // Fetch formatted statistics from server
+        // Formatted statistics from server
         let html = '';
-        let formatParam;
-        
-        if (outputMode === 'P') {
-            formatParam = 'text';
-        } else if (outputMode === 'M') {
-            formatParam = 'markdown';
-        } else {
-            formatParam = 'html';
-        }
         
         try {
-            const response = await fetch(`/api/annual-stats?jj=${data.jj}&format=${formatParam}`);
-            let content;
-            
             if (formatParam === 'html') {
-                // HTML format returns JSON; convert to HTML tables
-                const jsonData = await response.json();
-                html = buildHTMLTableAnnualStats(jsonData, year, i18nStrings);
+                // HTML format uses the JSON data; convert to HTML tables
+                html = buildHTMLTableAnnualStats(data, year, i18nStrings);
             } else {
-                // Text and markdown formats return text
-                content = await response.text();
-                
+                // Text and markdown formats come as text
                 if (formatParam === 'text') {
                     // Display as preformatted text with tight line spacing
                     html = `<pre style="font-family: 'Courier New', monospace; white-space: pre-wrap; word-wrap: break-word; padding: 20px; background-color: white; border: 1px solid #ddd; line-height: 1;">${escapeHtml(content)}</pre>`;
@@ -237,7 +260,7 @@ document.addEventListener('DOMContentLoaded', async function() {
                 }
             }
         } catch (error) {
-            console.error('Error fetching annual statistics:', error);
+            console.error('Error formatting annual statistics:', error);
             html = `<p style="color: red; padding: 20px;">Error loading statistics: ${escapeHtml(error.message)}</p>`;
         }
         
@@ -904,8 +927,7 @@ document.addEventListener('DOMContentLoaded', async function() {
             btnChartPrintLine.onclick = async () => {
                 if (!window.chartData) return;
                 try {
-                    const response = await fetch(`/api/annual-stats?jj=${window.chartData.jj}&format=linegraph`);
-                    const blob = await response.blob();
+                    const blob = await fetchChartImage(`/api/annual-stats?jj=${window.chartData.jj}&format=linegraph`);
                     
                     const printWindow = window.open();
                     const img = document.createElement('img');
@@ -935,8 +957,7 @@ document.addEventListener('DOMContentLoaded', async function() {
                                  `20${window.chartData.jj.toString().padStart(2, '0')}`;
                     const filename = `Jahresstatistik_${year}.png`;
                     
-                    const response = await fetch(`/api/annual-stats?jj=${window.chartData.jj}&format=linegraph`);
-                    const blob = await response.blob();
+                    const blob = await fetchChartImage(`/api/annual-stats?jj=${window.chartData.jj}&format=linegraph`);
                     
                     const url = URL.createObjectURL(blob);
                     const a = document.createElement('a');
@@ -959,8 +980,7 @@ document.addEventListener('DOMContentLoaded', async function() {
             btnChartPrintBar.onclick = async () => {
                 if (!window.chartData) return;
                 try {
-                    const response = await fetch(`/api/annual-stats?jj=${window.chartData.jj}&format=bargraph`);
-                    const blob = await response.blob();
+                    const blob = await fetchChartImage(`/api/annual-stats?jj=${window.chartData.jj}&format=bargraph`);
                     
                     const printWindow = window.open();
                     const img = document.createElement('img');
@@ -990,8 +1010,7 @@ document.addEventListener('DOMContentLoaded', async function() {
                                  `20${window.chartData.jj.toString().padStart(2, '0')}`;
                     const filename = `Jahresstatistik_${year}_Balken.png`;
                     
-                    const response = await fetch(`/api/annual-stats?jj=${window.chartData.jj}&format=bargraph`);
-                    const blob = await response.blob();
+                    const blob = await fetchChartImage(`/api/annual-stats?jj=${window.chartData.jj}&format=bargraph`);
                     
                     const url = URL.createObjectURL(blob);
                     const a = document.createElement('a');
@@ -1024,10 +1043,8 @@ document.addEventListener('DOMContentLoaded', async function() {
         const year = currentStatsData.jj >= 50 ? `19${currentStatsData.jj.toString().padStart(2, '0')}` : 
                      `20${currentStatsData.jj.toString().padStart(2, '0')}`;
         
-        // Check output mode
-        const modeResponse = await fetch('/api/config/outputmode');
-        const modeData = await modeResponse.json();
-        const outputMode = modeData.mode || 'P';
+        // Output mode of the displayed statistics
+        const outputMode = currentOutputMode;
         
         let content, mimeType, filename;
         
@@ -150,6 +150,41 @@ async function loadCurrentLanguage() {
     window.currentLanguage = currentLanguage;
 }
 
+// Run a long-running API request as background job (see /api/jobs) and return its response.
+// type: job type (analysis, annual_stats, ...); params: request body or query parameters.
+// onProgress(job) is called with the job status on every poll while the job is running.
+async function fetchJob(type, params, onProgress = null) {
+    const submitResp = await fetch('/api/jobs', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ type, params })
+    });
+    const submitted = await submitResp.json();
+    if (!submitResp.ok || !submitted.success) {
+        throw new Error(submitted.error || 'Job could not be started');
+    }
+
+    const jobId = submitted.job.id;
+    let delay = 100;
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, delay));
+        delay = Math.min(delay * 2, 1000);
+        const resp = await fetch(`/api/jobs/${jobId}`);
+        const data = await resp.json();
+        if (!resp.ok || !data.success) {
+            throw new Error(data.error || 'Job not found');
+        }
+        const job = data.job;
+        if (job.status === 'done') {
+            return fetch(`/api/jobs/${jobId}/result`);
+        }
+        if (job.status === 'failed' || job.status === 'cancelled') {
+            throw new Error(job.error || `Job ${job.status}`);
+        }
+        if (onProgress) onProgress(job);
+    }
+}
+
 async function loadObserverCodes() {
     if (observerData) return observerData;
     
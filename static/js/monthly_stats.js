@@ -4,6 +4,7 @@ document.addEventListener('DOMContentLoaded', async function() {
     await window.waitForI18n();
 
     let currentStatsData = null; // Store current stats data for save/print
+    let currentOutputMode = 'P'; // Output mode of the displayed statistics
 
     // Helper function to escape HTML
     function escapeHtml(text) {
@@ -136,8 +137,13 @@ document.addEventListener('DOMContentLoaded', async function() {
         if (btnApply) btnApply.disabled = true;
         
         try {
-            // Fetch monthly statistics
-            const url = `/api/monthly-stats?mm=${dateInfo.mm}&jj=${dateInfo.jj}`;
+            // Check output mode setting
+            currentOutputMode = await fetchOutputMode();
+            const formatParam = outputFormat(currentOutputMode);
+            
+            // Fetch monthly statistics and their formatted output in one request
+            const formats = formatParam === 'html' ? 'json' : `json,${formatParam}`;
+            const url = `/api/monthly-stats?mm=${dateInfo.mm}&jj=${dateInfo.jj}&format=bundle&formats=${formats}`;
             const response = await fetch(url);
             
             if (!response.ok) {
@@ -146,15 +152,17 @@ document.addEventListener('DOMContentLoaded', async function() {
                 throw new Error(errorData.error);
             }
             
-            const data = await response.json();
-
+            const bundle = await response.formData();
+            chartImages = {};
+            const data = JSON.parse(await bundle.get('json').text());
+            const content = formatParam === 'html' ? null : await bundle.get(formatParam).text();
             
             // Close filter dialog
             const modal = bootstrap.Modal.getInstance(filterDialog);
             modal.hide();
 
             // Display the statistics
-            showStatistics(data);
+            showStatistics(data, formatParam, content);
 
         } catch (error) {
             console.error('Error generating statistics:', error);
@@ -165,23 +173,51 @@ document.addEventListener('DOMContentLoaded', async function() {
         }
     }
 
-    // Show statistics in results modal
-    async function showStatistics(data) {
-        // Store data for save/print/chart functions
-        currentStatsData = data;
-        
-        const statsContent = document.getElementById('stats-content');
-        if (!statsContent) return;
-        
-        // Check output mode setting
-        let outputMode = 'P'; // Default: Pseudografik
+    // Get output mode setting (P = Pseudografik, H = HTML-Tabellen, M = Markdown)
+    async function fetchOutputMode() {
         try {
             const modeResponse = await fetch('/api/config/outputmode');
             const modeData = await modeResponse.json();
-            outputMode = modeData.mode || 'P';
+            return modeData.mode || 'P';
         } catch (error) {
             console.error('Error fetching output mode:', error);
+            return 'P'; // Default: Pseudografik
         }
+    }
+    
+    // Server output format of an output mode
+    function outputFormat(outputMode) {
+        if (outputMode === 'P') {
+            return 'text';
+        } else if (outputMode === 'M') {
+            return 'markdown';
+        }
+        return 'html';
+    }
+    
+    // Chart images by URL, so printing and saving a chart fetch it only once
+    // (reset when new statistics are generated)
+    let chartImages = {};
+    function fetchChartImage(url) {
+        if (!chartImages[url]) {
+            chartImages[url] = fetch(url).then(response => {
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                return response.blob();
+            }).catch(error => {
+                delete chartImages[url];
+                throw error;
+            });
+        }
+        return chartImages[url];
+    }
+    
+    // Show statistics in results modal (content: text or markdown output of formatParam)
+    function showStatistics(data, formatParam, content) {
+        // Store data for save/print/chart functions
+        currentStatsData = data;
+        
+        const statsContent = document.getElementById('stats-content');
+        if (!statsContent) return;
         
         // Get month name (months array is 1-indexed in i18nStrings)
         const months = i18nStrings.months || {};
@@ -197,30 +233,15 @@ document.addEventListener('DOMContentLoaded', async function() {
             resultsTitle.textContent = `${i18nStrings.monthly_stats.title} ${monthName} ${year}`;
         }
         
-        // Fetch formatted statistics from server
+        // Formatted statistics from server
         let html = '';
-        let formatParam;
-        
-        if (outputMode === 'P') {
-            formatParam = 'text';
-        } else if (outputMode === 'M') {
-            formatParam = 'markdown';
-        } else {
-            formatParam = 'html';
-        }
         
         try {
-            const response = await fetch(`/api/monthly-stats?mm=${data.mm}&jj=${data.jj}&format=${formatParam}`);
-            let content;
-            
             if (formatParam === 'html') {
-                // HTML format returns JSON; convert to HTML tables
-                const jsonData = await response.json();
-                html = buildHTMLTableMonthlyStats(jsonData, monthName, year, i18nStrings);
+                // HTML format uses the JSON data; convert to HTML tables
+                html = buildHTMLTableMonthlyStats(data, monthName, year, i18nStrings);
             } else {
-                // Text and markdown formats return text
-                content = await response.text();
-                
+                // Text and markdown formats come as text
                 if (formatParam === 'text') {
                     // Display as preformatted text with tight line spacing
                     html = `<pre style="font-family: 'Courier New', monospace; white-space: pre-wrap; word-wrap: break-word; padding: 20px; background-color: white; border: 1px solid #ddd; line-height: 1;">${escapeHtml(content)}</pre>`;
@@ -234,7 +255,7 @@ document.addEventListener('DOMContentLoaded', async function() {
                 }
             }
         } catch (error) {
-            console.error('Error fetching monthly statistics:', error);
+            console.error('Error formatting monthly statistics:', error);
             html = `<p style="color: red; padding: 20px;">Error loading statistics: ${escapeHtml(error.message)}</p>`;
         }
         
@@ -646,10 +667,8 @@ document.addEventListener('DOMContentLoaded', async function() {
                 const monthShort = i18nStrings.months_short[data.mm];
                 const jjPadded = String(data.jj).padStart(2, '0');
                 
-                // Check output mode
-                const modeResponse = await fetch('/api/config/outputmode');
-                const modeData = await modeResponse.json();
-                const outputMode = modeData.mode || 'P';
+                // Output mode of the displayed statistics
+                const outputMode = currentOutputMode;
                 
                 let content, mimeType, filename;
                 
@@ -955,8 +974,7 @@ document.addEventListener('DOMContentLoaded', async function() {
             btnChartPrintLine.onclick = async () => {
                 if (!window.chartData) return;
                 try {
-                    const response = await fetch(`/api/monthly-stats?mm=${window.chartData.mm}&jj=${window.chartData.jj}&format=linegraph`);
-                    const blob = await response.blob();
+                    const blob = await fetchChartImage(`/api/monthly-stats?mm=${window.chartData.mm}&jj=${window.chartData.jj}&format=linegraph`);
                     
                     const printWindow = window.open();
                     const img = document.createElement('img');
@@ -987,8 +1005,7 @@ document.addEventListener('DOMContentLoaded', async function() {
                     const jjPadded = String(data.jj).padStart(2, '0');
                     const filename = `Haloaktivitaet_${monthShort.toLowerCase()}${jjPadded}.png`;
                     
-                    const response = await fetch(`/api/monthly-stats?mm=${data.mm}&jj=${data.jj}&format=linegraph`);
-                    const blob = await response.blob();
+                    const blob = await fetchChartImage(`/api/monthly-stats?mm=${data.mm}&jj=${data.jj}&format=linegraph`);
                     
                     const url = URL.createObjectURL(blob);
                     const a = document.createElement('a');
@@ -1011,8 +1028,7 @@ document.addEventListener('DOMContentLoaded', async function() {
             btnChartPrintBar.onclick = async () => {
                 if (!window.chartData) return;
                 try {
-                    const response = await fetch(`/api/monthly-stats?mm=${window.chartData.mm}&jj=${window.chartData.jj}&format=bargraph`);
-                    const blob = await response.blob();
+                    const blob = await fetchChartImage(`/api/monthly-stats?mm=${window.chartData.mm}&jj=${window.chartData.jj}&format=bargraph`);
                     
                     const printWindow = window.open();
                     const img = document.createElement('img');
@@ -1043,8 +1059,7 @@ document.addEventListener('DOMContentLoaded', async function() {
                     const jjPadded = String(data.jj).padStart(2, '0');
                     const filename = `Haloaktivitaet_${monthShort.toLowerCase()}${jjPadded}_Balken.png`;
                     
-                    const response = await fetch(`/api/monthly-stats?mm=${data.mm}&jj=${data.jj}&format=bargraph`);
-                    const blob = await response.blob();
+                    const blob = await fetchChartImage(`/api/monthly-stats?mm=${data.mm}&jj=${data.jj}&format=bargraph`);
                     
                     const url = URL.createObjectURL(blob);
                     const a = document.createElement('a');
@@ -1115,8 +1130,7 @@ document.addEventListener('DOMContentLoaded', async function() {
         const filename = `Haloaktivitaet_Balken_${monthShort.toLowerCase()}${jjPadded}.png`;
         
         // Fetch server-generated bar graph
-        fetch(`/api/monthly-stats?mm=${data.mm}&jj=${data.jj}&format=bargraph`)
-            .then(response => response.blob())
+        fetchChartImage(`/api/monthly-stats?mm=${data.mm}&jj=${data.jj}&format=bargraph`)
             .then(blob => {
                 // Download the PNG file
                 const url = URL.createObjectURL(blob);
@@ -1144,8 +1158,7 @@ document.addEventListener('DOMContentLoaded', async function() {
         const filename = `Haloaktivitaet_${monthShort.toLowerCase()}${jjPadded}.png`;
         
         // Fetch server-generated line graph
-        fetch(`/api/monthly-stats?mm=${data.mm}&jj=${data.jj}&format=linegraph`)
-            .then(response => response.blob())
+        fetchChartImage(`/api/monthly-stats?mm=${data.mm}&jj=${data.jj}&format=linegraph`)
             .then(blob => {
                 // Download the PNG file
                 const url = URL.createObjectURL(blob);
@@ -303,6 +303,9 @@ function displayObservers() {
                         </table>
                     </div>
                     <div class="modal-footer py-1">
+                        <button type="button" class="btn btn-secondary btn-sm px-3 me-auto" id="btn-participation">
+                            <i class="bi bi-grid-3x3 me-1"></i>${i18nStrings.observers.participation_button}
+                        </button>
                         <button type="button" class="btn btn-primary btn-sm px-3" data-bs-dismiss="modal">${i18nStrings.common.ok}</button>
                     </div>
                 </div>
@@ -324,12 +327,88 @@ function displayObservers() {
     const modal = new bootstrap.Modal(modalEl);
     modal.show();
     
+    // Participation heatmap of the listed observers
+    document.getElementById('btn-participation').addEventListener('click', () => {
+        const kkList = [...new Set(filteredObservers.map(obs => obs.KK))];
+        modal.hide();
+        showParticipation(kkList);
+    });
+    
     // Clean up after modal is hidden
     modalEl.addEventListener('hidden.bs.modal', () => {
         modalEl.remove();
     });
 }
 
+/**
+ * Show observer × year participation heatmap
+ */
+function showParticipation(kkList) {
+    const metrics = ['solar_ee', 'halo_days', 'active_months'];
+    const options = metrics.map(metric =>
+        `<option value="${metric}">${i18nStrings.observers['participation_metric_' + metric]}</option>`
+    ).join('');
+    
+    const modalHtml = `
+        <div class="modal fade" id="participation-modal" tabindex="-1">
+            <div class="modal-dialog modal-dialog-centered modal-xl">
+                <div class="modal-content">
+                    <div class="modal-header py-1">
+                        <h6 class="modal-title mb-0">${i18nStrings.observers.participation_title}</h6>
+                        <button type="button" class="btn-close" data-bs-dismiss="modal"></button>
+                    </div>
+                    <div class="modal-body py-2" style="max-height: 75vh; overflow-y: auto;">
+                        <div class="d-flex align-items-center gap-2 mb-2">
+                            <label for="participation-metric" class="form-label mb-0">${i18nStrings.observers.participation_metric}</label>
+                            <select id="participation-metric" class="form-select form-select-sm w-auto">${options}</select>
+                        </div>
+                        <div id="participation-content" class="text-center"></div>
+                    </div>
+                    <div class="modal-footer py-1">
+                        <button type="button" class="btn btn-primary btn-sm px-3" data-bs-dismiss="modal">${i18nStrings.common.ok}</button>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+    
+    const existingModal = document.getElementById('participation-modal');
+    if (existingModal) {
+        existingModal.remove();
+    }
+    document.body.insertAdjacentHTML('beforeend', modalHtml);
+    
+    const loadHeatmap = async () => {
+        const metric = document.getElementById('participation-metric').value;
+        const content = document.getElementById('participation-content');
+        const url = `/api/observers/participation?format=heatmap&metric=${metric}&kk=${encodeURIComponent(kkList.join(','))}`;
+        try {
+            const response = await fetch(url);
+            if (!response.ok) {
+                const data = await response.json();
+                content.innerHTML = `<div class="alert alert-warning">${data.error}</div>`;
+                return;
+            }
+            const blob = await response.blob();
+            content.innerHTML = `<img class="img-fluid" alt="${i18nStrings.observers.participation_title}">`;
+            content.querySelector('img').src = URL.createObjectURL(blob);
+        } catch (error) {
+            console.error('Error loading participation:', error);
+            content.innerHTML = `<div class="alert alert-warning">${i18nStrings.observers.loading_error}</div>`;
+        }
+    };
+    
+    const modalEl = document.getElementById('participation-modal');
+    const modal = new bootstrap.Modal(modalEl);
+    document.getElementById('participation-metric').addEventListener('change', loadHeatmap);
+    modal.show();
+    loadHeatmap();
+    
+    modalEl.addEventListener('hidden.bs.modal', () => {
+        modalEl.remove();
+    });
+}
+
 /**
  * Show warning message
  */